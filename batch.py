@@ -0,0 +1,345 @@
+from collections import namedtuple
+
+import numpy as np
+
+import simulation
+from simulation import (
+    PARAMS, CAR_STARTS, BALL_START,
+    IN_FORWARD, IN_BACK, IN_LEFT, IN_RIGHT, IN_BOOST, IN_JUMP,
+)
+
+# Lookup tables indexed by a packed input byte, so decoding an input array is
+# one take() per quantity instead of a mask per flag. Single flags (boost,
+# jump) are tested on the bytes directly, which is cheaper still.
+_codes = np.arange(256)
+_ALONG = np.where(_codes & IN_FORWARD, 1.0, 0.0) - np.where(_codes & IN_BACK, 0.6, 0.0)
+_STRAFE = np.where(_codes & IN_RIGHT, 0.2, 0.0) - np.where(_codes & IN_LEFT, 0.2, 0.0)
+_TURN = ((_codes & IN_LEFT) != 0).astype(np.int8) - ((_codes & IN_RIGHT) != 0)
+_BOOSTING = (_codes & IN_BOOST) != 0
+
+# Ball ground contact, indexed by ground + bounce (0 airborne, 1 settled, 2 bouncing)
+_BOUNCE_VZ = np.array((1.0, 0.0, -0.4))
+
+# Everything a tick needs from the inputs alone, as (2, N) car-major arrays;
+# jumping and turn / rotation are None when no car jumps or turns.
+_Decoded = namedtuple("_Decoded", "bits boosting jumping along turn rotation")
+
+# --------------------------
+# Vectorized batch engine: N independent two-car matches in lockstep.
+# Structure-of-arrays layout, every public array has a leading match axis:
+#   car_pos (N, 2, 3)  car_angle (N, 2)  car_vz (N, 2)
+#   boost (N, 2)       health (N, 2)     scores (N, 2)
+#   ball_pos (N, 3)    ball_vel (N, 3)
+# Storage underneath is component- and car-major ((3, 2, N) for car
+# positions, (2, N) for the other per-car arrays, (3, N) for the ball), so
+# every operation runs over contiguous blocks with the match axis innermost,
+# including the ones between a car and its match's ball. The public arrays
+# are views of it.
+# Each tick reproduces Simulation.step() for every match, with branches
+# turned into masks so that no Python code runs per match. Inputs look
+# random per element, so selections go through take() and flat indices
+# rather than where() / putmask(), which stall on every unpredictable
+# element. Contacts are rare: they are found with one cheap test over all
+# cars and the exact work runs on the flat (car * N + match) indices of the
+# candidates only.
+# --------------------------
+class BatchSimulation:
+    """
+    Obstacles are not modelled; compare against Simulation(obstacle_count=0).
+    dt scales movement, turning and friction as in Simulation; the ball is not
+    swept, so a dt coarser than 1/FPS needs continuous_collision=False.
+    """
+
+    def __init__(self, n, **params):
+        params.setdefault("obstacle_count", 0)
+        if params["obstacle_count"]:
+            raise ValueError("BatchSimulation does not support obstacles")
+        for name in PARAMS:
+            setattr(self, name, getattr(simulation, name))
+        for name, value in params.items():
+            if name not in PARAMS:
+                raise TypeError(f"unknown simulation parameter: {name}")
+            setattr(self, name, value)
+        self.move_scale = self.dt * simulation.FPS
+        if self.continuous_collision is None:
+            self.continuous_collision = self.move_scale > 1.0
+        if self.continuous_collision:
+            raise ValueError("BatchSimulation does not sweep the ball; pass continuous_collision=False")
+        self.n = n
+        self.tick = 0
+        self.car_start = np.array([pos for pos, _ in CAR_STARTS], dtype=np.float64)
+        self.ball_start = np.array(BALL_START, dtype=np.float64)
+        self._car = np.empty((3, 2, n))
+        self.car_pos = self._car.transpose(2, 1, 0)
+        self.car_pos[:] = self.car_start
+        self._angle = np.empty((2, n))
+        self.car_angle = self._angle.T
+        self.car_angle[:] = [ang for _, ang in CAR_STARTS]
+        self._vz = np.zeros((2, n))
+        self.car_vz = self._vz.T
+        self._boost = np.full((2, n), float(self.boost_max))
+        self.boost = self._boost.T
+        self._health = np.full((2, n), 100, dtype=np.int64)
+        self.health = self._health.T
+        self.scores = np.zeros((n, 2), dtype=np.int64)
+        self._ball = np.empty((3, n))
+        self.ball_pos = self._ball.T
+        self.ball_pos[:] = self.ball_start
+        self._vel = np.zeros((3, n))
+        self.ball_vel = self._vel.T
+        self.last_collision_time = np.zeros(n)
+        # heading as cos + i sin, so turning is one complex multiply
+        rad = np.radians(self._angle)
+        self._heading = np.cos(rad) + 1j * np.sin(rad)
+        # Scratch space, so that a tick allocates nothing large: big arrays come
+        # fresh from the OS and every tick would pay for them in page faults
+        self._bits = np.empty((2, n), dtype=np.intp)
+        self._along = np.empty((2, n))
+        self._turning = np.empty((2, n))
+        self._rotation = np.empty((2, n), dtype=complex)
+        self._tmp = np.empty((2, 2, n))
+        self._scratch = np.empty((3, n))
+
+        # Per-parameter lookup tables, indexed by boosted (0/1) or by input byte
+        scale = self.move_scale
+        self._boost_step = np.array((self.boost_recharge_rate * self.dt, -self.boost_depletion_rate * self.dt))
+        self._jump_strength = np.array((self.car_jump_strength, self.car_jump_strength * 1.2))
+        self._speeds = np.array((self.base_movement_speed, self.base_movement_speed * self.boost_multiplier))
+        self._move_speeds = self._speeds * scale
+        turn_deg = self.rotation_speed * scale
+        self._turn_deg = _TURN * turn_deg
+        self._turn = np.where(_TURN != 0, np.cos(np.radians(turn_deg)), 1.0) + 1j * (_TURN * np.sin(np.radians(turn_deg)))
+        # planar car velocity in the heading's frame, indexed [boosted, byte]:
+        # times the heading it gives (vx + i vy) as Simulation._car_ball_impulse does
+        mult = np.where(_BOOSTING, self.boost_multiplier, 1.0)
+        self._push = self._speeds[:, None] * (_ALONG * mult - 1j * (_STRAFE * mult))
+        # contact effects are applied per tick of contact, so they scale with dt too
+        self._damage = round(20 * scale)
+        self._push_apart = np.array([[0.02], [-0.02]]) * scale
+        # planar ball friction per tick, indexed like _BOUNCE_VZ
+        self._ball_friction = np.array((self.air_friction, self.ball_friction, 0.98)) ** scale
+
+    def sim_time_ms(self):
+        return self.tick * self.dt * 1000.0
+
+    def reset(self, mask=None):
+        """Reset cars and ball of the matches selected by a boolean mask or index array (all if None)."""
+        if mask is None:
+            mask = slice(None)
+        self.car_pos[mask] = self.car_start
+        self.car_vz[mask] = 0.0
+        self.boost[mask] = self.boost_max
+        self.health[mask] = 100
+        self.ball_pos[mask] = self.ball_start
+        self.ball_vel[mask] = 0.0
+
+    def restart(self, mask=None):
+        """Start the selected matches over: reset() plus headings, scores and collision times."""
+        self.reset(mask)
+        if mask is None:
+            mask = slice(None)
+        self.car_angle[mask] = [ang for _, ang in CAR_STARTS]
+        rad = np.radians(self.car_angle[mask])
+        self._heading.T[mask] = np.cos(rad) + 1j * np.sin(rad)
+        self.scores[mask] = 0
+        self.last_collision_time[mask] = 0.0
+
+    # --------------------------
+    # Stepping
+    # --------------------------
+    def step_n(self, inputs, n):
+        """Advance n ticks with the same inputs, decoding them once."""
+        decoded = self._decode(inputs)
+        for _ in range(n):
+            self._step(decoded)
+
+    def step(self, inputs):
+        """Advance every match one tick. inputs: (N, 2) or (2,) packed input ints."""
+        self._step(self._decode(inputs))
+
+    def _decode(self, inputs):
+        codes = np.empty((2, self.n), dtype=np.uint8)
+        codes.T[:] = inputs
+        bits = self._bits
+        bits[:] = codes  # intp, for the lookup tables (in range, so mode="clip" never clips)
+        jumping = (codes & IN_JUMP) != 0
+        turn = self._turn_deg.take(bits, out=self._turning, mode="clip")
+        turning = turn.any()
+        if turning:
+            self._turn.take(bits, out=self._rotation, mode="clip")
+        return _Decoded(bits, (codes & IN_BOOST) != 0, jumping if jumping.any() else None,
+                        _ALONG.take(bits, out=self._along, mode="clip"),
+                        turn if turning else None, self._rotation if turning else None)
+
+    def _step(self, decoded):
+        n = self.n
+        bits = decoded.bits
+        boosting = decoded.boosting
+        dt = self.dt
+        tmp0, tmp1 = self._tmp
+        cx, cy, cz = self._car
+        vz = self._vz
+        boost = self._boost
+
+        # Jump (only when grounded)
+        if decoded.jumping is not None:
+            jumping = np.flatnonzero(decoded.jumping & (cz <= self.car_ground_z + 0.01))
+            if len(jumping):
+                fueled = boosting.take(jumping) & (boost.take(jumping) > 0)
+                vz.put(jumping, self._jump_strength.take(fueled.view(np.int8)))
+
+        # Boost meters: drain while boosting with fuel left, recharge otherwise
+        boost += self._boost_step.take((boosting & (boost > 0.0)).view(np.int8), out=tmp0, mode="clip")
+        np.clip(boost, 0.0, self.boost_max, out=boost)
+        boosted = (boosting & (boost > 0.0)).view(np.int8)
+
+        # Car vertical physics
+        vz += -9.8 * dt * 1.5
+        cz += np.multiply(vz, dt, out=tmp0)
+        airborne = cz >= self.car_ground_z
+        np.maximum(cz, self.car_ground_z, out=cz)
+        vz *= airborne
+
+        # Planar movement along the current heading, then rotate the heading by
+        # +-rotation_speed (the angle-sum identity, as a complex multiply)
+        heading = self._heading
+        step_len = self._move_speeds.take(boosted, out=tmp0, mode="clip")
+        step_len *= decoded.along
+        cx += np.multiply(step_len, heading.real, out=tmp1)
+        step_len *= heading.imag
+        cy += step_len
+        if decoded.turn is not None:
+            self._angle += decoded.turn
+            heading *= decoded.rotation
+        limit = self.arena_size / 2.0 - self.car_size / 2.0
+        planar = self._car[:2]
+        np.clip(planar, -limit, limit, out=planar)
+
+        # Car-ball contact: reject on x over all cars, exact closest-point test on
+        # the candidates left
+        half = self.car_size / 2.0
+        r = self.ball_radius
+        bx, by, bz = self._ball
+        gap = np.subtract(cx, bx, out=tmp0)
+        np.abs(gap, out=gap)
+        near = np.flatnonzero(gap < half + r)  # car * n + match, car 1s first
+        if len(near):
+            match = near % n
+            px = cx.take(near)
+            py = cy.take(near)
+            qx = bx.take(match)
+            qy = by.take(match)
+            dx = qx - np.clip(qx, px - half, px + half)
+            dy = qy - np.clip(qy, py - half, py + half)
+            hit = dx * dx + dy * dy < r * r
+            if hit.any():
+                ones = np.count_nonzero(hit[:np.searchsorted(near, n)])
+                self._car_ball_impulse(near[hit], match[hit], ones, bits, boosted, dx[hit], dy[hit])
+
+        # Car-car collision
+        size = 2.0 * half
+        dxcc = np.subtract(cx[0], cx[1], out=tmp0[0])
+        idx = np.flatnonzero(np.abs(dxcc, out=tmp1[0]) <= size)
+        if len(idx):
+            dycc = cy[0].take(idx) - cy[1].take(idx)
+            hit = np.abs(dycc) <= size
+            if hit.any():
+                idx = idx[hit]
+                health = self._health
+                health[:, idx] -= self._damage
+                cx[:, idx] += dxcc[idx] * self._push_apart
+                cy[:, idx] += dycc[hit] * self._push_apart
+                self.last_collision_time[idx] = self.sim_time_ms()
+                dead1 = health[0].take(idx) <= 0
+                dead2 = (health[1].take(idx) <= 0) & ~dead1  # a reset restores car 2's health first
+                if dead1.any() or dead2.any():
+                    self.scores[idx[dead1], 1] += 1
+                    self.scores[idx[dead2], 0] += 1
+                    self.reset(idx[dead1 | dead2])
+
+        self._update_ball(dt)
+        self.tick += 1
+
+    def _car_ball_impulse(self, flat, match, ones, bits, boosted, dx, dy):
+        # flat: car * n + match of the cars touching the ball, the first `ones`
+        # of them car 1s
+        car_v = self._push[boosted.take(flat), bits.take(flat)] * self._heading.take(flat)
+        car_speed = np.abs(car_v)
+
+        # Moving cars transfer momentum, near-static ones push along the overlap direction
+        scale = self.move_scale
+        push = car_v * ((0.6 + np.minimum(0.8, car_speed / 20.0)) * (0.15 * scale))
+        static = car_speed < 0.5
+        if static.any():
+            dir_len = np.sqrt(dx * dx + dy * dy)
+            dir_len[dir_len < 1e-5] = 1.0
+            push.real[static] = (dx / dir_len * (3.0 * scale))[static]
+            push.imag[static] = (dy / dir_len * (3.0 * scale))[static]
+        vz = self._vz.take(flat)
+
+        # Car 1 impulses before car 2 ones: the speed cap makes the order matter
+        # when both touch the ball
+        self._push_ball(match[:ones], push[:ones], vz[:ones])
+        self._push_ball(match[ones:], push[ones:], vz[ones:])
+        self.last_collision_time[match] = self.sim_time_ms()
+
+    def _push_ball(self, match, push, car_vz):
+        # at most one entry per match
+        if not len(match):
+            return
+        bvx, bvy, bvz = self._vel
+        lifting = car_vz > 2.0
+        if lifting.any():
+            bvz[match[lifting]] += car_vz[lifting] * 0.8 * 0.5 * self.move_scale
+        vx = push.real + bvx.take(match)
+        vy = push.imag + bvy.take(match)
+        # cap planar speed
+        sp = np.sqrt(vx * vx + vy * vy)
+        fast = sp > self.ball_max_speed
+        if fast.any():
+            s = self.ball_max_speed / sp[fast]
+            vx[fast] *= s
+            vy[fast] *= s
+        bvx[match] = vx
+        bvy[match] = vy
+
+    def _update_ball(self, dt):
+        bx, by, bz = self._ball
+        vx, vy, vz = self._vel
+        r = self.ball_radius
+
+        # Integration
+        vz += -9.8 * dt * 1.5
+        self._ball += np.multiply(self._vel, dt * 30.0, out=self._scratch)
+
+        # Ground contact: bounce, or settle and roll with friction; air friction otherwise
+        scratch = self._scratch
+        ground = bz <= r
+        np.maximum(bz, r, out=bz)
+        bounce = ground & (np.abs(vz, out=scratch[0]) > 1.0)
+        contact = ground.view(np.int8) + bounce
+        vz *= _BOUNCE_VZ.take(contact, out=scratch[0], mode="clip")
+        self._vel[:2] *= self._ball_friction.take(contact, out=scratch[0], mode="clip")
+
+        # Arena bounds (reflect with damping)
+        half = self.arena_size / 2.0
+        limit = half - r
+        planar = self._ball[:2]
+        extent = np.abs(planar, out=scratch[:2])
+        out = extent >= limit
+        if out.any():
+            np.copyto(planar, np.copysign(limit, planar), where=out)
+            self._vel[:2] *= np.where(out, -0.8, 1.0)
+
+        # Goal detection, on the matches with the ball near a goal line only
+        # (clamping above keeps those beyond the line there)
+        wide = np.flatnonzero(extent[0] > half - 30)
+        if len(wide):
+            goal = (by[wide] + vy[wide] * (dt * 30.0)) <= -160.0
+            goal &= bz[wide] <= r + 2.0
+            if goal.any():
+                wide = wide[goal]
+                right = bx[wide] > 0
+                self.scores[wide[right], 0] += 1
+                self.scores[wide[~right], 1] += 1
+                self.reset(wide)
@@ -0,0 +1,329 @@
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from batch import BatchSimulation
+from collision import (
+    check_collision_car_ball, check_collision_car_car,
+    check_collision_car_obstacle, check_collision_ball_obstacle,
+)
+from raster import _midpoint_line_2d, midpoint_line_2d, rasterize_segments, rect_segments
+from simulation import Simulation
+
+# --------------------------
+# Benchmark suite
+# --------------------------
+# Each benchmark is a function(scale) -> (ops, seconds): it does its own setup
+# outside the timed region and reports how many operations it timed. All
+# inputs come from fixed seeds. Every benchmark is repeated and the median
+# rate is kept, so two runs on one machine are comparable:
+#
+#   python bench.py run --out base.json
+#   python bench.py run --out new.json
+#   python bench.py compare base.json new.json --threshold 0.10
+#
+# compare exits non-zero when any benchmark slowed down by more than the
+# threshold. Rendering benchmarks need a GL window: on a headless box run the
+# suite under Xvfb (xvfb-run python bench.py run --render); Mesa then renders
+# with llvmpipe on the CPU. Without a display they are reported as skipped.
+# --------------------------
+BENCHMARKS = {}
+
+def benchmark(name):
+    def register(fn):
+        BENCHMARKS[name] = fn
+        return fn
+    return register
+
+def random_inputs(ticks, cars, seed=7):
+    rng = random.Random(seed)
+    return [[rng.randrange(64) for _ in range(cars)] for _ in range(ticks)]
+
+def timed_ticks(sim, inputs):
+    step = sim.step
+    start = time.perf_counter()
+    for bits in inputs:
+        step(bits)
+    return len(inputs), time.perf_counter() - start
+
+# --------------------------
+# Physics
+# --------------------------
+@benchmark("physics.tick_1v1")
+def bench_tick_1v1(scale):
+    return timed_ticks(Simulation(obstacle_count=0), random_inputs(int(20000 * scale), 2))
+
+@benchmark("physics.tick_1v1_obstacles")
+def bench_tick_obstacles(scale):
+    return timed_ticks(Simulation(), random_inputs(int(20000 * scale), 2))
+
+@benchmark("physics.tick_3v3")
+def bench_tick_3v3(scale):
+    return timed_ticks(Simulation(cars_per_team=3), random_inputs(int(10000 * scale), 6))
+
+@benchmark("physics.tick_15hz_ccd")
+def bench_tick_ccd(scale):
+    return timed_ticks(Simulation(dt=1.0 / 15), random_inputs(int(10000 * scale), 2))
+
+@benchmark("physics.batch_1024_match_ticks")
+def bench_batch(scale):
+    batch = BatchSimulation(1024)
+    rng = np.random.default_rng(7)
+    ticks = max(1, int(200 * scale))
+    inputs = rng.integers(0, 64, (ticks, 1024, 2))
+    start = time.perf_counter()
+    for bits in inputs:
+        batch.step(bits)
+    return ticks * 1024, time.perf_counter() - start
+
+# --------------------------
+# Collision
+# --------------------------
+def random_points(n, spread, seed):
+    rng = random.Random(seed)
+    return [[rng.uniform(-spread, spread), rng.uniform(-spread, spread), rng.uniform(15.0, 60.0)]
+            for _ in range(n)]
+
+@benchmark("collision.car_ball")
+def bench_car_ball(scale):
+    n = int(200000 * scale)
+    cars = random_points(n, 60.0, 1)
+    balls = random_points(n, 60.0, 2)
+    start = time.perf_counter()
+    for p, q in zip(cars, balls):
+        check_collision_car_ball(p, 40.0, q, 15.0)
+    return n, time.perf_counter() - start
+
+@benchmark("collision.car_car")
+def bench_car_car(scale):
+    n = int(200000 * scale)
+    a = random_points(n, 60.0, 1)
+    b = random_points(n, 60.0, 2)
+    start = time.perf_counter()
+    for p, q in zip(a, b):
+        check_collision_car_car(p, q, 40.0)
+    return n, time.perf_counter() - start
+
+@benchmark("collision.car_obstacle")
+def bench_car_obstacle(scale):
+    n = int(200000 * scale)
+    cars = random_points(n, 60.0, 1)
+    obs = (10.0, -5.0, 15.0, 45.0, 20.0, 30.0)
+    start = time.perf_counter()
+    for p in cars:
+        check_collision_car_obstacle(p, 40.0, obs)
+    return n, time.perf_counter() - start
+
+@benchmark("collision.ball_obstacle")
+def bench_ball_obstacle(scale):
+    n = int(200000 * scale)
+    balls = random_points(n, 60.0, 1)
+    obs = (10.0, -5.0, 15.0, 45.0, 20.0, 30.0)
+    start = time.perf_counter()
+    for p in balls:
+        check_collision_ball_obstacle(p, 15.0, obs)
+    return n, time.perf_counter() - start
+
+@benchmark("collision.apply_car_ball_collision")
+def bench_apply_car_ball(scale):
+    n = int(100000 * scale)
+    sim = Simulation(obstacle_count=0)
+    car = sim.cars[0]
+    car.moving[:] = [True, False, True, False]
+    car.boosting = True
+    positions = random_points(n, 25.0, 3)
+    start = time.perf_counter()
+    for p in positions:
+        sim.ball_position = p
+        sim.ball_velocity = [0.0, 0.0, 0.0]
+        car.position = [0.0, 0.0, 35.0]
+        sim.apply_car_ball_collision(car, 5.4)
+    return n, time.perf_counter() - start
+
+# --------------------------
+# HUD rasterization
+# --------------------------
+def random_segments(n, seed=5):
+    rng = random.Random(seed)
+    return [(rng.uniform(0, 1000), rng.uniform(0, 700), rng.uniform(0, 1000), rng.uniform(0, 700))
+            for _ in range(n)]
+
+@benchmark("raster.midpoint_line_2d_uncached")
+def bench_midpoint_uncached(scale):
+    segments = [tuple(int(round(v)) for v in s) for s in random_segments(int(2000 * scale))]
+    raw = _midpoint_line_2d.__wrapped__
+    start = time.perf_counter()
+    for s in segments:
+        raw(*s)
+    return len(segments), time.perf_counter() - start
+
+@benchmark("raster.midpoint_line_2d_cached")
+def bench_midpoint_cached(scale):
+    segments = rect_segments(30, 40, 200, 14) * int(25000 * scale)
+    midpoint_line_2d(*segments[0])
+    start = time.perf_counter()
+    for s in segments:
+        midpoint_line_2d(*s)
+    return len(segments), time.perf_counter() - start
+
+@benchmark("raster.rasterize_segments_bulk")
+def bench_rasterize(scale):
+    segments = np.array(random_segments(256))
+    runs = max(1, int(200 * scale))
+    start = time.perf_counter()
+    for _ in range(runs):
+        rasterize_segments(segments)
+    return runs * len(segments), time.perf_counter() - start
+
+# --------------------------
+# Full-frame rendering (needs a display, e.g. Xvfb)
+# --------------------------
+_frontend = None
+
+def load_frontend():
+    """Import the GLUT front end and open a hidden window once; None if there is no display."""
+    global _frontend
+    if _frontend is None:
+        if not os.environ.get("DISPLAY"):
+            return None
+        os.environ.setdefault("LIBGL_ALWAYS_SOFTWARE", "1")  # pin Mesa llvmpipe for comparable numbers
+        import importlib.util
+        from OpenGL.GLUT import glutHideWindow
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "group-1_project.py")
+        spec = importlib.util.spec_from_file_location("frontend", path)
+        frontend = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(frontend)
+        frontend.init_glut()
+        glutHideWindow()
+        frontend.governor.enabled = False  # always full detail, so runs stay comparable
+        _frontend = frontend
+    return _frontend
+
+def timed_frames(frames, step_physics):
+    from OpenGL.GL import glFinish
+    fe = load_frontend()
+    if fe is None:
+        return None
+    fe.render_scene()  # first frame builds the atlas and display lists
+    glFinish()
+    start = time.perf_counter()
+    for _ in range(frames):
+        if step_physics:
+            fe.update_physics()
+        fe.render_scene()
+    glFinish()
+    return frames, time.perf_counter() - start
+
+@benchmark("render.frame")
+def bench_frame(scale):
+    return timed_frames(max(1, int(60 * scale)), False)
+
+@benchmark("render.frame_with_physics")
+def bench_frame_physics(scale):
+    return timed_frames(max(1, int(60 * scale)), True)
+
+# --------------------------
+# Runner
+# --------------------------
+def git_revision():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)))
+        return out.stdout.strip() or None
+    except OSError:
+        return None
+
+def run(names, repeat, scale, render):
+    results = {}
+    for name in names:
+        if name.startswith("render.") and not render:
+            continue
+        rates = []
+        for _ in range(repeat):
+            timed = BENCHMARKS[name](scale)
+            if timed is None:
+                break
+            ops, seconds = timed
+            rates.append(ops / seconds)
+        if not rates:
+            print(f"{name:<40} skipped (no display)")
+            continue
+        median = statistics.median(rates)
+        spread = (max(rates) - min(rates)) / median if median else 0.0
+        results[name] = {"ops_per_sec": median, "runs": rates, "spread": spread}
+        print(f"{name:<40} {median:>14,.0f} ops/s  (+-{spread * 50:.1f}%)")
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "system": platform.platform(),
+            "revision": git_revision(),
+            "repeat": repeat,
+            "scale": scale,
+        },
+        "results": results,
+    }
+
+def compare(base, new, threshold):
+    """Print per-benchmark change; return the names that regressed by more than threshold."""
+    regressions = []
+    for name in sorted(set(base["results"]) | set(new["results"])):
+        a = base["results"].get(name)
+        b = new["results"].get(name)
+        if a is None or b is None:
+            print(f"{name:<40} {'only in ' + ('new' if a is None else 'base'):>14}")
+            continue
+        change = b["ops_per_sec"] / a["ops_per_sec"] - 1.0
+        flag = ""
+        if change < -threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        elif change > threshold:
+            flag = "  faster"
+        print(f"{name:<40} {change * 100:>+13.1f}%{flag}")
+    return regressions
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Benchmarks for physics, collision, HUD and rendering.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_run = sub.add_parser("run")
+    p_run.add_argument("--out", default=None, help="write results JSON here")
+    p_run.add_argument("--only", default=None, help="substring filter on benchmark names")
+    p_run.add_argument("--repeat", type=int, default=5)
+    p_run.add_argument("--scale", type=float, default=1.0, help="multiply the work per run")
+    p_run.add_argument("--render", action="store_true", help="include full-frame rendering")
+    p_cmp = sub.add_parser("compare")
+    p_cmp.add_argument("base")
+    p_cmp.add_argument("new")
+    p_cmp.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown (0.10 = 10%%)")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        names = [n for n in BENCHMARKS if args.only is None or args.only in n]
+        report = run(names, args.repeat, args.scale, args.render)
+        if args.out:
+            with open(args.out, "w") as f:
+                json.dump(report, f, indent=2)
+        return 0
+
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+    regressions = compare(base, new, args.threshold)
+    if regressions:
+        print(f"{len(regressions)} regression(s) beyond {args.threshold * 100:.0f}%")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
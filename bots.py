@@ -0,0 +1,339 @@
+import math
+import time
+import weakref
+from functools import lru_cache
+
+import numpy as np
+
+from predict import BallPredictor
+from simulation import IN_BACK, IN_BOOST, IN_FORWARD, IN_JUMP, IN_LEFT, IN_RIGHT
+
+# --------------------------
+# Lookup tables: how to drive to a point, and how long it takes
+# --------------------------
+# A target is described relative to the car by its heading error (degrees,
+# left positive) and distance. For every (error, distance) cell the tables
+# are built by rolling out a handful of driving policies in closed loop with
+# the car's own kinematics (move along the heading, then turn), all cells
+# at once with NumPy:
+#   drive   - forward, steering toward the target every tick
+#   pivot   - turn on the spot until roughly aligned, then drive
+#   reverse - back up, steering the rear toward the target
+# each with and without boost. REACH holds the fewest ticks any policy needs
+# to bring the target within touching range, ACTION the input bits of the
+# best policy at that cell. At run time a bot only bins the current target
+# and reads both tables; the turn radius falls out of the rollouts instead
+# of being searched for every tick.
+# --------------------------
+ERROR_STEP = 5.0
+DISTANCE_STEP = 10.0
+MAX_DISTANCE = 800.0
+MAX_TICKS = 400
+BOOST_PENALTY = 3  # ticks a boosted policy must save to be preferred (fuel is not free)
+PIVOT_TOLERANCE = 30.0
+DETOUR_MARGIN = 6.0  # clearance kept from obstacle corners when steering around them
+
+ERROR_BINS = int(360.0 / ERROR_STEP) + 1
+DISTANCE_BINS = int(MAX_DISTANCE / DISTANCE_STEP) + 1
+
+def _wrap(deg):
+    return (deg + 180.0) % 360.0 - 180.0
+
+class DriveTables:
+    def __init__(self, reach, action, boost):
+        self.reach = reach     # (ERROR_BINS, DISTANCE_BINS) ticks, MAX_TICKS = not reachable
+        self.action = action   # (ERROR_BINS, DISTANCE_BINS) input bits
+        self.boost = boost     # (ERROR_BINS, DISTANCE_BINS) best policy uses boost
+
+    @staticmethod
+    def bins(error_deg, distance):
+        e = np.rint((_wrap(error_deg) + 180.0) / ERROR_STEP).astype(np.intp)
+        d = np.minimum(np.rint(distance / DISTANCE_STEP), DISTANCE_BINS - 1).astype(np.intp)
+        return e, d
+
+@lru_cache(maxsize=8)
+def drive_tables(step_len, turn_deg, boost_multiplier, touch):
+    """step_len: units per tick at base speed; turn_deg: degrees per tick; touch: contact distance."""
+    errors = np.linspace(-180.0, 180.0, ERROR_BINS)
+    distances = np.arange(DISTANCE_BINS) * DISTANCE_STEP
+    e0, d0 = np.meshgrid(errors, distances, indexing="ij")
+    tx = (d0 * np.cos(np.radians(e0))).ravel()
+    ty = (d0 * np.sin(np.radians(e0))).ravel()
+
+    def policy_bits(kind, err):
+        turn = np.where(err > turn_deg / 2.0, IN_LEFT, np.where(err < -turn_deg / 2.0, IN_RIGHT, 0))
+        if kind == "drive":
+            return IN_FORWARD | turn
+        if kind == "pivot":
+            return np.where(np.abs(err) > PIVOT_TOLERANCE, turn, IN_FORWARD | turn)
+        rear = _wrap(err - 180.0)
+        return IN_BACK | np.where(rear > turn_deg / 2.0, IN_LEFT, np.where(rear < -turn_deg / 2.0, IN_RIGHT, 0))
+
+    def rollout(kind, boost):
+        speed = step_len * (boost_multiplier if boost else 1.0)
+        x = np.zeros_like(tx)
+        y = np.zeros_like(tx)
+        heading = np.zeros_like(tx)
+        ticks = np.full(tx.shape, MAX_TICKS)
+        live = np.hypot(tx, ty) > touch
+        ticks[~live] = 0
+        for t in range(1, MAX_TICKS):
+            if not live.any():
+                break
+            err = _wrap(np.degrees(np.arctan2(ty - y, tx - x)) - heading)
+            bits = policy_bits(kind, err)
+            along = np.where(bits & IN_FORWARD, 1.0, 0.0) - np.where(bits & IN_BACK, 0.6, 0.0)
+            rad = np.radians(heading)
+            x = np.where(live, x + speed * along * np.cos(rad), x)
+            y = np.where(live, y + speed * along * np.sin(rad), y)
+            turn = np.where(bits & IN_LEFT, 1.0, 0.0) - np.where(bits & IN_RIGHT, 1.0, 0.0)
+            heading = np.where(live, heading + turn_deg * turn, heading)
+            arrived = live & (np.hypot(tx - x, ty - y) <= touch)
+            ticks[arrived] = t
+            live &= ~arrived
+        first = policy_bits(kind, e0.ravel())
+        return ticks, first | (IN_BOOST if boost else 0)
+
+    results = [rollout(kind, boost) for kind in ("drive", "pivot", "reverse") for boost in (False, True)]
+    cost = np.stack([t + (BOOST_PENALTY if i % 2 else 0) for i, (t, _) in enumerate(results)])
+    best = np.argmin(cost, axis=0)
+    cells = np.arange(best.size)
+    reach = np.min(np.stack([t for t, _ in results]), axis=0)
+    action = np.stack([a for _, a in results])[best, cells]
+    shape = (ERROR_BINS, DISTANCE_BINS)
+    return DriveTables(reach.reshape(shape), action.reshape(shape), (best % 2 == 1).reshape(shape))
+
+def _segment_enters(px, py, dx, dy, box):
+    # slab test: fraction along (px, py) + t*(dx, dy), 0 <= t <= 1, where the segment
+    # first touches the box (0 if it starts inside), or None if it misses
+    t0, t1 = 0.0, 1.0
+    for p, d, lo, hi in ((px, dx, box[0], box[2]), (py, dy, box[1], box[3])):
+        if d == 0.0:
+            if p < lo or p > hi:
+                return None
+            continue
+        a = (lo - p) / d
+        b = (hi - p) / d
+        if a > b:
+            a, b = b, a
+        t0 = max(t0, a)
+        t1 = min(t1, b)
+        if t0 > t1:
+            return None
+    return t0
+
+def tables_for(sim):
+    return drive_tables(sim.base_movement_speed * sim.move_scale, sim.rotation_speed * sim.move_scale,
+                        sim.boost_multiplier, sim.car_size / 2.0 + sim.ball_radius)
+
+_predictors = weakref.WeakKeyDictionary()  # sim -> {horizon: BallPredictor}
+
+def shared_predictor(sim, horizon):
+    """One BallPredictor per sim and horizon, so the bots of a match recompute the path once per touch."""
+    by_horizon = _predictors.setdefault(sim, {})
+    predictor = by_horizon.get(horizon)
+    if predictor is None:
+        predictor = by_horizon[horizon] = BallPredictor(sim, horizon=horizon)
+    return predictor
+
+# --------------------------
+# Bot controller
+# --------------------------
+# Per tick: take the cached ball prediction (predict.py), find the first
+# predicted tick at which the table says the car can already be there, aim a
+# little behind that point on the side away from the goal being attacked
+# (the goal rule counts the +x, -y corner for team 0 and the -x, -y corner
+# for team 1), then read the action for that aim point. When an obstacle or
+# an opposing car blocks the straight line to the aim point, the bot heads
+# for the nearest corner of its grown footprint first.
+#
+# Everything a Bot does depends only on the match state, so the same match
+# always plays out the same way (sweeps cache results by configuration). The
+# bots of one match share its ball prediction, so a touch costs one
+# recompute, not one per bot.
+#
+# BUDGET is enforced by BudgetedController. For sweeps, servers and netplay
+# (bot()) its clock is the Bot's modelled cost: each call is charged for the
+# work it did, priced below in seconds as measured on a development
+# machine, so which ticks are sat out depends only on the match and runs
+# stay reproducible. Only the live game loop (realtime_bot) charges
+# wall-clock time. Either way a single call may run over; the debt is paid
+# back by repeating the last action, which holds the average to BUDGET.
+# --------------------------
+BUDGET = 0.0002  # seconds per tick
+SCAN_POINTS = 120
+CALL_COST = 60e-6     # intercept scan, aiming and table lookups
+BOX_COST = 3e-6       # per box tested for a detour
+STRETCH_COST = 55e-6  # per closed-form stretch when the ball prediction is recomputed
+
+class Bot:
+    """
+    scan_points: predicted ball positions tested for an intercept each tick
+    horizon: ticks of ball prediction kept (at least scan_points)
+    """
+
+    def __init__(self, scan_points=SCAN_POINTS, horizon=180):
+        self.scan_points = scan_points
+        self.horizon = max(horizon, scan_points)
+        self._sim = None
+        self._predictor = None
+        self._tables = None
+        self._boxes = []
+        self.work = 0.0  # modelled seconds spent so far (see work_clock)
+
+    def attach(self, sim):
+        """Build the tables and predictor for sim (one-off; BudgetedController does not charge it)."""
+        self._sim = sim
+        self._predictor = shared_predictor(sim, self.horizon + 60)
+        self._tables = tables_for(sim)
+        # obstacle footprints grown by the car's half size: the car centre must stay outside
+        grow = sim.car_size / 2.0 + DETOUR_MARGIN
+        self._boxes = [(o[0] - o[3] / 2.0 - grow, o[1] - o[4] / 2.0 - grow,
+                        o[0] + o[3] / 2.0 + grow, o[1] + o[4] / 2.0 + grow) for o in sim.obstacles]
+
+    def work_clock(self):
+        """Modelled seconds of work done so far: a deterministic clock for BudgetedController."""
+        return self.work
+
+    def _detour(self, cx, cy, tx, ty, boxes):
+        """Waypoint around the first box blocking the straight line to (tx, ty), or the target itself."""
+        dx = tx - cx
+        dy = ty - cy
+        first = None
+        for box in boxes:
+            t = _segment_enters(cx, cy, dx, dy, box)
+            if t is not None and (first is None or t < first[0]):
+                first = (t, box)
+        if first is None:
+            return tx, ty
+        x0, y0, x1, y1 = first[1]
+        return min(((x, y) for x in (x0, x1) for y in (y0, y1)),
+                   key=lambda c: math.hypot(c[0] - cx, c[1] - cy) + math.hypot(tx - c[0], ty - c[1]))
+
+    def __call__(self, sim, index):
+        if sim is not self._sim:
+            self.attach(sim)
+        car = sim.cars[index]
+        tables = self._tables
+        cx, cy = car.position[0], car.position[1]
+        heading = car.angle
+        ball = sim.ball_position
+        target_x, target_y = ball[0], ball[1]
+        target_z = ball[2]
+
+        # intercept: first predicted point the car can reach in time
+        predictor = self._predictor
+        misses = predictor.misses
+        prediction = predictor.get()
+        path = prediction.path_from(sim.tick)[1:self.scan_points + 1]
+        if len(path):
+            dx = path[:, 0] - cx
+            dy = path[:, 1] - cy
+            e, d = DriveTables.bins(np.degrees(np.arctan2(dy, dx)) - heading, np.hypot(dx, dy))
+            ok = tables.reach[e, d] <= np.arange(1, len(path) + 1)
+            k = int(np.argmax(ok)) if ok.any() else len(path) - 1
+            target_x, target_y, target_z = path[k]
+
+        # line up behind the ball on the far side from the goal being attacked,
+        # so the contact impulse (car centre to ball centre) points at it
+        gx = (1.0 if car.team == 0 else -1.0) * sim.arena_size / 2.0
+        gy = -sim.arena_size / 2.0
+        ux = gx - target_x
+        uy = gy - target_y
+        norm = math.hypot(ux, uy) or 1.0
+        back = sim.ball_radius + sim.car_size / 4.0
+        target_x -= ux / norm * back
+        target_y -= uy / norm * back
+
+        # opponents count as obstacles too: every car-car contact costs health
+        grow = sim.car_size + DETOUR_MARGIN
+        boxes = self._boxes + [(o.position[0] - grow, o.position[1] - grow, o.position[0] + grow, o.position[1] + grow)
+                               for o in sim.cars if o.team != car.team]
+        target_x, target_y = self._detour(cx, cy, target_x, target_y, boxes)
+        self.work += CALL_COST + BOX_COST * len(boxes)
+        if predictor.misses != misses:
+            self.work += STRETCH_COST * prediction.stretches
+        for o in sim.cars:
+            ox = cx - o.position[0]
+            oy = cy - o.position[1]
+            if o.team != car.team and abs(ox) < grow and abs(oy) < grow:
+                # already in contact range: get clear before anything else
+                norm = math.hypot(ox, oy) or 1.0
+                target_x = cx + ox / norm * grow
+                target_y = cy + oy / norm * grow
+                break
+        dx = target_x - cx
+        dy = target_y - cy
+        dist = math.hypot(dx, dy)
+        error = _wrap(math.degrees(math.atan2(dy, dx)) - heading)
+        e = int(round((error + 180.0) / ERROR_STEP))
+        d = min(int(round(dist / DISTANCE_STEP)), DISTANCE_BINS - 1)
+        bits = int(tables.action[e, d])
+        if bits & IN_BOOST and car.boost <= 0.0:
+            bits &= ~IN_BOOST
+        if target_z > sim.ball_radius + 20.0 and dist < sim.car_size:
+            bits |= IN_JUMP
+        return bits
+
+class BudgetedController:
+    """
+    Wraps any controller and holds it to `budget` seconds per tick as measured
+    by clock: a call that runs over is still used, but the controller then
+    sits out the ticks its overrun paid for (at most max_skip), repeating its
+    last action, so the average stays within budget. One-off setup (the
+    controller's attach(sim), if it has one) is not charged; call attach()
+    up front to keep it off the first tick. overruns / skipped count how
+    often the budget had to be enforced.
+
+    With the default wall clock, which ticks get skipped depends on the
+    machine and its load, so a wrapped controller is no longer deterministic;
+    a clock that counts modelled work (Bot.work_clock) keeps it so.
+    """
+
+    def __init__(self, controller, budget=BUDGET, max_skip=10, clock=time.perf_counter):
+        self.controller = controller
+        self.budget = budget
+        self.max_skip = max_skip
+        self.clock = clock
+        self._sim = None
+        self.last = 0
+        self.debt = 0.0
+        self.calls = 0
+        self.overruns = 0
+        self.skipped = 0
+        self.worst = 0.0
+
+    def attach(self, sim):
+        self._sim = sim
+        attach = getattr(self.controller, "attach", None)
+        if attach is not None:
+            attach(sim)
+
+    def __call__(self, sim, index):
+        if self.debt > 0.0:
+            self.debt -= self.budget
+            self.skipped += 1
+            return self.last
+        if sim is not self._sim:
+            self.attach(sim)
+        start = self.clock()
+        self.last = self.controller(sim, index)
+        elapsed = self.clock() - start
+        self.calls += 1
+        self.worst = max(self.worst, elapsed)
+        if elapsed > self.budget:
+            self.overruns += 1
+            self.debt = min(self.debt + elapsed - self.budget, self.max_skip * self.budget)
+        return self.last
+
+def bot(seed=0, budget=BUDGET):
+    """
+    Controller factory (see controllers.py): a Bot held to budget seconds per
+    tick of modelled work, so it stays deterministic; it has no use for the seed.
+    """
+    controller = Bot()
+    return BudgetedController(controller, budget, clock=controller.work_clock)
+
+def realtime_bot(budget=BUDGET):
+    """A Bot held to budget seconds of wall-clock time per tick, for the live game loop."""
+    return BudgetedController(Bot(), budget)
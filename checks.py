@@ -0,0 +1,236 @@
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from batch import BatchSimulation
+from bots import BUDGET, bot
+from netplay import LossyLink, NetPeer, RollbackSession
+from predict import BallPredictor
+from replay import InputRecorder, Replay, state_digest
+from simulation import Simulation
+
+# --------------------------
+# Regression checks
+# --------------------------
+# Small deterministic checks of what the rest of the code relies on: replays
+# and seeks are bit-identical, rollback peers end on the state of a plain
+# run, the batch engine tracks the scalar one, the cached ball prediction
+# stays on the simulated path, and budgeted bots replay exactly. Each check
+# is a function() that raises AssertionError on a mismatch; all inputs come
+# from fixed seeds and nothing reads a real clock or socket, so a run gives
+# the same answer on every machine:
+#
+#   python checks.py                 every check
+#   python checks.py --only replay   names containing "replay"
+#
+# The exit status is the number of failed checks.
+# --------------------------
+CHECKS = {}
+
+def check(name):
+    def register(fn):
+        CHECKS[name] = fn
+        return fn
+    return register
+
+def random_inputs(ticks, cars, seed=7):
+    rng = random.Random(seed)
+    return [[rng.randrange(64) for _ in range(cars)] for _ in range(ticks)]
+
+# --------------------------
+# Replay
+# --------------------------
+@check("replay.bit_identical_with_seek")
+def check_replay():
+    # record like the front end: a reset is flagged on the tick after it
+    ticks = 1500
+    reset_at = 700
+    sim = Simulation(seed=99)
+    digests = {0: state_digest(sim)}
+    fd, path = tempfile.mkstemp(suffix=".rlrp")
+    os.close(fd)
+    try:
+        recorder = InputRecorder(path, sim)
+        for tick, inputs in enumerate(random_inputs(ticks, 2)):
+            if tick == reset_at:
+                recorder.mark_reset()
+                sim.reset()
+            recorder.record(inputs)
+            sim.step(inputs)
+            digests[sim.tick] = state_digest(sim)
+        recorder.close()
+
+        replay = Replay(path, keyframe_interval=200)
+        replay.run()
+        assert state_digest(replay.sim) == digests[ticks], "replay ends on a different state"
+        for tick in (1234, 650, 701, 0, ticks):  # backward, across the reset, forward
+            replay.seek(tick)
+            assert replay.tick == tick
+            assert state_digest(replay.sim) == digests[tick], f"seek to {tick} differs from the live run"
+    finally:
+        os.remove(path)
+
+# --------------------------
+# Rollback netcode
+# --------------------------
+class _Wire:
+    """Stands in for a UDP transport: a datagram arrives 0..max_delay rounds after it is sent."""
+
+    def __init__(self, rng, max_delay):
+        self.rng = rng
+        self.max_delay = max_delay
+        self.round = 0
+        self.in_flight = []  # (arrival round, data)
+
+    def sendto(self, data, addr):
+        self.in_flight.append((self.round + self.rng.randint(0, self.max_delay), data))
+
+    def is_closing(self):
+        return False
+
+    def arrived(self):
+        due = [data for when, data in self.in_flight if when <= self.round]
+        self.in_flight = [item for item in self.in_flight if item[0] > self.round]
+        return due
+
+@check("netplay.rollback_peers_match_plain_run")
+def check_rollback():
+    ticks = 600
+    inputs = random_inputs(ticks, 2, seed=11)
+    rng = random.Random(3)
+    sessions = [RollbackSession(Simulation(seed=5), side, max_rollback=8) for side in (0, 1)]
+    peers = [NetPeer(s, None, LossyLink(loss=0.25, seed=side)) for side, s in enumerate(sessions)]
+    wires = [_Wire(rng, 6) for _ in peers]  # wires[side] carries side's datagrams to the other
+    for peer, wire in zip(peers, wires):
+        peer.connection_made(wire)
+
+    def done(side):
+        s = sessions[side]
+        return s.sim.tick >= ticks and s.confirmed >= ticks - 1 and peers[side].peer_ack >= ticks - 1
+
+    for _ in range(20 * ticks):
+        if done(0) and done(1):
+            break
+        for side, (session, peer) in enumerate(zip(sessions, peers)):
+            for data in wires[1 - side].arrived():
+                peer.datagram_received(data, None)
+            tick = session.sim.tick
+            if tick < ticks and session.can_advance():
+                session.advance(inputs[tick][side])
+            peer.send_inputs()
+        for wire in wires:
+            wire.round += 1
+    assert done(0) and done(1), "peers never confirmed every tick"
+    assert sum(s.rollbacks for s in sessions) > 0, "no rollback was exercised"
+
+    plain = Simulation(seed=5)
+    for bits in inputs:
+        plain.step(bits)
+    for session in sessions:
+        session.sync()
+        assert state_digest(session.sim) == state_digest(plain), f"peer {session.local} desynced"
+
+# --------------------------
+# Batch engine
+# --------------------------
+def compare_batch(n, ticks, **params):
+    rng = np.random.default_rng(17)
+    inputs = rng.integers(0, 64, (ticks, n, 2))
+    batch = BatchSimulation(n, **params)
+    sims = [Simulation(obstacle_count=0, **params) for _ in range(n)]
+    for bits in inputs:
+        batch.step(bits)
+        for sim, b in zip(sims, bits.tolist()):
+            sim.step(b)
+    car_pos = np.array([[c.position for c in sim.cars] for sim in sims])
+    ball_pos = np.array([sim.ball_position for sim in sims])
+    scores = np.array([sim.scores for sim in sims])
+    assert np.array_equal(batch.scores, scores), "scores differ from the scalar engine"
+    assert scores.any(), "no goal or wreck was exercised"
+    assert np.abs(batch.car_pos - car_pos).max() < 1e-8, "car positions drift from the scalar engine"
+    assert np.abs(batch.ball_pos - ball_pos).max() < 1e-8, "ball positions drift from the scalar engine"
+
+@check("batch.matches_scalar")
+def check_batch():
+    compare_batch(32, 3000)
+
+@check("batch.matches_scalar_15hz")
+def check_batch_15hz():
+    compare_batch(32, 1000, dt=1.0 / 15, continuous_collision=False)
+
+# --------------------------
+# Ball prediction
+# --------------------------
+def compare_prediction(ticks, **params):
+    # the ball bounces between the y walls, clear of the cars (x = +-200), so
+    # nothing but walls and ground touches it and the first prediction must hold
+    sim = Simulation(obstacle_count=0, **params)
+    sim.ball_velocity = [1.0, 30.0, 3.0]
+    predictor = BallPredictor(sim, horizon=ticks, refresh_margin=0)
+    first = predictor.get()
+    walls = 0
+    for _ in range(ticks):
+        vy = sim.ball_velocity[1]
+        sim.step((0, 0))
+        walls += (vy > 0.0) != (sim.ball_velocity[1] > 0.0)
+        p = predictor.get()
+        assert p is first, f"prediction recomputed at tick {sim.tick} without a touch"
+        error = np.abs(np.subtract(p.at(sim.tick), sim.ball_position)).max()
+        assert error < 1e-6, f"prediction is {error:.3g} off the ball at tick {sim.tick}"
+    assert walls >= 2, "the ball never hit a wall"
+
+@check("predict.matches_simulation")
+def check_prediction():
+    compare_prediction(240)
+
+@check("predict.matches_simulation_15hz_ccd")
+def check_prediction_15hz():
+    compare_prediction(60, dt=1.0 / 15)
+
+# --------------------------
+# Bots
+# --------------------------
+def bot_match(ticks):
+    sim = Simulation(cars_per_team=3)
+    drivers = [bot(i) for i in range(len(sim.cars))]
+    for _ in range(ticks):
+        sim.step([drive(sim, i) for i, drive in enumerate(drivers)])
+    return state_digest(sim), drivers
+
+@check("bots.budgeted_and_deterministic")
+def check_bots():
+    ticks = 600
+    digest, drivers = bot_match(ticks)
+    assert bot_match(ticks)[0] == digest, "the same bot match played out differently"
+    for d in drivers:
+        assert d.controller.work <= BUDGET * ticks, f"modelled work {d.controller.work:.4f}s is over budget"
+
+# --------------------------
+# Runner
+# --------------------------
+def main(argv):
+    parser = argparse.ArgumentParser(description="Deterministic regression checks.")
+    parser.add_argument("--only", default=None, help="substring filter on check names")
+    args = parser.parse_args(argv)
+
+    failed = 0
+    for name, fn in CHECKS.items():
+        if args.only is not None and args.only not in name:
+            continue
+        start = time.perf_counter()
+        try:
+            fn()
+        except AssertionError as e:
+            failed += 1
+            print(f"{name:<45} FAIL  {e}")
+            continue
+        print(f"{name:<45} ok    {time.perf_counter() - start:.1f}s")
+    return failed
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
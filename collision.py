@@ -0,0 +1,123 @@
+import math
+
+# --------------------------
+# Collision detection (AABB / closest-point)
+# --------------------------
+def aabb_collision_2d(center_a, half_a_x, half_a_y, center_b, half_b_x, half_b_y):
+    return (abs(center_a[0] - center_b[0]) <= (half_a_x + half_b_x)) and \
+           (abs(center_a[1] - center_b[1]) <= (half_a_y + half_b_y))
+
+def check_collision_car_ball(car_pos, car_size_val, ball_pos, ball_r):
+    car_half = car_size_val / 2.0
+    closest_x = max(car_pos[0] - car_half, min(ball_pos[0], car_pos[0] + car_half))
+    closest_y = max(car_pos[1] - car_half, min(ball_pos[1], car_pos[1] + car_half))
+    dx = ball_pos[0] - closest_x
+    dy = ball_pos[1] - closest_y
+    dist2 = dx*dx + dy*dy
+    return dist2 < (ball_r * ball_r), dx, dy
+
+def check_collision_car_car(car1_pos_local, car2_pos_local, size_val):
+    half = size_val / 2.0
+    collided = aabb_collision_2d(car1_pos_local, half, half, car2_pos_local, half, half)
+    dx = car1_pos_local[0] - car2_pos_local[0]
+    dy = car1_pos_local[1] - car2_pos_local[1]
+    return collided, dx, dy
+
+def check_collision_car_obstacle(car_pos, car_size_val, obs):
+    obs_pos = [obs[0], obs[1], obs[2]]
+    obs_w, obs_h, obs_d = obs[3], obs[4], obs[5]
+    car_half = car_size_val / 2.0
+    obs_half_w = obs_w / 2.0
+    obs_half_h = obs_h / 2.0
+    obs_half_d = obs_d / 2.0
+    overlap_xy = (car_pos[0] - car_half) < (obs_pos[0] + obs_half_w) and \
+                 (car_pos[0] + car_half) > (obs_pos[0] - obs_half_w) and \
+                 (car_pos[1] - car_half) < (obs_pos[1] + obs_half_h) and \
+                 (car_pos[1] + car_half) > (obs_pos[1] - obs_half_h)
+    overlap_z = (car_pos[2] - car_half / 2.0) < (obs_pos[2] + obs_half_d) and \
+                (car_pos[2] + car_half / 2.0) > (obs_pos[2] - obs_half_d)
+    if overlap_xy and overlap_z:
+        dx = car_pos[0] - obs_pos[0]
+        dy = car_pos[1] - obs_pos[1]
+        return True, dx, dy
+    return False, 0.0, 0.0
+
+def check_collision_ball_obstacle(ball_pos, ball_r, obs):
+    obs_pos = [obs[0], obs[1], obs[2]]
+    obs_w, obs_h, obs_d = obs[3], obs[4], obs[5]
+    closest_x = max(obs_pos[0] - obs_w/2.0, min(ball_pos[0], obs_pos[0] + obs_w/2.0))
+    closest_y = max(obs_pos[1] - obs_h/2.0, min(ball_pos[1], obs_pos[1] + obs_h/2.0))
+    dx = ball_pos[0] - closest_x
+    dy = ball_pos[1] - closest_y
+    dist2 = dx*dx + dy*dy
+    return dist2 < (ball_r * ball_r), dx, dy
+
+# --------------------------
+# Continuous collision (time of impact over one tick)
+# --------------------------
+# Positions move by a displacement d over the tick; the functions return the
+# fraction t in [0, 1] of d at which first contact happens (plus the contact
+# normal), or None if the sphere gets through the whole tick untouched.
+# Objects already overlapping at t = 0 are left to the discrete checks above.
+# --------------------------
+def sweep_sphere_plane(center, d, radius, normal, offset):
+    """Sphere moving by d against the plane normal . x = offset, approached from the normal side."""
+    dist = normal[0]*center[0] + normal[1]*center[1] + normal[2]*center[2] - offset - radius
+    approach = normal[0]*d[0] + normal[1]*d[1] + normal[2]*d[2]
+    if dist < 0.0 or approach >= 0.0:
+        return None
+    t = dist / -approach
+    if t > 1.0:
+        return None
+    return t
+
+def sweep_circle_aabb(px, py, dx, dy, radius, min_x, min_y, max_x, max_y):
+    """
+    Sphere vs AABB in the xy plane (the same footprint check_collision_car_ball
+    uses): slab test against the box grown by radius, then, if the entry point
+    lands in a corner region, an exact ray test against the rounded corner.
+    Returns (t, nx, ny) or None.
+    """
+    t_enter = 0.0
+    t_exit = 1.0
+    nx = ny = 0.0
+    for p, dp, lo, hi, axis in ((px, dx, min_x - radius, max_x + radius, 0),
+                                (py, dy, min_y - radius, max_y + radius, 1)):
+        if abs(dp) < 1e-12:
+            if p < lo or p > hi:
+                return None
+            continue
+        t0 = (lo - p) / dp
+        t1 = (hi - p) / dp
+        n = -1.0
+        if t0 > t1:
+            t0, t1 = t1, t0
+            n = 1.0
+        if t0 > t_enter:
+            t_enter = t0
+            nx, ny = (n, 0.0) if axis == 0 else (0.0, n)
+        t_exit = min(t_exit, t1)
+        if t_enter > t_exit:
+            return None
+    hx = px + dx * t_enter
+    hy = py + dy * t_enter
+    corner_x = min_x if hx < min_x else (max_x if hx > max_x else None)
+    corner_y = min_y if hy < min_y else (max_y if hy > max_y else None)
+    if corner_x is None or corner_y is None:
+        if nx == 0.0 and ny == 0.0:
+            return None  # overlapping from the start
+        return t_enter, nx, ny
+
+    # rounded corner: solve |p + d t - c| = radius for the first root
+    ox = px - corner_x
+    oy = py - corner_y
+    a = dx*dx + dy*dy
+    b = ox*dx + oy*dy
+    c = ox*ox + oy*oy - radius*radius
+    disc = b*b - a*c
+    if c <= 0.0 or disc < 0.0 or a < 1e-12:
+        return None
+    t = (-b - math.sqrt(disc)) / a
+    if t < 0.0 or t > 1.0:
+        return None
+    return t, (ox + dx*t) / radius, (oy + dy*t) / radius
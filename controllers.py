@@ -0,0 +1,53 @@
+import math
+import random
+
+from bots import bot
+from simulation import IN_BOOST, IN_FORWARD, IN_LEFT, IN_RIGHT
+
+# --------------------------
+# Scripted controllers
+# --------------------------
+# A controller is built per match as factory(seed) and then called once per
+# tick as controller(sim, index) -> packed input int for sim.cars[index].
+# CONTROLLERS maps the names used on the command line (see sweep.py) to
+# factories.
+# --------------------------
+def idle(seed=0):
+    return lambda sim, index: 0
+
+def random_inputs(seed=0, hold=15):
+    """Random key combinations, each held for `hold` ticks like a button masher."""
+    rng = random.Random(seed)
+    state = {"bits": 0, "left": 0}
+
+    def control(sim, index):
+        if state["left"] <= 0:
+            state["bits"] = rng.randrange(64)
+            state["left"] = hold
+        state["left"] -= 1
+        return state["bits"]
+    return control
+
+def chase_ball(seed=0, boost_range=150.0):
+    """Turn toward the ball and drive at it, boosting when far away."""
+    def control(sim, index):
+        car = sim.cars[index]
+        dx = sim.ball_position[0] - car.position[0]
+        dy = sim.ball_position[1] - car.position[1]
+        error = (math.degrees(math.atan2(dy, dx)) - car.angle + 180.0) % 360.0 - 180.0
+        bits = IN_FORWARD
+        if error > sim.rotation_speed:
+            bits |= IN_LEFT
+        elif error < -sim.rotation_speed:
+            bits |= IN_RIGHT
+        if dx * dx + dy * dy > boost_range * boost_range and abs(error) < 20.0:
+            bits |= IN_BOOST
+        return bits
+    return control
+
+CONTROLLERS = {
+    "idle": idle,
+    "random": random_inputs,
+    "chaser": chase_ball,
+    "bot": bot,
+}
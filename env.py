@@ -0,0 +1,270 @@
+import multiprocessing as mp
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from batch import BatchSimulation
+from simulation import Simulation
+
+# --------------------------
+# Reinforcement-learning environments
+# --------------------------
+# The agent drives car 0 (green) with one packed input int per tick, i.e. an
+# action in range(N_ACTIONS) built like pack_input(moving, boosting, jump).
+# Car 1 takes a fixed input or a policy. Observations are float32 vectors,
+# all from car 0's side:
+#   [0:8]   own car   x, y, z (/ half arena), cos, sin (heading), vz, boost, health (0..1)
+#   [8:16]  opponent  same layout
+#   [16:19] ball position (/ half arena)
+#   [19:22] ball velocity (/ ball_max_speed)
+# A goal ends the episode with reward +1 (scored) or -1 (conceded); reaching
+# max_ticks truncates it with reward 0. The API follows gymnasium: reset()
+# returns (obs, info), step() returns (obs, reward, terminated, truncated, info).
+# --------------------------
+N_ACTIONS = 64
+OBS_SIZE = 22
+
+def _fill_car_obs(out, half, boost_max, x, y, z, angle_deg, vz, boost, health):
+    rad = np.radians(angle_deg)
+    out[..., 0] = x / half
+    out[..., 1] = y / half
+    out[..., 2] = z / half
+    out[..., 3] = np.cos(rad)
+    out[..., 4] = np.sin(rad)
+    out[..., 5] = vz
+    out[..., 6] = boost / boost_max
+    out[..., 7] = health / 100.0
+
+class MatchEnv:
+    """
+    Single 1v1 match on the scalar Simulation.
+    opponent: input int for car 1, or a callable(obs_from_car_1_side) -> input int.
+    Obstacles are off by default so that it plays the same match as one env of
+    VectorEnv; pass obstacle_count to add them (seed picks their layout).
+    """
+
+    def __init__(self, opponent=0, max_ticks=60 * 60, seed=1234, **params):
+        params.setdefault("obstacle_count", 0)
+        self.opponent = opponent
+        self.max_ticks = max_ticks
+        self._params = params
+        self._new_sim(seed)
+        self._obs = np.zeros(OBS_SIZE, dtype=np.float32)
+        self._opp_obs = np.zeros(OBS_SIZE, dtype=np.float32)
+        self._ticks = 0
+
+    def observe(self, side=0, out=None):
+        sim = self.sim
+        if out is None:
+            out = np.zeros(OBS_SIZE, dtype=np.float32)
+        half = sim.arena_size / 2.0
+        for slot, car in ((0, sim.cars[side]), (8, sim.cars[1 - side])):
+            p = car.position
+            _fill_car_obs(out[slot:slot + 8], half, sim.boost_max,
+                          p[0], p[1], p[2], car.angle, car.vz, car.boost, car.health)
+        out[16:19] = sim.ball_position
+        out[16:19] /= half
+        out[19:22] = sim.ball_velocity
+        out[19:22] /= sim.ball_max_speed
+        return out
+
+    def _new_sim(self, seed):
+        self.sim = Simulation(seed=seed, **self._params)
+        self._start = self.sim.save_state()
+
+    def reset(self, seed=None):
+        """Start over; a seed rebuilds the match with that rng (obstacle layout)."""
+        if seed is not None:
+            self._new_sim(seed)
+        self.sim.restore_state(self._start)
+        self._ticks = 0
+        return self.observe(0, self._obs).copy(), {}
+
+    def step(self, action):
+        sim = self.sim
+        opponent = self.opponent
+        if callable(opponent):
+            opponent = opponent(self.observe(1, self._opp_obs))
+        before = tuple(sim.scores)
+        sim.step((int(action), int(opponent)))
+        self._ticks += 1
+        reward = float((sim.scores[0] - before[0]) - (sim.scores[1] - before[1]))
+        terminated = reward != 0.0
+        truncated = not terminated and self._ticks >= self.max_ticks
+        return self.observe(0, self._obs).copy(), reward, terminated, truncated, {"scores": tuple(sim.scores)}
+
+# --------------------------
+# Vectorized environment
+# --------------------------
+# num_envs matches are split into contiguous slices, each stepped as one
+# BatchSimulation (so no obstacles) by a worker process. Actions, observations,
+# rewards and done flags live in one shared-memory block that every process
+# maps as NumPy arrays; the pipes only carry a one-word command and an ack, so
+# nothing per-env is ever pickled. Finished matches restart automatically and
+# report the first observation of the next episode.
+# --------------------------
+def _layout(num_envs):
+    """(name, dtype, shape, byte offset) of each shared array, and the total size."""
+    fields = (
+        ("actions", np.int64, (num_envs, 2)),
+        ("obs", np.float32, (num_envs, OBS_SIZE)),
+        ("rewards", np.float32, (num_envs,)),
+        ("terminated", np.bool_, (num_envs,)),
+        ("truncated", np.bool_, (num_envs,)),
+    )
+    out = []
+    offset = 0
+    for name, dtype, shape in fields:
+        offset = (offset + 15) // 16 * 16
+        out.append((name, dtype, shape, offset))
+        offset += int(np.prod(shape)) * np.dtype(dtype).itemsize
+    return out, offset
+
+def _views(buf, num_envs):
+    layout, _ = _layout(num_envs)
+    return {name: np.ndarray(shape, dtype=dtype, buffer=buf, offset=offset)
+            for name, dtype, shape, offset in layout}
+
+class _BatchSlice:
+    """Steps envs [lo, hi) of the shared arrays with one BatchSimulation."""
+
+    def __init__(self, views, lo, hi, max_ticks, params):
+        self.lo = lo
+        self.hi = hi
+        self.max_ticks = max_ticks
+        self.batch = BatchSimulation(hi - lo, **params)
+        self.ticks = np.zeros(hi - lo, dtype=np.int64)
+        self.actions = views["actions"][lo:hi]
+        self.obs = views["obs"][lo:hi]
+        self.rewards = views["rewards"][lo:hi]
+        self.terminated = views["terminated"][lo:hi]
+        self.truncated = views["truncated"][lo:hi]
+
+    def observe(self):
+        b = self.batch
+        obs = self.obs
+        half = b.arena_size / 2.0
+        for slot, i in ((0, 0), (8, 1)):
+            p = b.car_pos[:, i]
+            _fill_car_obs(obs[:, slot:slot + 8], half, b.boost_max, p[:, 0], p[:, 1], p[:, 2],
+                          b.car_angle[:, i], b.car_vz[:, i], b.boost[:, i], b.health[:, i])
+        obs[:, 16:19] = b.ball_pos
+        obs[:, 16:19] /= half
+        obs[:, 19:22] = b.ball_vel
+        obs[:, 19:22] /= b.ball_max_speed
+
+    def reset(self):
+        self.batch.restart()
+        self.ticks[:] = 0
+        self.rewards[:] = 0.0
+        self.terminated[:] = False
+        self.truncated[:] = False
+        self.observe()
+
+    def step(self):
+        b = self.batch
+        before = b.scores.copy()
+        b.step(self.actions)
+        self.ticks += 1
+        gained = b.scores - before
+        np.subtract(gained[:, 0], gained[:, 1], out=self.rewards, casting="unsafe")
+        np.not_equal(self.rewards, 0.0, out=self.terminated)
+        np.greater_equal(self.ticks, self.max_ticks, out=self.truncated)
+        self.truncated &= ~self.terminated
+        done = self.terminated | self.truncated
+        if done.any():
+            b.restart(done)
+            self.ticks[done] = 0
+        self.observe()
+
+def _worker_main(conn, shm_name, num_envs, lo, hi, max_ticks, params):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    envs = _BatchSlice(_views(shm.buf, num_envs), lo, hi, max_ticks, params)
+    try:
+        while True:
+            cmd = conn.recv()
+            if cmd == "step":
+                envs.step()
+            elif cmd == "reset":
+                envs.reset()
+            elif cmd == "close":
+                break
+            conn.send(None)
+    finally:
+        del envs  # drop the views into the block before unmapping it
+        shm.close()
+
+class VectorEnv:
+    """
+    num_envs matches stepped in lockstep by num_workers processes (0 = in this process).
+    step(actions): actions is (num_envs,) for car 0 with car 1 idle, or (num_envs, 2)
+    for both cars (self-play). Returned arrays are views into shared memory and are
+    overwritten by the next step; copy them to keep them.
+    """
+
+    def __init__(self, num_envs, num_workers=None, max_ticks=60 * 60, **params):
+        if num_workers is None:
+            num_workers = mp.cpu_count()
+        num_workers = max(0, min(num_workers, num_envs))
+        self.num_envs = num_envs
+        _, size = _layout(num_envs)
+        self._shm = shared_memory.SharedMemory(create=True, size=size)
+        self._views = _views(self._shm.buf, num_envs)
+        self._local = None
+        self._conns = []
+        self._procs = []
+        if num_workers == 0:
+            self._local = _BatchSlice(self._views, 0, num_envs, max_ticks, params)
+        else:
+            bounds = np.linspace(0, num_envs, num_workers + 1).astype(int)
+            for lo, hi in zip(bounds[:-1], bounds[1:]):
+                parent, child = mp.Pipe()
+                proc = mp.Process(target=_worker_main, daemon=True,
+                                  args=(child, self._shm.name, num_envs, int(lo), int(hi), max_ticks, params))
+                proc.start()
+                child.close()
+                self._conns.append(parent)
+                self._procs.append(proc)
+
+    def _command(self, cmd):
+        if self._local is not None:
+            getattr(self._local, cmd)()
+            return
+        for conn in self._conns:
+            conn.send(cmd)
+        for conn in self._conns:
+            conn.recv()
+
+    def reset(self):
+        self._command("reset")
+        return self._views["obs"], {}
+
+    def step(self, actions):
+        v = self._views
+        actions = np.asarray(actions)
+        if actions.ndim == 1:
+            v["actions"][:, 0] = actions
+            v["actions"][:, 1] = 0
+        else:
+            v["actions"][:] = actions
+        self._command("step")
+        return v["obs"], v["rewards"], v["terminated"], v["truncated"], {}
+
+    def close(self):
+        if self._shm is None:
+            return
+        for conn in self._conns:
+            conn.send("close")
+        for proc in self._procs:
+            proc.join()
+        self._local = None
+        self._views = None
+        self._shm.close()
+        self._shm.unlink()
+        self._shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
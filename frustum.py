@@ -0,0 +1,73 @@
+import numpy as np
+
+# --------------------------
+# View-frustum culling
+# --------------------------
+# The six clip planes come straight from the current matrices: with
+# C = projection * modelview, a point p is inside when -w <= x, y, z <= w in
+# clip space, which for each axis gives the planes row3 + row_i and
+# row3 - row_i of C (Gribb & Hartmann). Normalized, each plane (n, d) gives
+# the signed distance n.p + d of a world point, positive inside.
+#   sphere: culled when it is entirely behind some plane (n.c + d < -r)
+#   AABB:   culled when its corner furthest along n (the "positive vertex")
+#           is behind some plane
+# Both tests are conservative: objects near a frustum corner can be drawn
+# although off screen, but nothing visible is ever culled.
+#
+# Counters are kept per kind of object ("cars", "ball", "obstacle chunks", ...)
+# and reset by update(), so after a frame they describe that frame.
+# --------------------------
+class FrustumCuller:
+    def __init__(self):
+        self.planes = np.zeros((6, 4))
+        self.planes[:, 3] = 1.0  # until update(): everything is inside
+        self._rows = [(0.0, 0.0, 0.0, 1.0)] * 6
+        self.counts = {}  # kind -> [drawn, culled], this frame
+        self.enabled = True
+
+    def update(self, projection, modelview):
+        """New frame: planes from the column-major 4x4 matrices glGetDoublev returns; counters reset."""
+        clip = np.asarray(projection, dtype=np.float64).reshape(4, 4).T @ \
+            np.asarray(modelview, dtype=np.float64).reshape(4, 4).T
+        w = clip[3]
+        planes = np.array([w + clip[0], w - clip[0], w + clip[1], w - clip[1], w + clip[2], w - clip[2]])
+        planes /= np.linalg.norm(planes[:, :3], axis=1)[:, None]
+        self.planes = planes
+        self._rows = [tuple(float(v) for v in p) for p in planes]  # for the scalar sphere test
+        for counter in self.counts.values():
+            counter[0] = counter[1] = 0
+
+    def _count(self, kind, drawn, culled):
+        counter = self.counts.get(kind)
+        if counter is None:
+            counter = self.counts[kind] = [0, 0]
+        counter[0] += drawn
+        counter[1] += culled
+
+    def sphere(self, kind, x, y, z, radius):
+        """True if the sphere may be visible (and count it under kind)."""
+        if self.enabled:
+            for a, b, c, d in self._rows:
+                if a * x + b * y + c * z + d < -radius:
+                    self._count(kind, 0, 1)
+                    return False
+        self._count(kind, 1, 0)
+        return True
+
+    def aabbs(self, kind, mins, maxs):
+        """Boolean mask over (N, 3) box corners: which boxes may be visible (and count them under kind)."""
+        if not self.enabled or len(mins) == 0:
+            self._count(kind, len(mins), 0)
+            return np.ones(len(mins), dtype=bool)
+        normals = self.planes[:, :3]
+        # positive vertex of every box for every plane: (N, 6, 3)
+        corner = np.where(normals[None, :, :] >= 0.0, maxs[:, None, :], mins[:, None, :])
+        distance = np.einsum("npk,pk->np", corner, normals) + self.planes[:, 3]
+        visible = (distance >= 0.0).all(axis=1)
+        drawn = int(visible.sum())
+        self._count(kind, drawn, len(visible) - drawn)
+        return visible
+
+    def totals(self):
+        """(drawn, culled) over all kinds this frame."""
+        return (sum(c[0] for c in self.counts.values()), sum(c[1] for c in self.counts.values()))
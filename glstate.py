@@ -0,0 +1,120 @@
+from OpenGL.GL import *
+from OpenGL.GLU import *
+
+# --------------------------
+# Redundant-state filter for the per-frame render path
+# --------------------------
+# Every PyOpenGL call goes through ctypes, so re-sending a value GL already
+# holds is pure overhead. GLStateCache remembers what it last sent for
+# capabilities, the current color, line width, matrix mode, light parameters
+# and the perspective projection, and drops calls that would not change
+# anything. calls/skipped count issued and dropped calls for the current
+# frame; last_frame keeps the totals of the previous one.
+#
+# Anything that changes this state behind the cache's back (display lists,
+# glPushAttrib/glPopAttrib, raw gl* calls) must be followed by invalidate().
+# --------------------------
+class GLStateCache:
+    def __init__(self):
+        self.calls = 0
+        self.skipped = 0
+        self.last_frame = (0, 0)
+        self.invalidate()
+
+    def begin_frame(self):
+        self.last_frame = (self.calls, self.skipped)
+        self.calls = 0
+        self.skipped = 0
+
+    def invalidate(self, *what):
+        """Forget cached state: everything, or only the named parts ('caps', 'color', ...)."""
+        if not what or "caps" in what:
+            self._caps = {}
+        if not what or "color" in what:
+            self._color = None
+        if not what or "line_width" in what:
+            self._line_width = None
+        if not what or "matrix_mode" in what:
+            self._matrix_mode = None
+        if not what or "lights" in what:
+            self._lights = {}
+            self._color_material = None
+        if not what or "projection" in what:
+            self._projection = None
+
+    def enable(self, cap):
+        if self._caps.get(cap) is True:
+            self.skipped += 1
+            return
+        glEnable(cap)
+        self._caps[cap] = True
+        self.calls += 1
+
+    def disable(self, cap):
+        if self._caps.get(cap) is False:
+            self.skipped += 1
+            return
+        glDisable(cap)
+        self._caps[cap] = False
+        self.calls += 1
+
+    def color(self, r, g, b):
+        rgb = (r, g, b)
+        if rgb == self._color:
+            self.skipped += 1
+            return
+        glColor3f(r, g, b)
+        self._color = rgb
+        self.calls += 1
+
+    def line_width(self, width):
+        if width == self._line_width:
+            self.skipped += 1
+            return
+        glLineWidth(width)
+        self._line_width = width
+        self.calls += 1
+
+    def matrix_mode(self, mode):
+        if mode == self._matrix_mode:
+            self.skipped += 1
+            return
+        glMatrixMode(mode)
+        self._matrix_mode = mode
+        self.calls += 1
+
+    def light(self, light, pname, value):
+        # note: GL_POSITION is stored in eye space, so only cache it when it is
+        # always set under the same modelview (setup_lighting does it under identity)
+        key = (light, pname)
+        value = tuple(value)
+        if self._lights.get(key) == value:
+            self.skipped += 1
+            return
+        glLightfv(light, pname, value)
+        self._lights[key] = value
+        self.calls += 1
+
+    def color_material(self, face, mode):
+        if self._color_material == (face, mode):
+            self.skipped += 1
+            return
+        glColorMaterial(face, mode)
+        self._color_material = (face, mode)
+        self.calls += 1
+
+    def perspective(self, fovy, aspect, near, far):
+        """Load a perspective projection unless it is already loaded; leaves GL_MODELVIEW current."""
+        params = (fovy, aspect, near, far)
+        if params == self._projection:
+            self.skipped += 3
+        else:
+            self.matrix_mode(GL_PROJECTION)
+            glLoadIdentity()
+            gluPerspective(fovy, aspect, near, far)
+            self._projection = params
+            self.calls += 2
+        self.matrix_mode(GL_MODELVIEW)
+
+# shared by every module that draws into the GLUT window
+gl_state = GLStateCache()
@@ -1,11 +1,27 @@
-
 from OpenGL.GL import *
 from OpenGL.GLUT import *
 from OpenGL.GLU import *
+import atexit
 import math
 import random
 import sys
 import time
+from functools import lru_cache
+
+import numpy as np
+
+from bots import realtime_bot
+from frustum import FrustumCuller
+from glstate import gl_state
+from hudtext import HudText
+from lod import BALL_LODS, WHEEL_LODS, QualityGovernor, pick_lod, projected_size
+from meshcache import MeshCache, build_sphere, draw_cars
+from physthread import InputQueue, PhysicsThread, SnapshotBuffer, interpolate, take_snapshot
+from profiler import profiler
+from raster import rasterize_segments, rect_segments
+from replay import InputRecorder
+from scheduler import FramePacer
+from simulation import Simulation, pack_input
 
 # --------------------------
 # Window
@@ -13,144 +29,86 @@ import time
 WIN_W, WIN_H = 1000, 700
 
 # --------------------------
-# Game state (module-level globals)
+# Game state: the headless engine owns cars, ball, boost, health and scores;
+# the front end keeps only presentation and input state.
 # --------------------------
-# Car properties
-car1_position = [-200.0, 0.0, 35.0]
-car2_position = [200.0, 0.0, 35.0]
-car_angle1 = 0.0
-car_angle2 = 180.0
+CARS_PER_TEAM = 1  # cars 0 and 1 are the keyboard players; extra cars idle
+# physics timestamps come from simulated time, so a recorded match replays exactly
+sim = Simulation(cars_per_team=CARS_PER_TEAM)
+recorder = None  # InputRecorder when started with --record PATH
+drivers = [None, None]  # bot controllers replacing the keyboard (--bot-green / --bot-red)
+
+# Car presentation
 car_color1 = [0.1, 0.6, 0.1]  # green
 car_color2 = [0.6, 0.1, 0.1]  # red
-car_size = 40.0
-car1_health = 100
-car2_health = 100
+car_size = sim.car_size
+car_bound_radius = car_size * 1.35  # bounding sphere around body, nose tip and wheels
+
+# Input state fed to the engine each tick
 car1_moving = [False, False, False, False]  # forward, back, left-rot, right-rot
 car2_moving = [False, False, False, False]
-
-# Jump/vertical
-car1_vz = 0.0
-car2_vz = 0.0
-car_jump_strength = 18.0
-
-# Boost
-car1_boost = 100.0
-car2_boost = 100.0
-boost_max = 100.0
-boost_depletion_rate = 40.0
-boost_recharge_rate = 12.0
-boost_multiplier = 1.8
 car1_boosting = False
 car2_boosting = False
+car1_jump = False
+car2_jump = False
 
 # Visual wheel params
 wheel_offset = 20.0
 wheel_radius = 8.0
 wheel_height = 6.0
 
-# Movement & rotation tuning
-base_movement_speed = 3.0
-rotation_speed = 2.0   
-
 # Arena / goals
-arena_size = 500.0
-goal_size = 80.0
-goal_depth = 50.0
-wall_height = 60.0
+arena_size = sim.arena_size
+goal_size = sim.goal_size
+goal_depth = sim.goal_depth
+wall_height = sim.wall_height
 
 # Camera
+fov_y = 45.0
 camera_distance = 380.0
 camera_height = 220.0
 camera_look_z = 35.0
 
 # Ball
-ball_position = [0.0, 0.0, 15.0]
-ball_velocity = [0.0, 0.0, 0.0]
-ball_radius = 15.0
+ball_radius = sim.ball_radius
 ball_color = [1.0, 1.0, 0.0]
-ball_friction = 0.995
-air_friction = 0.995
-ball_max_speed = 30.0
-
 
-
-# Scoring & control
-score_car1 = 0
-score_car2 = 0
 is_paused = False
-is_resetting = False
-last_collision_time = 0
-collision_cooldown = 300  # ms
 
-# Timing physics
-FPS = 60
-dt = 1.0 / FPS
+# Timing
+dt = sim.dt
 
 rng = random.Random(1234)
 
+# Compiled geometry (display lists), built on first draw
+meshes = MeshCache()
+# HUD strings drawn from a glyph atlas, cached per content
+hud_text = HudText(GLUT_BITMAP_HELVETICA_18)
+# view-frustum culling, rebuilt from the GL matrices every frame; counts drawn/culled objects
+frustum = FrustumCuller()
 
 
-# --------------------------
-# Utility: Midpoint Line Algorithm
-# --------------------------
-def midpoint_line_2d(x0, y0, x1, y1):
-    pts = []
-    x0 = int(round(x0)); y0 = int(round(y0)); x1 = int(round(x1)); y1 = int(round(y1))
-    dx = abs(x1 - x0); dy = abs(y1 - y0)
-    sx = 1 if x1 >= x0 else -1
-    sy = 1 if y1 >= y0 else -1
-    x, y = x0, y0
-    if dy <= dx:
-        d = 2 * dy - dx
-        for _ in range(dx + 1):
-            pts.append((x, y))
-            if d > 0:
-                y += sy
-                d -= 2 * dx
-            x += sx
-            d += 2 * dy
-    else:
-        d = 2 * dx - dy
-        for _ in range(dy + 1):
-            pts.append((x, y))
-            if d > 0:
-                x += sx
-                d -= 2 * dy
-            y += sy
-            d += 2 * dx
-    return pts
-
-# --------------------------
-# Obstacles init
-# --------------------------
-# def init_obstacles():
-#     global obstacles
-#     obstacles = []
-#     for _ in range(5):
-#         obs_x = rng.uniform(-arena_size / 2 + 60, arena_size / 2 - 60)
-#         obs_y = rng.uniform(-arena_size / 2 + 60, arena_size / 2 - 60)
-#         obs_z = 15.0
-#         obs_width = rng.uniform(30.0, 60.0)
-#         obs_height = 20.0
-#         obs_depth = 30.0
-#         obstacles.append([obs_x, obs_y, obs_z, obs_width, obs_height, obs_depth])
 
 # --------------------------
 # Rendering helpers (including a car shape with nose)
 # --------------------------
 def draw_text_screen(x, y, text):
+    if hud_text.ready:
+        hud_text.draw(x, y, text)
+        return
     glRasterPos2f(x, y)
     for ch in text:
         glutBitmapCharacter(GLUT_BITMAP_HELVETICA_18, ord(ch))
 
 def setup_lighting():
-    glEnable(GL_LIGHTING)
-    glEnable(GL_LIGHT0)
-    glLightfv(GL_LIGHT0, GL_POSITION, (0.5, 1.0, 1.0, 0.0))
-    glLightfv(GL_LIGHT0, GL_DIFFUSE, (0.9, 0.9, 0.9, 1.0))
-    glLightfv(GL_LIGHT0, GL_AMBIENT, (0.2, 0.2, 0.2, 1.0))
-    glEnable(GL_COLOR_MATERIAL)
-    glColorMaterial(GL_FRONT_AND_BACK, GL_AMBIENT_AND_DIFFUSE)
+    # through the state cache: after the first frame these are all skipped
+    gl_state.enable(GL_LIGHTING)
+    gl_state.enable(GL_LIGHT0)
+    gl_state.light(GL_LIGHT0, GL_POSITION, (0.5, 1.0, 1.0, 0.0))
+    gl_state.light(GL_LIGHT0, GL_DIFFUSE, (0.9, 0.9, 0.9, 1.0))
+    gl_state.light(GL_LIGHT0, GL_AMBIENT, (0.2, 0.2, 0.2, 1.0))
+    gl_state.enable(GL_COLOR_MATERIAL)
+    gl_state.color_material(GL_FRONT_AND_BACK, GL_AMBIENT_AND_DIFFUSE)
 
 def render_car(x, y, z, angle, color, outline_color=(1,1,0)):
     """
@@ -158,85 +116,22 @@ def render_car(x, y, z, angle, color, outline_color=(1,1,0)):
     - Main body: slightly flattened cuboid
     - Nose: a tapered triangular prism to show front/head clearly
     - Wheels: cylinders
+    Geometry comes from the mesh cache; see render_cars for drawing many at once.
     """
-    glPushMatrix()
-    glTranslatef(x, y, z)
-    glRotatef(angle, 0, 0, 1)
-
-    # Body (slightly flattened)
-    glPushMatrix()
-    glScalef(1.4, 0.9, 0.5)  # elongate in x to make car-like shape
-    glColor3f(color[0], color[1], color[2])
-    glutSolidCube(car_size)
-    glPopMatrix()
+    render_cars([(x, y, z, angle, color, outline_color)])
 
-    # Nose / front: triangular prism (drawn manually)
-    # We'll create a triangular prism that sits in front (positive X local)
-    nose_len = car_size * 0.6
-    nose_w = car_size * 0.9
-    nose_h = car_size * 0.4
-    # vertices in local coordinates
-    # base rectangle (back of nose)
-    bx = car_size * 0.7  # back of nose relative to center
-    front_x = bx + nose_len
-    back_x = bx - nose_len * 0.2
-    half_w = nose_w / 2.0
-    half_h = nose_h / 2.0
-
-    # We'll draw 4 triangles forming the prism
-    glColor3f(color[0]*0.9 + 0.05, color[1]*0.9 + 0.05, color[2]*0.9 + 0.05)
-    glBegin(GL_TRIANGLES)
-    # top/front triangle
-    glNormal3f(0,0,1)
-    glVertex3f(front_x, 0.0, half_h)
-    glVertex3f(back_x, -half_w, half_h)
-    glVertex3f(back_x, half_w, half_h)
-    # bottom/front triangle
-    glNormal3f(0,0,-1)
-    glVertex3f(front_x, 0.0, -half_h)
-    glVertex3f(back_x, half_w, -half_h)
-    glVertex3f(back_x, -half_w, -half_h)
-    # left side
-    glNormal3f(-1,0,0)
-    glVertex3f(front_x, 0.0, half_h)
-    glVertex3f(back_x, half_w, half_h)
-    glVertex3f(back_x, half_w, -half_h)
-    # right side
-    glNormal3f(1,0,0)
-    glVertex3f(front_x, 0.0, half_h)
-    glVertex3f(back_x, -half_w, -half_h)
-    glVertex3f(back_x, -half_w, half_h)
-    glEnd()
+def render_cars(cars, wheel_details=None, outlines=True):
+    draw_cars(meshes, cars, car_size, wheel_offset, wheel_radius, wheel_height, wheel_details, outlines)
 
-    # Wheels
-    glColor3f(0.05,0.05,0.05)
-    for dx in [-wheel_offset, wheel_offset]:
-        for dy in [-wheel_offset*0.6, wheel_offset*0.6]:
-            glPushMatrix()
-            glTranslatef(dx, dy, -car_size * 0.25)
-            glRotatef(90, 0, 1, 0)
-            quad = gluNewQuadric()
-            gluCylinder(quad, wheel_radius, wheel_radius, wheel_height, 12, 4)
-            glPopMatrix()
-
-    # outline (wireframe) to emphasize shape
-    glDisable(GL_LIGHTING)
-    glColor3f(*outline_color)
-    glPushMatrix()
-    glScalef(1.4*1.01, 0.9*1.01, 0.5*1.01)
-    glutWireCube(car_size)
-    glPopMatrix()
-    glEnable(GL_LIGHTING)
-
-    glPopMatrix()
-
-def render_obstacle(x, y, z, width, height, depth):
+def render_obstacle(x, y, z, width, height, depth, outline=True):
     glPushMatrix()
     glTranslatef(x, y, z)
     glColor3f(0.6, 0.6, 0.6)
     glScalef(width, height, depth)
     glutSolidCube(1.0)
     glPopMatrix()
+    if not outline:
+        return
     glDisable(GL_LIGHTING)
     glColor3f(0.5,0.5,0.5)
     glPushMatrix()
@@ -246,27 +141,30 @@ def render_obstacle(x, y, z, width, height, depth):
     glPopMatrix()
     glEnable(GL_LIGHTING)
 
-def render_ball():
+def render_ball(ball_position, detail=(28, 28)):
+    slices, stacks = detail
     glPushMatrix()
     glTranslatef(ball_position[0], ball_position[1], ball_position[2])
-    glColor3f(*ball_color)
-    glutSolidSphere(ball_radius, 28, 28)
+    gl_state.color(*ball_color)
+    meshes.call(("ball", ball_radius, slices, stacks), build_sphere, ball_radius, slices, stacks)
     glPopMatrix()
 
-def render_arena():
+def render_arena(size, height, outline=True):
     glPushMatrix()
     glColor3f(0.2, 0.8, 0.2)
-    glTranslatef(0.0, 0.0, -wall_height / 2.0)
-    glScalef(arena_size, arena_size, wall_height)
+    glTranslatef(0.0, 0.0, -height / 2.0)
+    glScalef(size, size, height)
     glutSolidCube(1.0)
     glPopMatrix()
+    if not outline:
+        return
 
     # wireframe
     glDisable(GL_LIGHTING)
     glColor3f(1.0,1.0,1.0)
     glPushMatrix()
-    glTranslatef(0.0, 0.0, -wall_height / 2.0)
-    glScalef(arena_size * 1.002, arena_size * 1.002, wall_height * 1.002)
+    glTranslatef(0.0, 0.0, -height / 2.0)
+    glScalef(size * 1.002, size * 1.002, height * 1.002)
     glutWireCube(1.0)
     glPopMatrix()
     glEnable(GL_LIGHTING)
@@ -285,430 +183,285 @@ def render_goal_post(x, y, width=goal_size, height=goal_depth):
     glEnd()
     glEnable(GL_LIGHTING)
 
-# --------------------------
-# Collision detection (AABB / closest-point)
-# --------------------------
-def aabb_collision_2d(center_a, half_a_x, half_a_y, center_b, half_b_x, half_b_y):
-    return (abs(center_a[0] - center_b[0]) <= (half_a_x + half_b_x)) and \
-           (abs(center_a[1] - center_b[1]) <= (half_a_y + half_b_y))
-
-def check_collision_car_ball(car_pos, car_size_val, ball_pos, ball_r):
-    car_half = car_size_val / 2.0
-    closest_x = max(car_pos[0] - car_half, min(ball_pos[0], car_pos[0] + car_half))
-    closest_y = max(car_pos[1] - car_half, min(ball_pos[1], car_pos[1] + car_half))
-    dx = ball_pos[0] - closest_x
-    dy = ball_pos[1] - closest_y
-    dist2 = dx*dx + dy*dy
-    return dist2 < (ball_r * ball_r), dx, dy
-
-def check_collision_car_car(car1_pos_local, car2_pos_local, size_val):
-    half = size_val / 2.0
-    collided = aabb_collision_2d(car1_pos_local, half, half, car2_pos_local, half, half)
-    dx = car1_pos_local[0] - car2_pos_local[0]
-    dy = car1_pos_local[1] - car2_pos_local[1]
-    return collided, dx, dy
-
-def check_collision_car_obstacle(car_pos, car_size_val, obs):
-    obs_pos = [obs[0], obs[1], obs[2]]
-    obs_w, obs_h, obs_d = obs[3], obs[4], obs[5]
-    car_half = car_size_val / 2.0
-    obs_half_w = obs_w / 2.0
-    obs_half_h = obs_h / 2.0
-    obs_half_d = obs_d / 2.0
-    overlap_xy = (car_pos[0] - car_half) < (obs_pos[0] + obs_half_w) and \
-                 (car_pos[0] + car_half) > (obs_pos[0] - obs_half_w) and \
-                 (car_pos[1] - car_half) < (obs_pos[1] + obs_half_h) and \
-                 (car_pos[1] + car_half) > (obs_pos[1] - obs_half_h)
-    overlap_z = (car_pos[2] - car_half / 2.0) < (obs_pos[2] + obs_half_d) and \
-                (car_pos[2] + car_half / 2.0) > (obs_pos[2] - obs_half_d)
-    if overlap_xy and overlap_z:
-        dx = car_pos[0] - obs_pos[0]
-        dy = car_pos[1] - obs_pos[1]
-        return True, dx, dy
-    return False, 0.0, 0.0
-
-def check_collision_ball_obstacle(ball_pos, ball_r, obs):
-    obs_pos = [obs[0], obs[1], obs[2]]
-    obs_w, obs_h, obs_d = obs[3], obs[4], obs[5]
-    closest_x = max(obs_pos[0] - obs_w/2.0, min(ball_pos[0], obs_pos[0] + obs_w/2.0))
-    closest_y = max(obs_pos[1] - obs_h/2.0, min(ball_pos[1], obs_pos[1] + obs_h/2.0))
-    dx = ball_pos[0] - closest_x
-    dy = ball_pos[1] - closest_y
-    dist2 = dx*dx + dy*dy
-    return dist2 < (ball_r * ball_r), dx, dy
+def build_static_scene(arena_size_val, wall_height_val, goal_size_val, goal_depth_val, outlines):
+    # everything that never moves and is always in view: floor block, its outline and both goal posts
+    # (these helpers use raw gl calls on purpose: they are compiled, not run per frame)
+    render_arena(arena_size_val, wall_height_val, outlines)
+    render_goal_post(-arena_size_val / 2.0, 0.0, width=goal_size_val, height=goal_depth_val)
+    render_goal_post(arena_size_val / 2.0, 0.0, width=goal_size_val, height=goal_depth_val)
+
+def render_static_scene(outlines=True):
+    # one cached draw; recompiled only when the arena parameters or outline setting change
+    params = (sim.arena_size, sim.wall_height, sim.goal_size, sim.goal_depth, outlines)
+    glCallList(meshes.get_slot("static_scene", params, build_static_scene, *params))
+    # the list sets colors and line width itself (it ends with lighting back on)
+    gl_state.invalidate("color", "line_width")
+
+# Obstacles are compiled in chunks of OBSTACLE_CHUNK x OBSTACLE_CHUNK cells of
+# the simulation's obstacle grid (each obstacle goes to the chunk holding its
+# centre), and whole chunks are culled by their AABB: a frame costs one test
+# and at most one list call per chunk, however many obstacles there are.
+OBSTACLE_CHUNK = 4
+_obstacle_chunks = None  # (obstacles, chunk size, chunks) of the current layout
+
+def obstacle_chunks(obstacles, chunk_size):
+    # ((cell, members) per chunk, (K, 3) min corners, (K, 3) max corners), outlines included;
+    # rebuilt only when sim.obstacles is replaced, so a frame costs an identity check
+    global _obstacle_chunks
+    cached = _obstacle_chunks
+    if cached is not None and cached[0] is obstacles and cached[1] == chunk_size:
+        return cached[2]
+    groups = {}
+    for obs in obstacles:
+        cell = (math.floor(obs[0] / chunk_size), math.floor(obs[1] / chunk_size))
+        groups.setdefault(cell, []).append(obs)
+    chunks = [(cell, tuple(members)) for cell, members in groups.items()]
+    mins = np.empty((len(chunks), 3))
+    maxs = np.empty((len(chunks), 3))
+    for i, (_, members) in enumerate(chunks):
+        boxes = np.array(members, dtype=np.float64)
+        half = boxes[:, 3:6] * (1.01 / 2.0)
+        mins[i] = (boxes[:, :3] - half).min(axis=0)
+        maxs[i] = (boxes[:, :3] + half).max(axis=0)
+    _obstacle_chunks = (obstacles, chunk_size, (chunks, mins, maxs))
+    return chunks, mins, maxs
+
+def build_obstacle_chunk(members, outlines):
+    for obs in members:
+        render_obstacle(*obs, outlines)
+
+def render_obstacles(outlines=True):
+    chunks, mins, maxs = obstacle_chunks(sim.obstacles, sim.obstacle_cell_size * OBSTACLE_CHUNK)
+    visible = frustum.aabbs("obstacle chunks", mins, maxs)
+    for i in np.flatnonzero(visible):
+        cell, members = chunks[i]
+        glCallList(meshes.get_slot(("obstacles", cell), (members, outlines), build_obstacle_chunk, members, outlines))
+    gl_state.invalidate("color")
 
 # --------------------------
-# Collision response & physics
+# Physics: one engine tick from the current input state
 # --------------------------
-def apply_car_ball_collision(car_pos, car_angle, car_moving, boosting, car_vz_local, movement_speed_local):
-    """
-    Apply impulse to global ball_velocity depending on car planar velocity (inputs),
-    boost and vertical velocity (jump). Returns True if collision occurred.
-    """
-    global ball_velocity, ball_position
-    collided, dx, dy = check_collision_car_ball(car_pos, car_size, ball_position, ball_radius)
-    if not collided:
-        return False
-
-    ang_rad = math.radians(car_angle)
-    forward = [math.cos(ang_rad), math.sin(ang_rad)]
-    car_vx = 0.0
-    car_vy = 0.0
-    # forward/back keys
-    if car_moving[0]:
-        car_vx += movement_speed_local * forward[0]
-        car_vy += movement_speed_local * forward[1]
-    if car_moving[1]:
-        car_vx -= movement_speed_local * 0.6 * forward[0]
-        car_vy -= movement_speed_local * 0.6 * forward[1]
-    # rotation strafe small
-    if car_moving[2]:
-        car_vx += -0.2 * movement_speed_local * forward[1]
-        car_vy += 0.2 * movement_speed_local * forward[0]
-    if car_moving[3]:
-        car_vx += 0.2 * movement_speed_local * forward[1]
-        car_vy += -0.2 * movement_speed_local * forward[0]
-
-    if boosting:
-        car_vx *= boost_multiplier
-        car_vy *= boost_multiplier
-
-    car_speed = math.sqrt(car_vx*car_vx + car_vy*car_vy)
-    vz_impulse = 0.0
-    if car_vz_local > 2.0:
-        vz_impulse = car_vz_local * 0.8
-
-    # If near-static, push by overlap direction mildly; else transfer momentum scaled
-    if car_speed < 0.5:
-        dir_len = math.sqrt(dx*dx + dy*dy)
-        if dir_len < 1e-5:
-            dir_len = 1.0
-        nx = dx / dir_len
-        ny = dy / dir_len
-        ball_velocity[0] += nx * 3.0
-        ball_velocity[1] += ny * 3.0
-    else:
-        transfer = 0.6 + min(0.8, car_speed / 20.0)
-        ball_velocity[0] += car_vx * transfer * 0.15
-        ball_velocity[1] += car_vy * transfer * 0.15
-
-    ball_velocity[2] += vz_impulse * 0.5
-
-    # cap planar speed
-    sp = math.sqrt(ball_velocity[0]**2 + ball_velocity[1]**2)
-    if sp > ball_max_speed:
-        s = ball_max_speed / sp
-        ball_velocity[0] *= s
-        ball_velocity[1] *= s
-
-    return True
-
-def update_physics():
-    global ball_position, ball_velocity, car1_health, car2_health, score_car1, score_car2, last_collision_time, car1_boost, car2_boost, car1_vz, car2_vz, is_resetting
-
-    if is_paused or is_resetting:
+# Runs on the physics thread (see physthread.py): window input queued up to
+# tick_time is applied first, then the tick, then a snapshot is published for
+# the renderer. Called with no time, it applies everything queued so far.
+def update_physics(tick_time=None):
+    global car1_jump, car2_jump
+    input_queue.drain(tick_time)
+    if tick_time is None:
+        tick_time = time.perf_counter()
+    if is_paused:
+        snapshots.publish(take_snapshot(sim, tick_time, True))
         return
-
-    current_time_ms = glutGet(GLUT_ELAPSED_TIME)
-
-    # Boost meters
-    global_dt = dt
-    if car1_boosting and car1_boost > 0.0:
-        car1_boost = max(0.0, car1_boost - boost_depletion_rate * global_dt)
-    else:
-        car1_boost = min(boost_max, car1_boost + boost_recharge_rate * global_dt)
-    if car2_boosting and car2_boost > 0.0:
-        car2_boost = max(0.0, car2_boost - boost_depletion_rate * global_dt)
-    else:
-        car2_boost = min(boost_max, car2_boost + boost_recharge_rate * global_dt)
-
-    # Movement speeds include boost if active
-    speed1 = base_movement_speed * (boost_multiplier if car1_boosting and car1_boost > 0.0 else 1.0)
-    speed2 = base_movement_speed * (boost_multiplier if car2_boosting and car2_boost > 0.0 else 1.0)
-
-    # Car vertical physics (simple)
-    car1_vz += -9.8 * global_dt * 1.5  # tuned gravity for feel
-    car1_position[2] += car1_vz * global_dt
-    if car1_position[2] < 35.0:
-        car1_position[2] = 35.0
-        car1_vz = 0.0
-
-    car2_vz += -9.8 * global_dt * 1.5
-    car2_position[2] += car2_vz * global_dt
-    if car2_position[2] < 35.0:
-        car2_position[2] = 35.0
-        car2_vz = 0.0
-
-    # Update planar movement
-    update_movement(speed1, speed2)
-
-    # Car-ball collisions (apply impulses)
-    if apply_car_ball_collision(car1_position, car_angle1, car1_moving, car1_boosting, car1_vz, speed1):
-        last_collision_time = current_time_ms
-    if apply_car_ball_collision(car2_position, car_angle2, car2_moving, car2_boosting, car2_vz, speed2):
-        last_collision_time = current_time_ms
-
-    # Car-obstacle and ball-obstacle collisions
-
-    # Car-car collision
-    colcc, dxcc, dycc = check_collision_car_car(car1_position, car2_position, car_size)
-    if colcc:
-        car1_health -= 20
-        car2_health -= 20
-        car1_position[0] += dxcc * 0.02
-        car1_position[1] += dycc * 0.02
-        car2_position[0] -= dxcc * 0.02
-        car2_position[1] -= dycc * 0.02
-        last_collision_time = current_time_ms
-        if car1_health <= 0:
-            score_car2 += 1
-            reset_game()
-        if car2_health <= 0:
-            score_car1 += 1
-            reset_game()
-
-    # Ball physics integration
-    ball_velocity[2] += -9.8 * global_dt * 1.5
-    ball_position[0] += ball_velocity[0] * global_dt * 30.0
-    ball_position[1] += ball_velocity[1] * global_dt * 30.0
-    ball_position[2] += ball_velocity[2] * global_dt * 30.0
-
-    # ground collision for ball
-    if ball_position[2] - ball_radius <= 0.0:
-        ball_position[2] = ball_radius
-        if abs(ball_velocity[2]) > 1.0:
-            ball_velocity[2] = -ball_velocity[2] * 0.4
-            ball_velocity[0] *= 0.98
-            ball_velocity[1] *= 0.98
-        else:
-            ball_velocity[2] = 0.0
-            ball_velocity[0] *= ball_friction
-            ball_velocity[1] *= ball_friction
+    inputs = [0] * len(sim.cars)
+    inputs[0] = pack_input(car1_moving, car1_boosting, car1_jump)
+    inputs[1] = pack_input(car2_moving, car2_boosting, car2_jump)
+    for i, driver in enumerate(drivers):
+        if driver is not None:
+            inputs[i] = driver(sim, i)
+    if recorder is not None:
+        recorder.record(inputs)
+    if profiler.enabled:
+        start = profiler.clock()
+        sim.step(inputs)
+        profiler.record("physics", start)
     else:
-        ball_velocity[0] *= air_friction
-        ball_velocity[1] *= air_friction
-
-    # Arena bounds (with bounce)
-    half = arena_size / 2.0
-    max_x = half - ball_radius
-    max_y = half - ball_radius
-
-    # X boundary bounce
-    if ball_position[0] <= -max_x:
-        ball_position[0] = -max_x
-        ball_velocity[0] = -ball_velocity[0] * 0.8  # reflect with damping
-    elif ball_position[0] >= max_x:
-        ball_position[0] = max_x
-        ball_velocity[0] = -ball_velocity[0] * 0.8
-
-    # Y boundary bounce
-    if ball_position[1] <= -max_y:
-        ball_position[1] = -max_y
-        ball_velocity[1] = -ball_velocity[1] * 0.8
-    elif ball_position[1] >= max_y:
-        ball_position[1] = max_y
-        ball_velocity[1] = -ball_velocity[1] * 0.8
-    # Goal detection (tuned): when ball crosses near edge and near ground and y velocity negative enough
-    if ball_position[0] > (half - 30):
-        if (ball_position[1] + ball_velocity[1] * global_dt * 30.0) <= -160.0 and ball_position[2] <= ball_radius + 2.0:
-            score_car1 += 1
-            reset_game()
-    if ball_position[0] < -(half - 30):
-        if (ball_position[1] + ball_velocity[1] * global_dt * 30.0) <= -160.0 and ball_position[2] <= ball_radius + 2.0:
-            score_car2 += 1
-            reset_game()
-
-# --------------------------
-# Movement update (rotation & planar movement)
-# --------------------------
-def update_movement(speed1, speed2):
-    global car_angle1, car_angle2, car1_position, car2_position
-    a1 = math.radians(car_angle1)
-    a2 = math.radians(car_angle2)
-
-    # Car1 forward/back
-    if car1_moving[0]:
-        car1_position[0] += speed1 * math.cos(a1)
-        car1_position[1] += speed1 * math.sin(a1)
-    if car1_moving[1]:
-        car1_position[0] -= speed1 * 0.6 * math.cos(a1)
-        car1_position[1] -= speed1 * 0.6 * math.sin(a1)
-    if car1_moving[2]:
-        car_angle1 += rotation_speed
-    if car1_moving[3]:
-        car_angle1 -= rotation_speed
-
-    # Car2
-    if car2_moving[0]:
-        car2_position[0] += speed2 * math.cos(a2)
-        car2_position[1] += speed2 * math.sin(a2)
-    if car2_moving[1]:
-        car2_position[0] -= speed2 * 0.6 * math.cos(a2)
-        car2_position[1] -= speed2 * 0.6 * math.sin(a2)
-    if car2_moving[2]:
-        car_angle2 += rotation_speed
-    if car2_moving[3]:
-        car_angle2 -= rotation_speed
-
-    # keep inside arena
-    half_arena = arena_size / 2.0
-    for pos in (car1_position, car2_position):
-        pos[0] = max(-half_arena + car_size/2.0, min(half_arena - car_size/2.0, pos[0]))
-        pos[1] = max(-half_arena + car_size/2.0, min(half_arena - car_size/2.0, pos[1]))
+        sim.step(inputs)
+    car1_jump = False
+    car2_jump = False
+    snapshots.publish(take_snapshot(sim, tick_time))
 
 # --------------------------
 # Reset game
 # --------------------------
 def reset_game():
-    global car1_position, car2_position, ball_position, ball_velocity, car1_health, car2_health, car1_boost, car2_boost, car1_vz, car2_vz, is_resetting
-    car1_position = [-200.0, 0.0, 35.0]
-    car2_position = [200.0, 0.0, 35.0]
-    ball_position = [0.0, 0.0, 15.0]
-    ball_velocity = [0.0, 0.0, 0.0]
-    car1_health = 100
-    car2_health = 100
-    car1_boost = boost_max
-    car2_boost = boost_max
-    car1_vz = 0.0
-    car2_vz = 0.0
-    
-    is_resetting = False
+    if recorder is not None:
+        recorder.mark_reset()
+    sim.reset()
 
 # --------------------------
 # HUD
 # --------------------------
-def render_hud():
-    glMatrixMode(GL_PROJECTION)
+@lru_cache(maxsize=None)
+def hud_outline_points(win_w=WIN_W):
+    # outlines of both boost meters, as one (K, 2) int32 array
+    meter_w = 200; meter_h = 14
+    return rasterize_segments(rect_segments(30, 40, meter_w, meter_h) +
+                              rect_segments(win_w - 250, 40, meter_w, meter_h))
+
+def draw_points(pts):
+    glEnableClientState(GL_VERTEX_ARRAY)
+    glVertexPointer(2, GL_INT, 0, pts)
+    glDrawArrays(GL_POINTS, 0, len(pts))
+    glDisableClientState(GL_VERTEX_ARRAY)
+
+def render_hud(frame, detail=2):
+    gl_state.matrix_mode(GL_PROJECTION)
     glPushMatrix()
     glLoadIdentity()
     gluOrtho2D(0, WIN_W, 0, WIN_H)
-    glMatrixMode(GL_MODELVIEW)
+    gl_state.matrix_mode(GL_MODELVIEW)
     glPushMatrix()
     glLoadIdentity()
+    health1, health2 = frame.health[:2]
+    boost1, boost2 = frame.boost[:2]
 
     # Scores
-    glColor3f(1,1,1)
-    draw_text_screen(30, WIN_H - 30, f"Green Car Score: {score_car1}")
-    draw_text_screen(WIN_W - 220, WIN_H - 30, f"Red Car Score: {score_car2}")
+    gl_state.color(1.0, 1.0, 1.0)
+    draw_text_screen(30, WIN_H - 30, f"Green Car Score: {frame.scores[0]}")
+    draw_text_screen(WIN_W - 220, WIN_H - 30, f"Red Car Score: {frame.scores[1]}")
 
     # Health bars
-    if car1_health > 50:
-        glColor3f(0.0, 1.0, 0.0)
+    if health1 > 50:
+        gl_state.color(0.0, 1.0, 0.0)
     else:
-        glColor3f(1.0, 0.0, 0.0)
+        gl_state.color(1.0, 0.0, 0.0)
     glBegin(GL_QUADS)
     glVertex2f(30, WIN_H - 60)
-    glVertex2f(30 + car1_health * 1.5, WIN_H - 60)
-    glVertex2f(30 + car1_health * 1.5, WIN_H - 70)
+    glVertex2f(30 + health1 * 1.5, WIN_H - 60)
+    glVertex2f(30 + health1 * 1.5, WIN_H - 70)
     glVertex2f(30, WIN_H - 70)
     glEnd()
-    draw_text_screen(30, WIN_H - 80, "Green Health")
+    if detail > 1:
+        draw_text_screen(30, WIN_H - 80, "Green Health")
 
-    if car2_health > 50:
-        glColor3f(0.0, 1.0, 0.0)
+    if health2 > 50:
+        gl_state.color(0.0, 1.0, 0.0)
     else:
-        glColor3f(1.0, 0.0, 0.0)
+        gl_state.color(1.0, 0.0, 0.0)
     glBegin(GL_QUADS)
     glVertex2f(WIN_W - 250, WIN_H - 60)
-    glVertex2f(WIN_W - 250 + car2_health * 1.5, WIN_H - 60)
-    glVertex2f(WIN_W - 250 + car2_health * 1.5, WIN_H - 70)
+    glVertex2f(WIN_W - 250 + health2 * 1.5, WIN_H - 60)
+    glVertex2f(WIN_W - 250 + health2 * 1.5, WIN_H - 70)
     glVertex2f(WIN_W - 250, WIN_H - 70)
     glEnd()
-    draw_text_screen(WIN_W - 250, WIN_H - 80, "Red Health")
-
-    # Boost meters using midpoint algorithm outlines
-    meter_x = 30; meter_y = 40; meter_w = 200; meter_h = 14
-    glColor3f(1.0,1.0,1.0)
-    pts = midpoint_line_2d(meter_x, meter_y, meter_x + meter_w, meter_y)
-    glBegin(GL_POINTS)
-    for px, py in pts: glVertex2i(px, py)
-    pts = midpoint_line_2d(meter_x + meter_w, meter_y, meter_x + meter_w, meter_y + meter_h)
-    for px, py in pts: glVertex2i(px, py)
-    pts = midpoint_line_2d(meter_x + meter_w, meter_y + meter_h, meter_x, meter_y + meter_h)
-    for px, py in pts: glVertex2i(px, py)
-    pts = midpoint_line_2d(meter_x, meter_y + meter_h, meter_x, meter_y)
-    for px, py in pts: glVertex2i(px, py)
-    glEnd()
-    fill_w = int((car1_boost / boost_max) * (meter_w - 2))
-    glColor3f(0.2, 0.6, 1.0)
-    glBegin(GL_QUADS)
-    glVertex2f(meter_x + 1, meter_y + 1)
-    glVertex2f(meter_x + 1 + fill_w, meter_y + 1)
-    glVertex2f(meter_x + 1 + fill_w, meter_y + meter_h - 1)
-    glVertex2f(meter_x + 1, meter_y + meter_h - 1)
-    glEnd()
-    draw_text_screen(meter_x, meter_y + meter_h + 6, "Green Boost")
-
-    meter_x2 = WIN_W - 250; meter_y2 = 40
-    glColor3f(1.0,1.0,1.0)
-    pts = midpoint_line_2d(meter_x2, meter_y2, meter_x2 + meter_w, meter_y2)
-    glBegin(GL_POINTS)
-    for px, py in pts: glVertex2i(px, py)
-    pts = midpoint_line_2d(meter_x2 + meter_w, meter_y2, meter_x2 + meter_w, meter_y2 + meter_h)
-    for px, py in pts: glVertex2i(px, py)
-    pts = midpoint_line_2d(meter_x2 + meter_w, meter_y2 + meter_h, meter_x2, meter_y2 + meter_h)
-    for px, py in pts: glVertex2i(px, py)
-    pts = midpoint_line_2d(meter_x2, meter_y2 + meter_h, meter_x2, meter_y2)
-    for px, py in pts: glVertex2i(px, py)
-    glEnd()
-    fill_w2 = int((car2_boost / boost_max) * (meter_w - 2))
-    glColor3f(0.2, 0.6, 1.0)
-    glBegin(GL_QUADS)
-    glVertex2f(meter_x2 + 1, meter_y2 + 1)
-    glVertex2f(meter_x2 + 1 + fill_w2, meter_y2 + 1)
-    glVertex2f(meter_x2 + 1 + fill_w2, meter_y2 + meter_h - 1)
-    glVertex2f(meter_x2 + 1, meter_y2 + meter_h - 1)
-    glEnd()
-    draw_text_screen(meter_x2, meter_y2 + meter_h + 6, "Red Boost")
-
-    if is_paused:
+    if detail > 1:
+        draw_text_screen(WIN_W - 250, WIN_H - 80, "Red Health")
+
+    # detail 2 is the full HUD, 1 drops labels and meter outlines, 0 keeps scores and health
+    if detail > 0:
+        # Boost meters: both outlines are rasterized once (midpoint algorithm)
+        # and drawn as a single point array
+        meter_x = 30; meter_y = 40; meter_w = 200; meter_h = 14
+        meter_x2 = WIN_W - 250; meter_y2 = 40
+        if detail > 1:
+            gl_state.color(1.0,1.0,1.0)
+            draw_points(hud_outline_points())
+
+        fill_w = int((boost1 / sim.boost_max) * (meter_w - 2))
+        gl_state.color(0.2, 0.6, 1.0)
+        glBegin(GL_QUADS)
+        glVertex2f(meter_x + 1, meter_y + 1)
+        glVertex2f(meter_x + 1 + fill_w, meter_y + 1)
+        glVertex2f(meter_x + 1 + fill_w, meter_y + meter_h - 1)
+        glVertex2f(meter_x + 1, meter_y + meter_h - 1)
+        glEnd()
+        if detail > 1:
+            draw_text_screen(meter_x, meter_y + meter_h + 6, "Green Boost")
+
+        fill_w2 = int((boost2 / sim.boost_max) * (meter_w - 2))
+        gl_state.color(0.2, 0.6, 1.0)
+        glBegin(GL_QUADS)
+        glVertex2f(meter_x2 + 1, meter_y2 + 1)
+        glVertex2f(meter_x2 + 1 + fill_w2, meter_y2 + 1)
+        glVertex2f(meter_x2 + 1 + fill_w2, meter_y2 + meter_h - 1)
+        glVertex2f(meter_x2 + 1, meter_y2 + meter_h - 1)
+        glEnd()
+        if detail > 1:
+            draw_text_screen(meter_x2, meter_y2 + meter_h + 6, "Red Boost")
+
+    if profiler.enabled:
+        render_profiler_overlay()
+
+    if frame.paused:
         draw_text_screen(WIN_W/2 - 80, WIN_H/2 + 40, "PAUSED")
         draw_text_screen(WIN_W/2 - 120, WIN_H/2 + 10, "Press 'r' to restart, 'q' to quit, click middle to resume")
 
     glPopMatrix()
-    glMatrixMode(GL_PROJECTION)
+    gl_state.matrix_mode(GL_PROJECTION)
     glPopMatrix()
-    glMatrixMode(GL_MODELVIEW)
+    gl_state.matrix_mode(GL_MODELVIEW)
+
+def render_profiler_overlay():
+    # rolling stage percentiles, refreshed every profiler.refresh frames
+    gl_state.color(1.0, 1.0, 0.6)
+    x = WIN_W / 2 - 150
+    y = WIN_H - 30
+    draw_text_screen(x, y, "stage      p50 / p95 / p99 ms")
+    for name, (p50, p95, p99) in profiler.summary():
+        y -= 22
+        draw_text_screen(x, y, f"{name:<10} {p50:.2f} / {p95:.2f} / {p99:.2f}")
+    draw_text_screen(x, y - 22, f"quality level {governor.level}" + ("" if governor.enabled else " (governor off)"))
+    drawn, culled = frustum.totals()
+    draw_text_screen(x, y - 44, f"objects drawn {drawn} culled {culled}")
 
 # --------------------------
 # Camera & main render
 # --------------------------
-def setup_camera():
+def setup_camera(car1_position, car2_position):
     mid_x = (car1_position[0] + car2_position[0]) / 2.0
     mid_y = (car1_position[1] + car2_position[1]) / 2.0
     eye_x = mid_x
     eye_y = mid_y - camera_distance
     eye_z = camera_height
     gluLookAt(eye_x, eye_y, eye_z, mid_x, mid_y, camera_look_z, 0, 0, 1)
+    return eye_x, eye_y, eye_z
+
+def pixels_at(eye, position, radius):
+    # on-screen size of a sphere of radius at position, for picking mesh detail
+    distance = math.sqrt((position[0] - eye[0]) ** 2 + (position[1] - eye[1]) ** 2 + (position[2] - eye[2]) ** 2)
+    return projected_size(radius, distance, fov_y, WIN_H)
 
 def render_scene():
+    if not hud_text.ready:
+        # rasterize the HUD font atlas once, on the first frame (it uses the back buffer)
+        hud_text.build(WIN_W, WIN_H)
+        gl_state.invalidate()
+    quality = governor.quality
+    profiler.resume()
+    gl_state.begin_frame()
     glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+    frame_start = time.perf_counter()  # after the clear, which may still wait on the last swap
+    gl_state.perspective(fov_y, float(WIN_W) / float(WIN_H), 0.1, 4000.0)
     glLoadIdentity()
-    glMatrixMode(GL_PROJECTION)
-    glLoadIdentity()
-    gluPerspective(45.0, float(WIN_W) / float(WIN_H), 0.1, 4000.0)
-    glMatrixMode(GL_MODELVIEW)
-    glLoadIdentity()
-
-    setup_lighting()
-    setup_camera()
 
-    render_arena()
-    render_goal_post(-arena_size / 2.0, 0.0, width=goal_size, height=goal_depth)
-    render_goal_post(arena_size / 2.0, 0.0, width=goal_size, height=goal_depth)
-
-    
-
-    render_car(car1_position[0], car1_position[1], car1_position[2], car_angle1, car_color1, outline_color=(1,1,0))
-    render_car(car2_position[0], car2_position[1], car2_position[2], car_angle2, car_color2, outline_color=(1,0.5,0.5))
-
-    render_ball()
-
-    # step physics then HUD (physics runs independently in timer too)
-    update_physics()
-    render_hud()
+    # draw the last two published physics ticks, blended by the time since the newer one
+    previous, current = snapshots.read()
+    cars, ball = interpolate(previous, current, dt, time.perf_counter())
 
+    setup_lighting()
+    eye = setup_camera(cars[0], cars[1])
+    frustum.update(glGetDoublev(GL_PROJECTION_MATRIX), glGetDoublev(GL_MODELVIEW_MATRIX))
+    profiler.lap("setup")
+
+    render_static_scene(quality.outlines)
+    render_obstacles(quality.outlines)
+    profiler.lap("arena")
+
+    team_colors = ((car_color1, (1,1,0)), (car_color2, (1,0.5,0.5)))
+    visible = [(pose, car) for pose, car in zip(cars, sim.cars)
+               if frustum.sphere("cars", pose[0], pose[1], pose[2], car_bound_radius)]
+    render_cars([(x, y, z, angle) + team_colors[car.team] for (x, y, z, angle), car in visible],
+                [pick_lod(WHEEL_LODS, pixels_at(eye, pose, wheel_radius), quality.lod_bias) for pose, _ in visible],
+                quality.outlines)
+    profiler.lap("cars")
+
+    if frustum.sphere("ball", ball[0], ball[1], ball[2], ball_radius):
+        render_ball(ball, pick_lod(BALL_LODS, pixels_at(eye, ball, ball_radius), quality.lod_bias))
+    profiler.lap("ball")
+
+    render_hud(current, quality.hud)
+    profiler.lap("hud")
+
+    # the governor sees the frame's work up to glFinish, rasterization included
+    # (software GL does it there), but not the swap: with vsync that waits for
+    # the next vblank, and frames paced at the refresh rate would look over budget
+    glFinish()
+    frame_work = time.perf_counter() - frame_start
+    profiler.lap("finish")
     glutSwapBuffers()
+    profiler.lap("swap")
+    profiler.end_frame()
+    governor.frame(frame_work)
 
 # --------------------------
 # Input handlers
@@ -723,13 +476,32 @@ def handle_special_keys(key, x, y):
         camera_height += 10.0
     elif key == GLUT_KEY_DOWN:
         camera_height -= 10.0
-    glutPostRedisplay()
 
+# Colors, profiler, governor, culling and quit act right away on the GLUT thread; everything that
+# changes the match is queued with its arrival time for the physics thread.
 def handle_keyboard(key, x, y):
-    global car1_moving, car2_moving, car1_vz, car2_vz, car1_boosting, car2_boosting, car_color1, car_color2, is_paused
     k = key.decode('utf-8') if isinstance(key, bytes) else key
     k = k.lower()
-    # Car1 controls: W/S forward/back, A/D rotate, Space jump, E boost, B color
+    if k == 'b':
+        car_color1[0], car_color1[1], car_color1[2] = rng.random(), rng.random(), rng.random()
+    elif k == 'n':
+        car_color2[0], car_color2[1], car_color2[2] = rng.random(), rng.random(), rng.random()
+    elif k == 'f':
+        profiler.toggle()
+    elif k == 't':
+        profiler.export_trace("frame_trace.json")
+    elif k == 'g':
+        governor.enabled = not governor.enabled
+    elif k == 'c':
+        frustum.enabled = not frustum.enabled
+    elif k == 'q':
+        sys.exit(0)
+    else:
+        input_queue.push(apply_key_down, k)
+
+def apply_key_down(k):
+    global car1_moving, car2_moving, car1_jump, car2_jump, car1_boosting, car2_boosting
+    # Car1 controls: W/S forward/back, A/D rotate, Space jump, E boost
     if k == 'a':
         car1_moving[2] = True
     elif k == 'd':
@@ -739,15 +511,12 @@ def handle_keyboard(key, x, y):
     elif k == 's':
         car1_moving[1] = True
     elif k == ' ':
-        # space = car1 jump
-        if car1_position[2] <= 35.01:
-            car1_vz = car_jump_strength * (1.2 if car1_boosting and car1_boost > 0 else 1.0)
+        # space = car1 jump (applied by the engine on the next tick if grounded)
+        car1_jump = True
     elif k == 'e':
         car1_boosting = True
-    elif k == 'b':
-        car_color1[0], car_color1[1], car_color1[2] = rng.random(), rng.random(), rng.random()
 
-    # Car2 controls: I/K forward/back, J/L rotate, U jump (chosen due to GLUT limitations), O boost, N color
+    # Car2 controls: I/K forward/back, J/L rotate, U jump (chosen due to GLUT limitations), O boost
     elif k == 'j':
         car2_moving[2] = True
     elif k == 'l':
@@ -757,26 +526,22 @@ def handle_keyboard(key, x, y):
     elif k == 'k':
         car2_moving[1] = True
     elif k == 'u':  # car2 jump (use 'u' key as Right-Shift is unreliable in GLUT)
-        if car2_position[2] <= 35.01:
-            car2_vz = car_jump_strength * (1.2 if car2_boosting and car2_boost > 0 else 1.0)
+        car2_jump = True
     elif k == 'o':
         car2_boosting = True
-    elif k == 'n':
-        car_color2[0], car_color2[1], car_color2[2] = rng.random(), rng.random(), rng.random()
 
     # General controls
     elif k == 'p':
         toggle_pause()
     elif k == 'r':
         reset_game()
-    elif k == 'q':
-        sys.exit(0)
-    glutPostRedisplay()
 
 def handle_keyboard_up(key, x, y):
-    global car1_moving, car2_moving, car1_boosting, car2_boosting
     k = key.decode('utf-8') if isinstance(key, bytes) else key
-    k = k.lower()
+    input_queue.push(apply_key_up, k.lower())
+
+def apply_key_up(k):
+    global car1_moving, car2_moving, car1_boosting, car2_boosting
     if k == 'a':
         car1_moving[2] = False
     elif k == 'd':
@@ -797,13 +562,10 @@ def handle_keyboard_up(key, x, y):
         car2_moving[1] = False
     elif k == 'o':
         car2_boosting = False
-    glutPostRedisplay()
 
 def mouse_click(button, state, x, y):
-    global is_paused
     if button == GLUT_MIDDLE_BUTTON and state == GLUT_DOWN:
-        toggle_pause()
-    glutPostRedisplay()
+        input_queue.push(toggle_pause)
 
 def toggle_pause():
     global is_paused
@@ -812,15 +574,19 @@ def toggle_pause():
 # --------------------------
 # Timer & main init
 # --------------------------
-def idle_func():
-    glutPostRedisplay()
+# Physics ticks every dt on its own thread; frames are paced by FRAME_CAP
+FRAME_CAP = 60
+MAX_CATCHUP_STEPS = 5
+input_queue = InputQueue()
+snapshots = SnapshotBuffer(take_snapshot(sim, time.perf_counter()))
+physics = PhysicsThread(update_physics, dt, max_lag=MAX_CATCHUP_STEPS)
+pacer = FramePacer(FRAME_CAP)
+# trades mesh detail, outlines and HUD detail for frame time to hold FRAME_CAP ('g' toggles)
+governor = QualityGovernor(target_fps=FRAME_CAP)
 
 def timer_func(val):
-    # Timer drives steady physics stepping too
-    if not is_paused:
-        update_physics()
     glutPostRedisplay()
-    glutTimerFunc(int(dt * 1000), timer_func, 0)
+    glutTimerFunc(int(pacer.frame_delay() * 1000), timer_func, 0)
 
 def init_glut():
     glutInit()
@@ -837,10 +603,23 @@ def init_glut():
     glutKeyboardUpFunc(handle_keyboard_up)
     glutSpecialFunc(handle_special_keys)
     glutMouseFunc(mouse_click)
-    glutIdleFunc(idle_func)
-    glutTimerFunc(int(dt*1000), timer_func, 0)
+    glutTimerFunc(0, timer_func, 0)
 
 if __name__ == "__main__":
+    if "--record" in sys.argv:
+        recorder = InputRecorder(sys.argv[sys.argv.index("--record") + 1], sim)
+        atexit.register(recorder.close)
+    if "--profile" in sys.argv:
+        profiler.enable()
+    if "--bot-green" in sys.argv:
+        drivers[0] = realtime_bot()
+    if "--bot-red" in sys.argv:
+        drivers[1] = realtime_bot()
+    for driver in drivers:
+        if driver is not None:
+            driver.attach(sim)  # builds the drive tables (about a second) before physics starts
     init_glut()
+    physics.start()
+    atexit.register(physics.stop)  # runs before recorder.close (atexit is last in, first out)
     glutMainLoop()
 
@@ -0,0 +1,143 @@
+from collections import OrderedDict
+
+from OpenGL.GL import *
+from OpenGL.GLUT import *
+
+from glstate import gl_state
+
+# --------------------------
+# Glyph-atlas text for the HUD
+# --------------------------
+# The GLUT bitmap font is drawn once, glyph by glyph, into a grid on the back
+# buffer and read back into an alpha texture. Each string is then laid out
+# into textured quads compiled into a display list keyed by (x, y, text), so a
+# label that did not change since last frame costs one glCallList. Only new
+# content (e.g. a score going up) is laid out again.
+# --------------------------
+FIRST_CHAR = 32
+LAST_CHAR = 126
+COLUMNS = 16
+CELL_W = 24
+CELL_H = 24
+DESCENT = 6  # pixels below the baseline kept inside each cell
+
+class HudText:
+    def __init__(self, font=GLUT_BITMAP_HELVETICA_18, max_strings=64):
+        self.font = font
+        self.max_strings = max_strings
+        self.texture = None
+        self.advances = {}
+        self._strings = OrderedDict()  # (x, y, text) -> display list, least recent first
+        self.layouts = 0  # strings laid out since startup (cache misses)
+
+    @property
+    def ready(self):
+        return self.texture is not None
+
+    def build(self, win_w, win_h):
+        """Rasterize the font into the atlas. Call at the start of a frame, before glClear."""
+        rows = (LAST_CHAR - FIRST_CHAR) // COLUMNS + 1
+        atlas_w = COLUMNS * CELL_W
+        atlas_h = rows * CELL_H
+
+        glPushAttrib(GL_ENABLE_BIT | GL_COLOR_BUFFER_BIT | GL_CURRENT_BIT | GL_PIXEL_MODE_BIT)
+        glDisable(GL_LIGHTING)
+        glDisable(GL_DEPTH_TEST)
+        glDisable(GL_TEXTURE_2D)
+        glMatrixMode(GL_PROJECTION)
+        glPushMatrix()
+        glLoadIdentity()
+        glOrtho(0, win_w, 0, win_h, -1, 1)
+        glMatrixMode(GL_MODELVIEW)
+        glPushMatrix()
+        glLoadIdentity()
+
+        glClearColor(0.0, 0.0, 0.0, 1.0)
+        glClear(GL_COLOR_BUFFER_BIT)
+        glColor3f(1.0, 1.0, 1.0)
+        for code in range(FIRST_CHAR, LAST_CHAR + 1):
+            col, row = self._cell(code)
+            glRasterPos2i(col * CELL_W, row * CELL_H + DESCENT)
+            glutBitmapCharacter(self.font, code)
+            self.advances[chr(code)] = glutBitmapWidth(self.font, code)
+        glPixelStorei(GL_PACK_ALIGNMENT, 1)
+        pixels = glReadPixels(0, 0, atlas_w, atlas_h, GL_RED, GL_UNSIGNED_BYTE)
+
+        glPopMatrix()
+        glMatrixMode(GL_PROJECTION)
+        glPopMatrix()
+        glMatrixMode(GL_MODELVIEW)
+        glPopAttrib()
+
+        self.texture = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_2D, self.texture)
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_NEAREST)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_NEAREST)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_EDGE)
+        glTexImage2D(GL_TEXTURE_2D, 0, GL_ALPHA, atlas_w, atlas_h, 0, GL_ALPHA, GL_UNSIGNED_BYTE, pixels)
+        glBindTexture(GL_TEXTURE_2D, 0)
+        self._atlas_size = (float(atlas_w), float(atlas_h))
+
+    def _cell(self, code):
+        index = code - FIRST_CHAR
+        return index % COLUMNS, index // COLUMNS
+
+    def width(self, text):
+        return sum(self.advances.get(ch, 0) for ch in text)
+
+    def draw(self, x, y, text):
+        """Draw text with its baseline starting at (x, y) in the current color."""
+        key = (x, y, text)
+        list_id = self._strings.get(key)
+        if list_id is None:
+            list_id = self._layout(x, y, text)
+            self._strings[key] = list_id
+            if len(self._strings) > self.max_strings:
+                _, old = self._strings.popitem(last=False)
+                glDeleteLists(old, 1)
+        else:
+            self._strings.move_to_end(key)
+
+        gl_state.enable(GL_TEXTURE_2D)
+        gl_state.enable(GL_BLEND)
+        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+        glBindTexture(GL_TEXTURE_2D, self.texture)
+        glCallList(list_id)
+        glBindTexture(GL_TEXTURE_2D, 0)
+        gl_state.disable(GL_BLEND)
+        gl_state.disable(GL_TEXTURE_2D)
+
+    def _layout(self, x, y, text):
+        self.layouts += 1
+        atlas_w, atlas_h = self._atlas_size
+        pen = int(round(x))
+        base = int(round(y)) - DESCENT
+        list_id = glGenLists(1)
+        glNewList(list_id, GL_COMPILE)
+        glBegin(GL_QUADS)
+        for ch in text:
+            code = ord(ch)
+            if FIRST_CHAR <= code <= LAST_CHAR and ch != ' ':
+                col, row = self._cell(code)
+                u0 = col * CELL_W / atlas_w
+                v0 = row * CELL_H / atlas_h
+                u1 = (col + 1) * CELL_W / atlas_w
+                v1 = (row + 1) * CELL_H / atlas_h
+                glTexCoord2f(u0, v0); glVertex2i(pen, base)
+                glTexCoord2f(u1, v0); glVertex2i(pen + CELL_W, base)
+                glTexCoord2f(u1, v1); glVertex2i(pen + CELL_W, base + CELL_H)
+                glTexCoord2f(u0, v1); glVertex2i(pen, base + CELL_H)
+            pen += self.advances.get(ch, 0)
+        glEnd()
+        glEndList()
+        return list_id
+
+    def release(self):
+        for list_id in self._strings.values():
+            glDeleteLists(list_id, 1)
+        self._strings.clear()
+        if self.texture is not None:
+            glDeleteTextures([self.texture])
+            self.texture = None
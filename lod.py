@@ -0,0 +1,97 @@
+import math
+from collections import deque, namedtuple
+
+# --------------------------
+# Level of detail by projected size
+# --------------------------
+# A mesh's detail is picked from how many pixels it covers on screen, not
+# from its distance alone, so the same table works for any window size or
+# field of view. Each table lists (min pixels, detail) from finest to
+# coarsest; every detail is its own cached display list (the MeshCache key
+# includes it), so switching level never recompiles anything. The finest
+# levels are the original 28x28 ball and 12x4 wheels, which the default
+# camera still gets.
+# --------------------------
+BALL_LODS = ((48.0, (28, 28)), (24.0, (18, 18)), (10.0, (12, 10)), (0.0, (8, 6)))  # slices, stacks
+WHEEL_LODS = ((24.0, (12, 4)), (10.0, (8, 2)), (0.0, (6, 1)))
+
+def projected_size(radius, distance, fov_y, viewport_h):
+    """Approximate on-screen diameter in pixels of a sphere of radius at distance (fov_y in degrees)."""
+    if distance <= radius:
+        return float(viewport_h)
+    return radius * viewport_h / (distance * math.tan(math.radians(fov_y) / 2.0))
+
+def pick_lod(table, pixels, bias=0):
+    """Detail for an object covering pixels, made bias levels coarser (clamped to the table)."""
+    level = len(table) - 1
+    for i, (min_pixels, _) in enumerate(table):
+        if pixels >= min_pixels:
+            level = i
+            break
+    return table[min(level + bias, len(table) - 1)][1]
+
+# --------------------------
+# Frame-budget quality governor
+# --------------------------
+# Watches how long each frame's work takes and steps a quality level up or
+# down to keep that under the frame budget (1 / target_fps). Each level is a
+# Quality: how many LOD levels coarser to draw, whether the wireframe outline
+# passes run, and how much HUD to draw (2 everything, 1 no labels or meter
+# outlines, 0 scores and health only). Going down a level needs `patience`
+# frames over budget in the window; going back up needs twice that many well
+# under it (below `headroom` of the budget), so the level does not flap.
+# --------------------------
+Quality = namedtuple("Quality", "lod_bias outlines hud")
+
+QUALITY_LEVELS = (
+    Quality(0, True, 2),
+    Quality(1, True, 2),
+    Quality(1, False, 2),
+    Quality(2, False, 1),
+    Quality(3, False, 0),
+)
+
+class QualityGovernor:
+    """
+    target_fps: frame rate to hold
+    window: frames of frame-time history considered
+    patience: frames over budget (within the window) before lowering quality
+    headroom: fraction of the budget a frame must stay under to count toward raising it
+    """
+
+    def __init__(self, target_fps=60, window=30, patience=10, headroom=0.6, levels=QUALITY_LEVELS):
+        self.budget = 1.0 / target_fps
+        self.window = window
+        self.patience = patience
+        self.headroom = headroom
+        self.levels = levels
+        self.level = 0
+        self.enabled = True
+        self.changes = 0
+        self._times = deque(maxlen=window)
+
+    @property
+    def quality(self):
+        return self.levels[self.level]
+
+    def frame(self, seconds):
+        """Record one frame's work time; returns the Quality to draw the next frame with."""
+        if not self.enabled:
+            self.level = 0
+            return self.levels[0]
+        times = self._times
+        times.append(seconds)
+        if len(times) == self.window:
+            over = sum(1 for t in times if t > self.budget)
+            under = sum(1 for t in times if t < self.budget * self.headroom)
+            if over >= self.patience and self.level < len(self.levels) - 1:
+                self._change(1)
+            elif under >= min(self.window, 2 * self.patience) and self.level > 0:
+                self._change(-1)
+        return self.levels[self.level]
+
+    def _change(self, step):
+        # judge the new level on its own frames only
+        self.level += step
+        self.changes += 1
+        self._times.clear()
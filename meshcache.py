@@ -0,0 +1,169 @@
+from OpenGL.GL import *
+from OpenGL.GLUT import *
+from OpenGL.GLU import *
+
+from glstate import gl_state
+
+# --------------------------
+# Mesh cache: geometry compiled once into display lists
+# --------------------------
+# Meshes are keyed by name plus the parameters they were built from, so a
+# change of e.g. car_size simply compiles a new entry. Colors are left out of
+# the lists wherever they vary per instance; the caller sets them before the
+# call, which is what lets many cars share one compiled mesh.
+# --------------------------
+class MeshCache:
+    def __init__(self):
+        self._lists = {}
+        self._slots = {}
+
+    def get(self, key, build, *args):
+        """Return the display list for key, compiling build(*args) on first use."""
+        list_id = self._lists.get(key)
+        if list_id is None:
+            list_id = glGenLists(1)
+            glNewList(list_id, GL_COMPILE)
+            build(*args)
+            glEndList()
+            self._lists[key] = list_id
+        return list_id
+
+    def call(self, key, build, *args):
+        glCallList(self.get(key, build, *args))
+
+    def get_slot(self, slot, key, build, *args):
+        """
+        Like get, but slot holds at most one compiled version: when key changes
+        (e.g. new arena parameters) the old list is freed and build runs again.
+        """
+        entry = self._slots.get(slot)
+        if entry is not None and entry[0] == key:
+            return entry[1]
+        if entry is not None:
+            glDeleteLists(entry[1], 1)
+        list_id = glGenLists(1)
+        glNewList(list_id, GL_COMPILE)
+        build(*args)
+        glEndList()
+        self._slots[slot] = (key, list_id)
+        return list_id
+
+    def release(self):
+        for list_id in self._lists.values():
+            glDeleteLists(list_id, 1)
+        for _, list_id in self._slots.values():
+            glDeleteLists(list_id, 1)
+        self._lists.clear()
+        self._slots.clear()
+
+# --------------------------
+# Builders (local coordinates, car facing +X)
+# --------------------------
+def build_car_body(car_size):
+    # Body (slightly flattened), elongated in x to make a car-like shape
+    glPushMatrix()
+    glScalef(1.4, 0.9, 0.5)
+    glutSolidCube(car_size)
+    glPopMatrix()
+
+def build_car_nose(car_size):
+    # Nose / front: tapered triangular prism in front of the body (positive X local)
+    nose_len = car_size * 0.6
+    nose_w = car_size * 0.9
+    nose_h = car_size * 0.4
+    bx = car_size * 0.7  # back of nose relative to center
+    front_x = bx + nose_len
+    back_x = bx - nose_len * 0.2
+    half_w = nose_w / 2.0
+    half_h = nose_h / 2.0
+
+    glBegin(GL_TRIANGLES)
+    # top/front triangle
+    glNormal3f(0,0,1)
+    glVertex3f(front_x, 0.0, half_h)
+    glVertex3f(back_x, -half_w, half_h)
+    glVertex3f(back_x, half_w, half_h)
+    # bottom/front triangle
+    glNormal3f(0,0,-1)
+    glVertex3f(front_x, 0.0, -half_h)
+    glVertex3f(back_x, half_w, -half_h)
+    glVertex3f(back_x, -half_w, -half_h)
+    # left side
+    glNormal3f(-1,0,0)
+    glVertex3f(front_x, 0.0, half_h)
+    glVertex3f(back_x, half_w, half_h)
+    glVertex3f(back_x, half_w, -half_h)
+    # right side
+    glNormal3f(1,0,0)
+    glVertex3f(front_x, 0.0, half_h)
+    glVertex3f(back_x, -half_w, -half_h)
+    glVertex3f(back_x, -half_w, half_h)
+    glEnd()
+
+def build_wheels(car_size, offset, radius, height, slices=12, stacks=4):
+    # All four wheels in one list; a single quadric is used and freed right away
+    quad = gluNewQuadric()
+    glColor3f(0.05,0.05,0.05)
+    for dx in [-offset, offset]:
+        for dy in [-offset*0.6, offset*0.6]:
+            glPushMatrix()
+            glTranslatef(dx, dy, -car_size * 0.25)
+            glRotatef(90, 0, 1, 0)
+            gluCylinder(quad, radius, radius, height, slices, stacks)
+            glPopMatrix()
+    gluDeleteQuadric(quad)
+
+def build_car_outline(car_size):
+    glPushMatrix()
+    glScalef(1.4*1.01, 0.9*1.01, 0.5*1.01)
+    glutWireCube(car_size)
+    glPopMatrix()
+
+def build_sphere(radius, slices, stacks):
+    glutSolidSphere(radius, slices, stacks)
+
+# --------------------------
+# Instanced car drawing
+# --------------------------
+def draw_cars(cache, cars, car_size, wheel_offset, wheel_radius, wheel_height,
+              wheel_details=None, outlines=True):
+    """
+    cars: iterable of (x, y, z, angle, color, outline_color).
+    wheel_details: optional (slices, stacks) per car for the wheel cylinders (see lod.py).
+    outlines: False skips the wireframe pass.
+    Each car costs a transform, a few colors and list calls; the solid passes run
+    for all cars first so lighting is switched off only once for the outlines.
+    """
+    cars = list(cars)
+    if wheel_details is None:
+        wheel_details = [(12, 4)] * len(cars)
+    body = cache.get(("car_body", car_size), build_car_body, car_size)
+    nose = cache.get(("car_nose", car_size), build_car_nose, car_size)
+
+    for (x, y, z, angle, color, _), (slices, stacks) in zip(cars, wheel_details):
+        wheels = cache.get(("wheels", car_size, wheel_offset, wheel_radius, wheel_height, slices, stacks),
+                           build_wheels, car_size, wheel_offset, wheel_radius, wheel_height, slices, stacks)
+        glPushMatrix()
+        glTranslatef(x, y, z)
+        glRotatef(angle, 0, 0, 1)
+        gl_state.color(color[0], color[1], color[2])
+        glCallList(body)
+        gl_state.color(color[0]*0.9 + 0.05, color[1]*0.9 + 0.05, color[2]*0.9 + 0.05)
+        glCallList(nose)
+        glCallList(wheels)
+        gl_state.invalidate("color")  # the wheel list sets its own color
+        glPopMatrix()
+
+    if not outlines:
+        return
+    # outline (wireframe) to emphasize shape
+    outline = cache.get(("car_outline", car_size), build_car_outline, car_size)
+    gl_state.disable(GL_LIGHTING)
+    for x, y, z, angle, _, outline_color in cars:
+        glPushMatrix()
+        glTranslatef(x, y, z)
+        glRotatef(angle, 0, 0, 1)
+        gl_state.color(*outline_color)
+        glCallList(outline)
+        glPopMatrix()
+    gl_state.enable(GL_LIGHTING)
@@ -0,0 +1,251 @@
+import argparse
+import asyncio
+import random
+import struct
+import sys
+import time
+
+from controllers import CONTROLLERS
+from replay import state_digest
+from simulation import Simulation
+from state import StateRing
+
+# --------------------------
+# Rollback session: prediction and re-simulation for one player's machine
+# --------------------------
+# Each machine simulates the whole match. Its own car uses the real local
+# input right away. The remote car uses the remote input when it has arrived,
+# and otherwise a prediction: the last remote input that arrived. The state
+# before every tick is saved in a StateRing. When a remote input turns out to
+# differ from what was predicted for its tick, the next advance() restores
+# that tick and re-simulates up to the present with the corrected inputs.
+# The simulation may run at most max_rollback ticks ahead of the last tick
+# whose remote input is confirmed; beyond that, can_advance() is False and
+# the caller waits (a stall) instead of predicting further.
+# --------------------------
+class RollbackSession:
+    def __init__(self, sim, local, max_rollback=8):
+        self.sim = sim
+        self.local = local
+        self.remote = 1 - local
+        self.max_rollback = max_rollback
+        self.ring = StateRing(len(sim.cars), capacity=max_rollback + 2)
+        self.local_inputs = {}   # tick -> bits
+        self.remote_inputs = {}  # tick -> bits, confirmed
+        self.used_remote = {}    # tick -> bits the last simulation of that tick used
+        self.confirmed = -1      # every remote input up to this tick has arrived
+        self._latest_remote = (-1, 0)  # (tick, bits) of the newest confirmed remote input
+        self._rollback_from = None
+        # stats
+        self.rollbacks = 0
+        self.resimulated_ticks = 0
+        self.max_depth = 0
+        self.max_rollback_seconds = 0.0
+        self.stalls = 0
+
+    def can_advance(self):
+        return self.sim.tick - self.confirmed <= self.max_rollback
+
+    def advance(self, bits):
+        """Apply any pending rollback, then simulate the next tick with the local input bits."""
+        self.sync()
+        tick = self.sim.tick
+        self.local_inputs[tick] = bits
+        self._step(tick)
+
+    def sync(self):
+        if self._rollback_from is None:
+            return
+        start = time.perf_counter()
+        sim = self.sim
+        now = sim.tick
+        first = self._rollback_from
+        self._rollback_from = None
+        self.ring.restore(sim, first)
+        while sim.tick < now:
+            self._step(sim.tick)
+        depth = now - first
+        self.rollbacks += 1
+        self.resimulated_ticks += depth
+        self.max_depth = max(self.max_depth, depth)
+        self.max_rollback_seconds = max(self.max_rollback_seconds, time.perf_counter() - start)
+
+    def _step(self, tick):
+        sim = self.sim
+        remote = self.remote_inputs.get(tick)
+        if remote is None:
+            remote = self._latest_remote[1]
+        self.used_remote[tick] = remote
+        inputs = [0] * len(sim.cars)
+        inputs[self.local] = self.local_inputs[tick]
+        inputs[self.remote] = remote
+        self.ring.snapshot(sim)
+        sim.step(inputs)
+
+    def on_remote_input(self, tick, bits):
+        if tick in self.remote_inputs or tick <= self.confirmed:
+            return
+        self.remote_inputs[tick] = bits
+        if tick > self._latest_remote[0]:
+            self._latest_remote = (tick, bits)
+        while self.confirmed + 1 in self.remote_inputs:
+            self.confirmed += 1
+        if tick < self.sim.tick and self.used_remote.get(tick) != bits:
+            if self._rollback_from is None or tick < self._rollback_from:
+                self._rollback_from = tick
+        self._forget(self.confirmed - self.max_rollback - 2)
+
+    def _forget(self, before):
+        # inputs older than the ring can never be re-simulated again; the local
+        # ones are also kept until acknowledged (see NetPeer.datagram_received)
+        for table in (self.remote_inputs, self.used_remote):
+            for tick in [t for t in table if t < before]:
+                del table[tick]
+
+# --------------------------
+# UDP transport
+# --------------------------
+# Each datagram carries this peer's inputs from the first tick the other side
+# has not acknowledged up to the present (at most MAX_REDUNDANT of them), plus
+# an ack of the remote inputs received so far. Every packet therefore repeats
+# everything still unacknowledged, and a lost packet is covered by the next one.
+# --------------------------
+PACKET = struct.Struct("<iiB")  # first tick, ack (remote ticks confirmed), count
+MAX_REDUNDANT = 64
+
+class LossyLink:
+    """Sends through the transport after latency (+ jitter) seconds, dropping a fraction of packets."""
+
+    def __init__(self, latency=0.0, jitter=0.0, loss=0.0, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.loss = loss
+        self.rng = random.Random(seed)
+        self.sent = 0
+        self.dropped = 0
+
+    def send(self, transport, data, addr):
+        self.sent += 1
+        if self.rng.random() < self.loss:
+            self.dropped += 1
+            return
+        delay = self.latency + self.rng.uniform(0.0, self.jitter)
+        if delay <= 0.0:
+            transport.sendto(data, addr)
+        else:
+            asyncio.get_running_loop().call_later(delay, self._deliver, transport, data, addr)
+
+    def _deliver(self, transport, data, addr):
+        if not transport.is_closing():
+            transport.sendto(data, addr)
+
+class NetPeer(asyncio.DatagramProtocol):
+    def __init__(self, session, remote_addr, link=None):
+        self.session = session
+        self.remote_addr = remote_addr
+        self.link = link if link is not None else LossyLink()
+        self.transport = None
+        self.peer_ack = -1  # our inputs up to here have reached the other side
+        self._pruned = -1
+        self.bytes_sent = 0
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        if len(data) < PACKET.size:
+            return
+        first, ack, count = PACKET.unpack_from(data)
+        body = data[PACKET.size:PACKET.size + count]
+        for i, bits in enumerate(body):
+            self.session.on_remote_input(first + i, bits)
+        if ack > self.peer_ack:
+            self.peer_ack = ack
+        # a local input can go once it is acknowledged and too old to be re-simulated
+        session = self.session
+        limit = min(self.peer_ack, session.confirmed - session.max_rollback - 2)
+        while self._pruned < limit:
+            self._pruned += 1
+            session.local_inputs.pop(self._pruned, None)
+
+    def pending_inputs(self):
+        first = self.peer_ack + 1
+        local = self.session.local_inputs
+        body = bytearray()
+        tick = first
+        while tick in local and len(body) < MAX_REDUNDANT:
+            body.append(local[tick])
+            tick += 1
+        return first, bytes(body)
+
+    def send_inputs(self):
+        first, body = self.pending_inputs()
+        data = PACKET.pack(first, self.session.confirmed, len(body)) + body
+        self.bytes_sent += len(data)
+        self.link.send(self.transport, data, self.remote_addr)
+
+async def run_peer(session, peer, controller, ticks, rate):
+    """Drive one session at `rate` ticks per second until `ticks` ticks are confirmed on both sides."""
+    sim = session.sim
+    period = 1.0 / rate
+    loop = asyncio.get_running_loop()
+    next_time = loop.time()
+    while sim.tick < ticks or session.confirmed < ticks - 1 or peer.peer_ack < ticks - 1:
+        if sim.tick < ticks:
+            if session.can_advance():
+                session.advance(controller(sim, session.local))
+            else:
+                session.stalls += 1
+        peer.send_inputs()
+        next_time += period
+        await asyncio.sleep(max(0.0, next_time - loop.time()))
+    session.sync()
+
+async def loopback_match(ticks=600, rate=60.0, latency=0.05, jitter=0.01, loss=0.1,
+                         max_rollback=8, controllers=("chaser", "random"), port=47800, seed=1234):
+    """Two peers on 127.0.0.1 talking through lossy, delayed links; returns both sessions and peers."""
+    loop = asyncio.get_running_loop()
+    addrs = (("127.0.0.1", port), ("127.0.0.1", port + 1))
+    sessions = []
+    peers = []
+    for side in (0, 1):
+        session = RollbackSession(Simulation(seed=seed), side, max_rollback)
+        link = LossyLink(latency, jitter, loss, seed=side)
+        transport, peer = await loop.create_datagram_endpoint(
+            lambda s=session, a=addrs[1 - side], l=link: NetPeer(s, a, l), local_addr=addrs[side])
+        sessions.append(session)
+        peers.append(peer)
+    drivers = [CONTROLLERS[name](seed + side) for side, name in enumerate(controllers)]
+    try:
+        await asyncio.gather(*(run_peer(s, p, d, ticks, rate) for s, p, d in zip(sessions, peers, drivers)))
+        # give the last acks in flight time to land before closing
+        await asyncio.sleep(latency + jitter)
+    finally:
+        for peer in peers:
+            peer.transport.close()
+    return sessions, peers
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Two rollback peers over a lossy local UDP loopback.")
+    parser.add_argument("--ticks", type=int, default=600)
+    parser.add_argument("--rate", type=float, default=60.0, help="ticks per second")
+    parser.add_argument("--latency", type=float, default=0.05, help="one-way delay in seconds")
+    parser.add_argument("--jitter", type=float, default=0.01)
+    parser.add_argument("--loss", type=float, default=0.1, help="fraction of packets dropped")
+    parser.add_argument("--max-rollback", type=int, default=8)
+    parser.add_argument("--port", type=int, default=47800)
+    args = parser.parse_args(argv)
+
+    sessions, peers = asyncio.run(loopback_match(args.ticks, args.rate, args.latency, args.jitter,
+                                                 args.loss, args.max_rollback, port=args.port))
+    for s, p in zip(sessions, peers):
+        print(f"peer {s.local}: tick {s.sim.tick} score {s.sim.scores} rollbacks {s.rollbacks} "
+              f"resimulated {s.resimulated_ticks} max depth {s.max_depth} "
+              f"worst rollback {s.max_rollback_seconds * 1000:.2f} ms stalls {s.stalls} "
+              f"sent {p.link.sent} dropped {p.link.dropped} bytes {p.bytes_sent}")
+    digests = [state_digest(s.sim) for s in sessions]
+    print("in sync" if digests[0] == digests[1] else "DESYNC", digests[0])
+    return 0 if digests[0] == digests[1] else 1
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,113 @@
+import threading
+import time
+from collections import deque, namedtuple
+
+from scheduler import lerp_pose
+
+# --------------------------
+# Physics on its own thread
+# --------------------------
+# The physics thread ticks at a fixed rate on its own clock, so a slow frame
+# (big window, software GL) no longer slows the game down. The two threads
+# share exactly two things:
+#   InputQueue     - window events stamped with the time they arrived; the
+#                    physics thread applies those stamped at or before a tick's
+#                    scheduled time just before running that tick
+#   SnapshotBuffer - the last two published Snapshots; each is an immutable
+#                    copy of what the renderer and HUD need, and publishing
+#                    replaces the (previous, current) pair with a single
+#                    reference store, so the renderer reads a matching pair
+#                    without taking a lock
+# Everything else (the Simulation, the input state) is touched only by the
+# physics thread once it is running. PyOpenGL calls and the sleeps here
+# release the GIL, so the two threads overlap for the time spent in the
+# driver and in buffer swaps.
+# --------------------------
+Snapshot = namedtuple("Snapshot", "tick time cars ball scores health boost paused")
+
+def take_snapshot(sim, when, paused=False):
+    """Immutable copy of sim for rendering; when = the (scheduled) tick time it belongs to."""
+    cars, ball = sim.pose()
+    return Snapshot(sim.tick, when, cars, ball, tuple(sim.scores),
+                    tuple(car.health for car in sim.cars), tuple(car.boost for car in sim.cars), paused)
+
+class SnapshotBuffer:
+    def __init__(self, first):
+        self._pair = (first, first)
+
+    def publish(self, snapshot):
+        """Writer side (one thread): make snapshot current, keeping the one before it for interpolation."""
+        self._pair = (self._pair[1], snapshot)
+
+    def read(self):
+        """(previous, current); safe from any thread, never blocks."""
+        return self._pair
+
+def interpolate(previous, current, dt, now):
+    """Pose blended between the two snapshots by how far now is past current.time (render one tick behind)."""
+    alpha = min(1.0, max(0.0, (now - current.time) / dt))
+    return lerp_pose((previous.cars, previous.ball), (current.cars, current.ball), alpha)
+
+class InputQueue:
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.events = deque()  # (time, fn, args); append / popleft are atomic
+        self.max_latency = 0.0
+
+    def push(self, fn, *args):
+        """Queue fn(*args) to run on the physics thread at the next tick boundary."""
+        self.events.append((self.clock(), fn, args))
+
+    def drain(self, until=None):
+        """Run the queued events stamped at or before until (all of them if None), oldest first."""
+        events = self.events
+        while events and (until is None or events[0][0] <= until):
+            stamp, fn, args = events.popleft()
+            if until is not None:
+                self.max_latency = max(self.max_latency, until - stamp)
+            fn(*args)
+
+class PhysicsThread:
+    """
+    step:    callable(tick_time) running one tick scheduled for tick_time (clock seconds)
+    dt:      tick length in seconds
+    max_lag: ticks the thread may fall behind before the backlog is dropped
+    """
+
+    def __init__(self, step, dt, max_lag=5, clock=time.perf_counter):
+        self.step = step
+        self.dt = dt
+        self.max_lag = max_lag
+        self.clock = clock
+        self.ticks = 0
+        self.dropped_ticks = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="physics", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        dt = self.dt
+        next_tick = self.clock()
+        while not self._stop.is_set():
+            now = self.clock()
+            if now < next_tick:
+                self._stop.wait(next_tick - now)
+                continue
+            behind = int((now - next_tick) / dt)
+            if behind > self.max_lag:
+                # too far behind (e.g. the process was suspended): skip ahead instead of spiralling
+                self.dropped_ticks += behind
+                next_tick += behind * dt
+            self.step(next_tick)
+            self.ticks += 1
+            next_tick += dt
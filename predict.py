@@ -0,0 +1,233 @@
+import numpy as np
+
+from collision import sweep_sphere_plane
+from simulation import CCD_MAX_HITS, CCD_SKIN
+
+# --------------------------
+# Ball trajectory prediction
+# --------------------------
+# Left alone, the ball follows Simulation._update_ball: gravity, ground
+# bounce or roll with friction, air friction, and damped reflection off the
+# walls. Between two such events (a bounce, a wall hit) every tick is a
+# closed form of the previous one:
+#   flight: vz_k = vz0 - k*g,  z_k = z0 + s*(k*vz0 - g*k*(k+1)/2)
+#           v_k = v0 * f**k,   x_k = x0 + s*v0*(1 - f**k)/(1 - f)   (f = air friction)
+#   rolling: the same planar formula with the ground friction, z = radius
+# so each stretch is filled for all remaining ticks at once with NumPy; the
+# first tick that hits the ground or a wall is then stepped with the exact
+# scalar rules and the next stretch starts from there. With
+# continuous_collision on, that tick's planar move is swept against the
+# walls the way Simulation._sweep_ball does (stop at the wall, reflect,
+# carry on with the rest of the move) instead of clamped at the end.
+#
+# Cars and obstacles are not modelled. Instead, Simulation.ball_epoch changes
+# whenever something other than these rules moves the ball (car contact,
+# obstacle, reset, restore), and a cached prediction is only reused while
+# the epoch is unchanged, so any number of consumers can ask every tick and
+# the path is recomputed only after a touch.
+# --------------------------
+MAX_EVENTS = 64  # bounces / wall hits handled in closed form before finishing tick by tick
+
+class Prediction:
+    """
+    start_tick: the sim tick whose ball state is row 0
+    positions, velocities: (K + 1, 3) arrays, row k = state after start_tick + k
+    ground_contact: (tick, (x, y, z)) of the first landing, or None
+    goal_line: (tick, (x, y, z), side) of the first crossing of either goal
+               line (|x| > half - 30), or None; side is +1 / -1 for the x end
+    goal: the same for the first crossing the goal rule counts, or None; the
+          match resets there, so the path ends at that tick
+    stretches: closed-form stretches computed, what the cost of a prediction scales with
+    """
+
+    def __init__(self, start_tick, epoch, positions, velocities, ground_contact, goal_line, goal, stretches=0):
+        self.start_tick = start_tick
+        self.epoch = epoch
+        self.positions = positions
+        self.velocities = velocities
+        self.ground_contact = ground_contact
+        self.goal_line = goal_line
+        self.goal = goal
+        self.stretches = stretches
+
+    @property
+    def end_tick(self):
+        return self.start_tick + len(self.positions) - 1
+
+    def at(self, tick):
+        """Predicted ball position at tick, or None outside the predicted range."""
+        k = tick - self.start_tick
+        if 0 <= k < len(self.positions):
+            return tuple(self.positions[k])
+        return None
+
+    def path_from(self, tick):
+        """Positions from tick to the end of the prediction (a view)."""
+        return self.positions[max(0, tick - self.start_tick):]
+
+class BallPredictor:
+    """
+    horizon: ticks predicted ahead (K)
+    refresh_margin: recompute early when fewer than this many ticks remain
+    """
+
+    def __init__(self, sim, horizon=240, refresh_margin=60):
+        self.sim = sim
+        self.horizon = horizon
+        self.refresh_margin = refresh_margin
+        self.cached = None
+        self.hits = 0
+        self.misses = 0
+
+    def get(self):
+        """Prediction covering the current tick, recomputed only if the ball was touched."""
+        sim = self.sim
+        p = self.cached
+        if (p is not None and p.epoch == sim.ball_epoch
+                and p.start_tick <= sim.tick <= p.end_tick - self.refresh_margin):
+            self.hits += 1
+            return p
+        self.misses += 1
+        self.cached = p = predict_ball(sim, self.horizon)
+        return p
+
+    def invalidate(self):
+        self.cached = None
+
+def predict_ball(sim, ticks):
+    r = sim.ball_radius
+    half = sim.arena_size / 2.0
+    limit = half - r
+    goal_x = half - 30
+    scale = sim.move_scale
+    g = 9.8 * sim.dt * 1.5
+    s = sim.dt * 30.0
+    f_air = sim.air_friction ** scale
+    f_ground = sim.ball_friction ** scale
+    f_bounce = 0.98 ** scale
+
+    pos = np.empty((ticks + 1, 3))
+    vel = np.empty((ticks + 1, 3))
+    pos[0] = sim.ball_position
+    vel[0] = sim.ball_velocity
+    ground_contact = None
+    goal_line = None
+    swept = sim.continuous_collision
+
+    def sweep_walls(x, y, z, vx, vy):
+        # the wall part of Simulation._sweep_ball
+        remaining = 1.0
+        for _ in range(CCD_MAX_HITS):
+            dx = vx * s * remaining
+            dy = vy * s * remaining
+            if dx == 0.0 and dy == 0.0:
+                break
+            best_t = 2.0
+            hit = None
+            for nx, ny in ((1.0, 0.0), (-1.0, 0.0), (0.0, 1.0), (0.0, -1.0)):
+                t = sweep_sphere_plane((x, y, z), (dx, dy, 0.0), r, (nx, ny, 0.0), -half)
+                if t is not None and t < best_t:
+                    best_t, hit = t, (nx, ny)
+            if hit is None:
+                x += dx; y += dy
+                break
+            nx, ny = hit
+            x += dx * best_t + nx * CCD_SKIN
+            y += dy * best_t + ny * CCD_SKIN
+            remaining *= 1.0 - best_t
+            vn = vx * nx + vy * ny
+            if vn < 0.0:
+                vx -= 1.8 * vn * nx
+                vy -= 1.8 * vn * ny
+        return x, y, vx, vy
+
+    def scalar_step(p, v):
+        # one tick of Simulation._update_ball
+        x, y, z = p
+        vx, vy, vz = v
+        vz -= g
+        if swept:
+            x, y, vx, vy = sweep_walls(x, y, z, vx, vy)
+        else:
+            x += vx * s; y += vy * s
+        z += vz * s
+        landed = False
+        if z - r <= 0.0:
+            z = r
+            landed = True
+            if abs(vz) > 1.0:
+                vz = -vz * 0.4
+                vx *= f_bounce; vy *= f_bounce
+            else:
+                vz = 0.0
+                vx *= f_ground; vy *= f_ground
+        else:
+            vx *= f_air; vy *= f_air
+        if x <= -limit:
+            x = -limit; vx = -vx * 0.8
+        elif x >= limit:
+            x = limit; vx = -vx * 0.8
+        if y <= -limit:
+            y = -limit; vy = -vy * 0.8
+        elif y >= limit:
+            y = limit; vy = -vy * 0.8
+        return (x, y, z), (vx, vy, vz), landed
+
+    k0 = 0
+    events = 0
+    while k0 < ticks:
+        x0, y0, z0 = pos[k0]
+        vx0, vy0, vz0 = vel[k0]
+        n = ticks - k0
+        if events < MAX_EVENTS:
+            k = np.arange(1, n + 1, dtype=np.float64)
+            rolling = z0 <= r and vz0 == 0.0
+            f = f_ground if rolling else f_air
+            fk = f ** k
+            travel = s * (1.0 - fk) / (1.0 - f) if f != 1.0 else s * k
+            xs = x0 + vx0 * travel
+            ys = y0 + vy0 * travel
+            if rolling:
+                zs = np.full(n, r)
+                vzs = np.zeros(n)
+                event = np.zeros(n, dtype=bool)
+            else:
+                vzs = vz0 - g * k
+                zs = z0 + s * (k * vz0 - g * k * (k + 1) / 2.0)
+                event = zs - r <= 0.0
+            event |= (np.abs(xs) >= limit) | (np.abs(ys) >= limit)
+            first = int(np.argmax(event)) if event.any() else n
+            # ticks before the event follow the closed form exactly as scalar steps would
+            pos[k0 + 1:k0 + 1 + first, 0] = xs[:first]
+            pos[k0 + 1:k0 + 1 + first, 1] = ys[:first]
+            pos[k0 + 1:k0 + 1 + first, 2] = zs[:first]
+            vel[k0 + 1:k0 + 1 + first, 0] = vx0 * fk[:first]
+            vel[k0 + 1:k0 + 1 + first, 1] = vy0 * fk[:first]
+            vel[k0 + 1:k0 + 1 + first, 2] = vzs[:first]
+            k0 += first
+            events += 1
+            if k0 >= ticks:
+                break
+        p, v, landed = scalar_step(pos[k0], vel[k0])
+        k0 += 1
+        pos[k0] = p
+        vel[k0] = v
+        if landed and ground_contact is None:
+            ground_contact = (sim.tick + k0, p)
+
+    # goal lines; the goal rule resets the ball, so a scoring path stops there
+    bx = pos[1:, 0]
+    crossed = np.abs(bx) > goal_x
+    goal = None
+    if crossed.any():
+        k = int(np.argmax(crossed)) + 1
+        goal_line = (sim.tick + k, tuple(pos[k]), 1 if pos[k, 0] > 0 else -1)
+        scoring = crossed & (pos[1:, 1] + vel[1:, 1] * s <= -160.0) & (pos[1:, 2] <= r + 2.0)
+        if scoring.any():
+            k = int(np.argmax(scoring)) + 1
+            goal = (sim.tick + k, tuple(pos[k]), 1 if pos[k, 0] > 0 else -1)
+            pos = pos[:k + 1]
+            vel = vel[:k + 1]
+            if ground_contact is not None and ground_contact[0] > goal[0]:
+                ground_contact = None
+    return Prediction(sim.tick, sim.ball_epoch, pos, vel, ground_contact, goal_line, goal, events)
@@ -0,0 +1,107 @@
+import json
+import time
+from collections import deque
+
+import numpy as np
+
+# --------------------------
+# Per-stage frame profiler
+# --------------------------
+# Stages are timed as laps: resume() starts the clock, each lap(name) charges
+# the time since the previous lap (or resume) to name, and end_frame() files
+# the frame. Work between resume/lap windows (e.g. GLUT idle time between two
+# display callbacks) is not charged to any stage. Work on another thread is
+# timed on its own and filed with record(name, start) (e.g. the physics tick
+# on the physics thread); appending to a stage's deque is atomic, so that
+# needs no lock, and readers take a copy before iterating.
+#
+# While disabled, resume/lap/end_frame are a shared no-op bound on the
+# instance, so instrumented code pays one empty call per stage and nothing
+# else: no clock reads, no allocation.
+# --------------------------
+def _noop(*args):
+    pass
+
+class FrameProfiler:
+    """
+    window: frames kept for the rolling percentiles and the trace export
+    refresh: frames between recomputing the percentiles shown by summary()
+    """
+
+    def __init__(self, window=600, refresh=30, clock=time.perf_counter_ns):
+        self.window = window
+        self.refresh = refresh
+        self.clock = clock
+        self.frames = 0
+        self.stages = {}  # name -> deque of durations (ns), insertion order = draw order
+        self._events = deque(maxlen=window * 16)  # (name, start ns, duration ns, thread) for the trace
+        self._last = 0
+        self._summary = []
+        self.enabled = False
+        self._bind()
+
+    def _bind(self):
+        if self.enabled:
+            self.resume = self._resume
+            self.lap = self._lap
+            self.end_frame = self._end_frame
+            self.record = self._record
+        else:
+            self.resume = self.lap = self.end_frame = self.record = _noop
+
+    def enable(self, on=True):
+        self.enabled = on
+        self._bind()
+
+    def toggle(self):
+        self.enable(not self.enabled)
+
+    def _resume(self):
+        self._last = self.clock()
+
+    def _lap(self, name):
+        now = self.clock()
+        self._file(name, self._last, now - self._last, 1)
+        self._last = now
+
+    def _record(self, name, start):
+        """File the time since start (a reading of self.clock) as one sample of name; any thread."""
+        self._file(name, start, self.clock() - start, 2)
+
+    def _file(self, name, start, duration, thread):
+        samples = self.stages.get(name)
+        if samples is None:
+            samples = self.stages[name] = deque(maxlen=self.window)
+        samples.append(duration)
+        self._events.append((name, start, duration, thread))
+
+    def _end_frame(self):
+        self.frames += 1
+        if self.frames % self.refresh == 0:
+            self._summary = self.percentiles()
+
+    def percentiles(self, qs=(50, 95, 99)):
+        """[(stage, (p50, p95, p99) in ms), ...] over the rolling window."""
+        out = []
+        for name, samples in list(self.stages.items()):
+            samples = list(samples)
+            if samples:
+                values = np.percentile(np.array(samples, dtype=np.float64), qs) / 1e6
+                out.append((name, tuple(float(v) for v in values)))
+        return out
+
+    def summary(self):
+        """Percentiles as of the last refresh (stable between refreshes, cheap to draw)."""
+        return self._summary
+
+    def export_trace(self, path):
+        """Write the kept stage events as Chrome trace-event JSON (chrome://tracing, Perfetto)."""
+        events = [{"name": name, "ph": "X", "ts": start / 1000.0, "dur": duration / 1000.0,
+                   "pid": 1, "tid": thread, "cat": "frame"}
+                  for name, start, duration, thread in list(self._events)]
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        return len(events)
+
+# shared by the front end's render callback (laps) and physics thread (record)
+profiler = FrameProfiler()
@@ -0,0 +1,86 @@
+from functools import lru_cache
+
+import numpy as np
+
+# --------------------------
+# Utility: Midpoint Line Algorithm
+# --------------------------
+def midpoint_line_2d(x0, y0, x1, y1):
+    """Pixels of the segment as a tuple of (x, y); cached on the rounded endpoints."""
+    return _midpoint_line_2d(int(round(x0)), int(round(y0)), int(round(x1)), int(round(y1)))
+
+@lru_cache(maxsize=1024)
+def _midpoint_line_2d(x0, y0, x1, y1):
+    pts = []
+    dx = abs(x1 - x0); dy = abs(y1 - y0)
+    sx = 1 if x1 >= x0 else -1
+    sy = 1 if y1 >= y0 else -1
+    x, y = x0, y0
+    if dy <= dx:
+        d = 2 * dy - dx
+        for _ in range(dx + 1):
+            pts.append((x, y))
+            if d > 0:
+                y += sy
+                d -= 2 * dx
+            x += sx
+            d += 2 * dy
+    else:
+        d = 2 * dx - dy
+        for _ in range(dy + 1):
+            pts.append((x, y))
+            if d > 0:
+                x += sx
+                d -= 2 * dy
+            y += sy
+            d += 2 * dx
+    return tuple(pts)
+
+# --------------------------
+# Bulk rasterizer
+# --------------------------
+def rasterize_segments(segments):
+    """
+    Rasterize many segments at once with the midpoint rule, without a Python
+    loop per pixel. segments: sequence or (S, 4) array of x0, y0, x1, y1.
+    Returns an (K, 2) int32 array holding every segment's pixels in order,
+    identical to concatenating midpoint_line_2d for each segment.
+
+    Along the major axis step i, the midpoint decision variable has taken
+    ceil((2*minor*i - major) / (2*major)) minor steps, which is computed
+    directly for all pixels of all segments.
+    """
+    seg = np.rint(np.asarray(segments, dtype=np.float64)).astype(np.int64).reshape(-1, 4)
+    if not len(seg):
+        return np.empty((0, 2), dtype=np.int32)
+    x0, y0, x1, y1 = seg.T
+    dx = np.abs(x1 - x0)
+    dy = np.abs(y1 - y0)
+    sx = np.where(x1 >= x0, 1, -1)
+    sy = np.where(y1 >= y0, 1, -1)
+    x_major = dy <= dx
+    major = np.where(x_major, dx, dy)
+    minor = np.where(x_major, dy, dx)
+
+    counts = major + 1
+    starts = np.cumsum(counts) - counts
+    owner = np.repeat(np.arange(len(seg)), counts)
+    i = np.arange(counts.sum()) - starts[owner]
+
+    major_o = major[owner]
+    # ceil(a / b) == -((-a) // b); guard the single-pixel case (major == 0)
+    minor_steps = -((major_o - 2 * minor[owner] * i) // np.maximum(2 * major_o, 1))
+    xm = x_major[owner]
+    out = np.empty((len(i), 2), dtype=np.int32)
+    out[:, 0] = x0[owner] + sx[owner] * np.where(xm, i, minor_steps)
+    out[:, 1] = y0[owner] + sy[owner] * np.where(xm, minor_steps, i)
+    return out
+
+def rect_segments(x, y, w, h):
+    """The four outline edges of a rectangle, in the order the HUD draws them."""
+    return [
+        (x, y, x + w, y),
+        (x + w, y, x + w, y + h),
+        (x + w, y + h, x, y + h),
+        (x, y + h, x, y),
+    ]
@@ -0,0 +1,153 @@
+import hashlib
+import json
+import struct
+import sys
+import time
+
+from simulation import Simulation
+
+# --------------------------
+# Match recording: one input byte per car per tick
+# --------------------------
+# A recording is a small header (seed, car count and every tunable) followed by
+# the packed input ints (see simulation.pack_input) of each stepped tick, car
+# by car. Inputs only use the low six bits, so the top bit of car 0's byte is
+# free to mark "the match was reset before this tick" (the 'r' key). Given the
+# same header and bytes, Simulation reproduces the match exactly, since it
+# only reads simulated time.
+# --------------------------
+MAGIC = b"RLRP"
+VERSION = 1
+HEADER = struct.Struct("<4sHHQI")  # magic, version, cars, seed, params json length
+RESET_FLAG = 0x80
+
+class InputRecorder:
+    def __init__(self, path, sim):
+        self.sim = sim
+        self.cars = len(sim.cars)
+        self.ticks = 0
+        self._reset = False
+        params = json.dumps(sim.params(), sort_keys=True).encode("utf-8")
+        self._file = open(path, "wb")
+        self._file.write(HEADER.pack(MAGIC, VERSION, self.cars, sim.seed, len(params)))
+        self._file.write(params)
+
+    def mark_reset(self):
+        """The match is reset outside of step(); flag it on the next recorded tick."""
+        self._reset = True
+
+    def record(self, inputs):
+        """Call with the exact inputs passed to sim.step, once per stepped tick."""
+        data = bytearray(inputs)
+        if self._reset:
+            data[0] |= RESET_FLAG
+            self._reset = False
+        self._file.write(data)
+        self.ticks += 1
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+def read_recording(path):
+    """Return (cars, seed, params, input bytes)."""
+    with open(path, "rb") as f:
+        blob = f.read()
+    magic, version, cars, seed, params_len = HEADER.unpack_from(blob)
+    if magic != MAGIC:
+        raise ValueError(f"{path}: not a match recording")
+    if version != VERSION:
+        raise ValueError(f"{path}: unsupported recording version {version}")
+    start = HEADER.size + params_len
+    params = json.loads(blob[HEADER.size:start].decode("utf-8"))
+    data = blob[start:]
+    if len(data) % cars:
+        raise ValueError(f"{path}: truncated tick ({len(data) % cars} of {cars} bytes)")
+    return cars, seed, params, data
+
+def state_digest(sim):
+    """Hash of the full match state; equal digests mean bit-identical runs."""
+    return hashlib.sha1(repr(sim.save_state()).encode("ascii")).hexdigest()
+
+# --------------------------
+# Replay: headless, as fast as the CPU allows, with keyframe seeking
+# --------------------------
+class Replay:
+    """
+    Re-runs a recording without rendering. Every keyframe_interval ticks the
+    state is saved on the way through, so seek() to any tick restores the
+    nearest earlier keyframe and re-simulates at most keyframe_interval ticks.
+    """
+
+    def __init__(self, path, keyframe_interval=600):
+        cars, seed, params, data = read_recording(path)
+        self.cars = cars
+        self.data = data
+        self.length = len(data) // cars
+        self.keyframe_interval = keyframe_interval
+        self.sim = Simulation(seed=seed, cars_per_team=cars // 2, **params)
+        self.keyframes = {0: self.sim.save_state()}
+
+    @property
+    def tick(self):
+        return self.sim.tick
+
+    def run_to(self, tick):
+        """Step forward to tick (clamped to the end of the recording)."""
+        tick = min(tick, self.length)
+        sim = self.sim
+        data = self.data
+        n = self.cars
+        interval = self.keyframe_interval
+        keyframes = self.keyframes
+        t = sim.tick
+        while t < tick:
+            start = t * n
+            inputs = data[start:start + n]
+            if inputs[0] & RESET_FLAG:
+                sim.reset()
+            sim.step(inputs)
+            t += 1
+            if t % interval == 0 and t not in keyframes:
+                keyframes[t] = sim.save_state()
+
+    def run(self):
+        self.run_to(self.length)
+
+    def seek(self, tick):
+        tick = max(0, min(tick, self.length))
+        key = tick - tick % self.keyframe_interval
+        while key not in self.keyframes:
+            key -= self.keyframe_interval
+        if not (key <= self.sim.tick <= tick):
+            self.sim.restore_state(self.keyframes[key])
+        self.run_to(tick)
+
+def main(argv):
+    import argparse
+    parser = argparse.ArgumentParser(description="Re-run a recorded match headlessly.")
+    parser.add_argument("path")
+    parser.add_argument("--seek", type=int, default=None, help="stop at this tick instead of the end")
+    parser.add_argument("--keyframes", type=int, default=600, help="ticks between keyframes")
+    parser.add_argument("--trajectory", default=None, help="also write every tick's state to this file")
+    args = parser.parse_args(argv)
+
+    replay = Replay(args.path, args.keyframes)
+    target = replay.length if args.seek is None else args.seek
+    start = time.perf_counter()
+    if args.trajectory:
+        from trajectory import TrajectoryWriter
+        with TrajectoryWriter(args.trajectory, replay.cars) as writer:
+            writer.append(replay.sim)
+            for tick in range(1, min(target, replay.length) + 1):
+                replay.run_to(tick)
+                writer.append(replay.sim)
+    else:
+        replay.seek(target)
+    elapsed = time.perf_counter() - start
+    sim = replay.sim
+    print(f"tick {sim.tick}/{replay.length}  score {sim.scores[0]}-{sim.scores[1]}")
+    print(f"{sim.tick / max(elapsed, 1e-9):.0f} ticks/s  digest {state_digest(sim)}")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
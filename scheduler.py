@@ -0,0 +1,35 @@
+import time
+
+# --------------------------
+# Frame timing helpers
+# --------------------------
+# Physics advances in whole ticks of dt on its own thread (physthread.py);
+# frames are drawn at their own pace and show the physics state blended
+# between the last two ticks (lerp_pose), at most frame_cap times a second
+# (FramePacer).
+# --------------------------
+def lerp_pose(a, b, alpha):
+    """Blend two Simulation.pose() results: ((x, y, z, angle) per car, (x, y, z) ball)."""
+    cars = tuple(tuple(p + (q - p) * alpha for p, q in zip(ca, cb)) for ca, cb in zip(a[0], b[0]))
+    ball = tuple(p + (q - p) * alpha for p, q in zip(a[1], b[1]))
+    return cars, ball
+
+class FramePacer:
+    """Spaces frames at most frame_cap per second (None or 0 for uncapped)."""
+
+    def __init__(self, frame_cap=60, clock=time.perf_counter):
+        self.frame_cap = frame_cap
+        self.clock = clock
+        self._next_frame = None
+
+    def frame_delay(self, now=None):
+        """Seconds to wait before the next frame may be drawn under frame_cap."""
+        if not self.frame_cap:
+            return 0.0
+        if now is None:
+            now = self.clock()
+        interval = 1.0 / self.frame_cap
+        if self._next_frame is None or now - self._next_frame > interval:
+            self._next_frame = now
+        self._next_frame += interval
+        return max(0.0, self._next_frame - now)
@@ -0,0 +1,334 @@
+import argparse
+import asyncio
+import struct
+import sys
+import time
+from collections import OrderedDict
+
+from controllers import CONTROLLERS
+from netplay import LossyLink
+from simulation import Simulation
+
+# --------------------------
+# Quantized snapshots
+# --------------------------
+# A snapshot is a flat tuple of 16-bit fields: the scores, then per car
+# x, y, z, angle, boost, health, then the ball's position and velocity.
+# Positions are fixed point against half the arena (so +-32767 spans the
+# arena), velocities against twice ball_max_speed, angles wrap on the full
+# 16-bit circle. Fields are stored as unsigned 16-bit values so that every
+# field can be delta coded the same way, modulo 2**16.
+# --------------------------
+Q = 32767.0
+CAR_FIELDS = 6
+BALL_FIELDS = 6
+
+def quantize(sim):
+    half = sim.arena_size / 2.0
+    ps = Q / half
+    vs = Q / (2.0 * sim.ball_max_speed)
+    out = [sim.scores[0] & 0xFFFF, sim.scores[1] & 0xFFFF]
+    for car in sim.cars:
+        p = car.position
+        out.append(int(round(max(-Q, min(Q, p[0] * ps)))) & 0xFFFF)
+        out.append(int(round(max(-Q, min(Q, p[1] * ps)))) & 0xFFFF)
+        out.append(int(round(max(-Q, min(Q, p[2] * ps)))) & 0xFFFF)
+        out.append(int(round(car.angle % 360.0 * (65536.0 / 360.0))) & 0xFFFF)
+        out.append(int(round(car.boost / sim.boost_max * 65535.0)) & 0xFFFF)
+        out.append(int(car.health) & 0xFFFF)
+    for value, scale in zip(sim.ball_position + sim.ball_velocity, (ps, ps, ps, vs, vs, vs)):
+        out.append(int(round(max(-Q, min(Q, value * scale)))) & 0xFFFF)
+    return tuple(out)
+
+def _signed(v):
+    return v - 0x10000 if v >= 0x8000 else v
+
+def dequantize(fields, cars, arena_size=500.0, ball_max_speed=30.0, boost_max=100.0):
+    """Quantized snapshot -> dict of floats (scores, cars [(x, y, z, angle, boost, health)], ball, ball_vel)."""
+    half = arena_size / 2.0
+    ps = half / Q
+    vs = 2.0 * ball_max_speed / Q
+    out = {"scores": (fields[0], fields[1]), "cars": []}
+    o = 2
+    for _ in range(cars):
+        x, y, z, a, b, h = fields[o:o + CAR_FIELDS]
+        out["cars"].append((_signed(x) * ps, _signed(y) * ps, _signed(z) * ps,
+                            a * (360.0 / 65536.0), b / 65535.0 * boost_max, _signed(h)))
+        o += CAR_FIELDS
+    ball = fields[o:o + BALL_FIELDS]
+    out["ball"] = tuple(_signed(v) * ps for v in ball[:3])
+    out["ball_vel"] = tuple(_signed(v) * vs for v in ball[3:])
+    return out
+
+# --------------------------
+# Delta coding
+# --------------------------
+# Packet: kind, tick, base tick (NO_BASE for a full snapshot), field count,
+# a bitmask of the fields that differ from the base, then one zigzag varint
+# per changed field with its (new - base) difference modulo 2**16. A full
+# snapshot is simply a delta against all zeros.
+# --------------------------
+SNAPSHOT = 3
+JOIN = 1
+ACK = 2
+NO_BASE = 0xFFFFFFFF
+SNAP_HEADER = struct.Struct("<BIIB")
+CONTROL = struct.Struct("<BI")  # JOIN match id / ACK tick
+
+def encode_delta(tick, fields, base_tick=NO_BASE, base=None):
+    n = len(fields)
+    if base is None:
+        base = (0,) * n
+    mask = bytearray((n + 7) // 8)
+    body = bytearray()
+    for i, (new, old) in enumerate(zip(fields, base)):
+        if new == old:
+            continue
+        mask[i >> 3] |= 1 << (i & 7)
+        d = _signed((new - old) & 0xFFFF)
+        z = (d << 1) ^ (d >> 31)  # zigzag: small magnitudes -> small codes
+        while z >= 0x80:
+            body.append((z & 0x7F) | 0x80)
+            z >>= 7
+        body.append(z)
+    return SNAP_HEADER.pack(SNAPSHOT, tick, base_tick, n) + bytes(mask) + bytes(body)
+
+def decode_delta(data, bases):
+    """Decode a snapshot packet against bases (tick -> fields); (tick, fields), or None if the base is unknown."""
+    _, tick, base_tick, n = SNAP_HEADER.unpack_from(data)
+    if base_tick == NO_BASE:
+        base = (0,) * n
+    else:
+        base = bases.get(base_tick)
+        if base is None:
+            return None
+    pos = SNAP_HEADER.size
+    mask = data[pos:pos + (n + 7) // 8]
+    pos += len(mask)
+    fields = list(base)
+    for i in range(n):
+        if not mask[i >> 3] & (1 << (i & 7)):
+            continue
+        z = 0
+        shift = 0
+        while True:
+            byte = data[pos]
+            pos += 1
+            z |= (byte & 0x7F) << shift
+            shift += 7
+            if byte < 0x80:
+                break
+        d = (z >> 1) ^ -(z & 1)
+        fields[i] = (base[i] + d) & 0xFFFF
+    return tick, tuple(fields)
+
+# --------------------------
+# Authoritative server
+# --------------------------
+# Every match runs on the same event loop and the same UDP socket. After each
+# sent snapshot is quantized once, the encoded packet is cached per base tick,
+# so spectators that acknowledged the same snapshot share one encoding; the
+# per-match CPU cost therefore does not grow with the audience, only the
+# sendto calls do. Clients that fell behind the kept history get a full
+# snapshot.
+# --------------------------
+class Match:
+    def __init__(self, match_id, controllers=("chaser", "random"), seed=1234, history=64, **params):
+        self.match_id = match_id
+        self.sim = Simulation(seed=seed, **params)
+        self.drivers = [CONTROLLERS[controllers[car.team]](seed + i) for i, car in enumerate(self.sim.cars)]
+        self.history = OrderedDict()  # tick -> quantized fields
+        self.history_size = history
+        self.latest = None
+        self._encoded = {}  # base tick -> packet for the latest snapshot
+        self.cpu_seconds = 0.0
+        self.ticks = 0
+        self.encodes = 0
+
+    def step(self):
+        sim = self.sim
+        sim.step([drive(sim, i) for i, drive in enumerate(self.drivers)])
+        self.ticks += 1
+
+    def capture(self):
+        fields = quantize(self.sim)
+        self.latest = (self.sim.tick, fields)
+        self.history[self.sim.tick] = fields
+        while len(self.history) > self.history_size:
+            self.history.popitem(last=False)
+        self._encoded.clear()
+
+    def packet_for(self, base_tick):
+        """Latest snapshot encoded against base_tick (full if that snapshot is no longer kept)."""
+        if base_tick not in self.history:
+            base_tick = NO_BASE
+        packet = self._encoded.get(base_tick)
+        if packet is None:
+            tick, fields = self.latest
+            packet = encode_delta(tick, fields, base_tick, self.history.get(base_tick))
+            self._encoded[base_tick] = packet
+            self.encodes += 1
+        return packet
+
+class Client:
+    __slots__ = ("match_id", "last_ack", "bytes_sent", "packets", "joined")
+
+    def __init__(self, match_id, now):
+        self.match_id = match_id
+        self.last_ack = NO_BASE
+        self.bytes_sent = 0
+        self.packets = 0
+        self.joined = now
+
+class MatchServer(asyncio.DatagramProtocol):
+    def __init__(self, matches, rate=60.0, send_every=2, link=None):
+        self.matches = {m.match_id: m for m in matches}
+        self.rate = rate
+        self.send_every = send_every
+        self.link = link
+        self.clients = {}  # addr -> Client
+        self.transport = None
+        self.send_seconds = 0.0
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        if len(data) < CONTROL.size:
+            return
+        kind, value = CONTROL.unpack_from(data)
+        if kind == JOIN and value in self.matches:
+            self.clients[addr] = Client(value, time.perf_counter())
+        elif kind == ACK:
+            client = self.clients.get(addr)
+            if client is not None and (client.last_ack == NO_BASE or value > client.last_ack):
+                client.last_ack = value
+
+    def _send(self, data, addr):
+        if self.link is None:
+            self.transport.sendto(data, addr)
+        else:
+            self.link.send(self.transport, data, addr)
+
+    async def run(self, seconds):
+        loop = asyncio.get_running_loop()
+        period = 1.0 / self.rate
+        next_time = loop.time()
+        end = next_time + seconds
+        tick = 0
+        by_match = {}
+        while loop.time() < end:
+            tick += 1
+            send = tick % self.send_every == 0
+            if send:
+                by_match.clear()
+                for addr, client in self.clients.items():
+                    by_match.setdefault(client.match_id, []).append((addr, client))
+            for match in self.matches.values():
+                start = time.perf_counter()
+                match.step()
+                if send:
+                    match.capture()
+                    for addr, client in by_match.get(match.match_id, ()):
+                        match.packet_for(client.last_ack)
+                match.cpu_seconds += time.perf_counter() - start
+                if send:
+                    start = time.perf_counter()
+                    for addr, client in by_match.get(match.match_id, ()):
+                        packet = match.packet_for(client.last_ack)
+                        self._send(packet, addr)
+                        client.bytes_sent += len(packet)
+                        client.packets += 1
+                    self.send_seconds += time.perf_counter() - start
+            next_time += period
+            await asyncio.sleep(max(0.0, next_time - loop.time()))
+
+# --------------------------
+# Spectator client
+# --------------------------
+class Spectator(asyncio.DatagramProtocol):
+    def __init__(self, match_id, server_addr, history=128):
+        self.match_id = match_id
+        self.server_addr = server_addr
+        self.snapshots = OrderedDict()  # tick -> fields
+        self.history = history
+        self.latest = None
+        self.received = 0
+        self.undecodable = 0
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+        transport.sendto(CONTROL.pack(JOIN, self.match_id), self.server_addr)
+
+    def datagram_received(self, data, addr):
+        if len(data) < SNAP_HEADER.size or data[0] != SNAPSHOT:
+            return
+        self.received += 1
+        decoded = decode_delta(data, self.snapshots)
+        if decoded is None:
+            self.undecodable += 1
+            return
+        tick, fields = decoded
+        if self.latest is None or tick > self.latest[0]:
+            self.latest = decoded
+        self.snapshots[tick] = fields
+        while len(self.snapshots) > self.history:
+            self.snapshots.popitem(last=False)
+        self.transport.sendto(CONTROL.pack(ACK, tick), self.server_addr)
+
+async def demo(matches, spectators, seconds, rate, send_every, port, loss):
+    loop = asyncio.get_running_loop()
+    server_addr = ("127.0.0.1", port)
+    link = LossyLink(loss=loss) if loss else None
+    server = MatchServer([Match(i, seed=1234 + i) for i in range(matches)], rate, send_every, link)
+    server_transport, _ = await loop.create_datagram_endpoint(lambda: server, local_addr=server_addr)
+    clients = []
+    for k in range(spectators):
+        transport, client = await loop.create_datagram_endpoint(
+            lambda k=k: Spectator(k % matches, server_addr), local_addr=("127.0.0.1", 0))
+        clients.append(client)
+    try:
+        await server.run(seconds)
+    finally:
+        for client in clients:
+            client.transport.close()
+        server_transport.close()
+    return server, clients
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Run matches headlessly and stream snapshots to local spectators.")
+    parser.add_argument("--matches", type=int, default=4)
+    parser.add_argument("--spectators", type=int, default=16, help="spread round-robin over the matches")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--rate", type=float, default=60.0, help="physics ticks per second")
+    parser.add_argument("--send-every", type=int, default=2, help="ticks between snapshots")
+    parser.add_argument("--loss", type=float, default=0.0, help="fraction of snapshot packets dropped")
+    parser.add_argument("--port", type=int, default=47810)
+    args = parser.parse_args(argv)
+
+    server, clients = asyncio.run(demo(args.matches, args.spectators, args.seconds, args.rate,
+                                       args.send_every, args.port, args.loss))
+    for match in server.matches.values():
+        print(f"match {match.match_id}: {match.ticks} ticks, "
+              f"{match.cpu_seconds / max(match.ticks, 1) * 1e6:.0f} us CPU/tick (sim + encode), "
+              f"{match.encodes} encodes")
+    full = len(encode_delta(0, quantize(next(iter(server.matches.values())).sim)))
+    for addr, c in sorted(server.clients.items(), key=lambda item: item[1].match_id)[:8]:
+        print(f"client {addr[1]} match {c.match_id}: {c.bytes_sent / args.seconds:.0f} B/s, "
+              f"{c.bytes_sent / max(c.packets, 1):.1f} B/snapshot (full {full} B)")
+    sends = sum(c.packets for c in server.clients.values())
+    print(f"send: {server.send_seconds / max(sends, 1) * 1e6:.1f} us/packet; "
+          f"clients decoded {sum(c.received - c.undecodable for c in clients)} "
+          f"of {sum(c.received for c in clients)} snapshots")
+    mismatched = 0
+    for c in clients:
+        if c.latest is not None:
+            tick, fields = c.latest
+            kept = server.matches[c.match_id].history.get(tick)
+            mismatched += kept is not None and kept != fields
+    print("decoded snapshots match the server" if not mismatched else f"{mismatched} clients MISMATCH")
+    return 1 if mismatched else 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,602 @@
+import math
+import random
+
+from collision import (
+    check_collision_car_ball, check_collision_car_car,
+    check_collision_car_obstacle, check_collision_ball_obstacle,
+    sweep_sphere_plane, sweep_circle_aabb,
+)
+from spatial import SweepAndPrune, UniformGrid
+
+# --------------------------
+# Tuning (defaults; any of these can be overridden per Simulation)
+# --------------------------
+# Car properties
+car_size = 40.0
+car_ground_z = 35.0
+car_jump_strength = 18.0
+
+# Boost
+boost_max = 100.0
+boost_depletion_rate = 40.0
+boost_recharge_rate = 12.0
+boost_multiplier = 1.8
+
+# Movement & rotation tuning
+base_movement_speed = 3.0
+rotation_speed = 2.0
+
+# Arena / goals
+arena_size = 500.0
+goal_size = 80.0
+goal_depth = 50.0
+wall_height = 60.0
+
+# Ball
+ball_radius = 15.0
+ball_friction = 0.995
+air_friction = 0.995
+ball_max_speed = 30.0
+
+# Obstacles (static boxes, bucketed into a uniform grid once per arena)
+obstacle_count = 5
+obstacle_cell_size = 64.0
+
+# Scoring & control
+collision_cooldown = 300  # ms
+
+# Timing physics
+FPS = 60
+dt = 1.0 / FPS
+
+# Swept-sphere collision for the ball: None = on whenever dt is coarser than 1/FPS
+continuous_collision = None
+CCD_MAX_HITS = 4   # contacts resolved per tick before the rest of the move is dropped
+CCD_SKIN = 1e-4    # gap left between the ball and whatever it hit
+
+PARAMS = (
+    "car_size", "car_ground_z", "car_jump_strength",
+    "boost_max", "boost_depletion_rate", "boost_recharge_rate", "boost_multiplier",
+    "base_movement_speed", "rotation_speed",
+    "arena_size", "goal_size", "goal_depth", "wall_height",
+    "ball_radius", "ball_friction", "air_friction", "ball_max_speed",
+    "obstacle_count", "obstacle_cell_size",
+    "collision_cooldown", "dt", "continuous_collision",
+)
+# In PARAMS so that recordings and configs naming them still load, but no
+# rule of the engine reads them (so sweeping them would change nothing)
+INERT_PARAMS = ("collision_cooldown",)
+
+CAR_STARTS = (
+    ([-200.0, 0.0, 35.0], 0.0),
+    ([200.0, 0.0, 35.0], 180.0),
+)
+TEAM_SPACING = 60.0  # y gap between teammates on the start line
+
+def car_starts(cars_per_team):
+    """(position, angle, team) for every car; teams alternate so cars 0 and 1 are the 1v1 pair."""
+    starts = []
+    for k in range(cars_per_team):
+        offset_y = (k - (cars_per_team - 1) / 2.0) * TEAM_SPACING
+        for team, (pos, angle) in enumerate(CAR_STARTS):
+            starts.append(([pos[0], pos[1] + offset_y, pos[2]], angle, team))
+    return starts
+BALL_START = [0.0, 0.0, 15.0]
+
+# --------------------------
+# Per-tick inputs: one small int per car
+# --------------------------
+IN_FORWARD = 1
+IN_BACK = 2
+IN_LEFT = 4   # rotate left
+IN_RIGHT = 8  # rotate right
+IN_BOOST = 16
+IN_JUMP = 32
+
+def pack_input(moving, boosting=False, jump=False):
+    """Pack a [forward, back, left-rot, right-rot] flag list plus boost/jump into an input int."""
+    bits = 0
+    if moving[0]: bits |= IN_FORWARD
+    if moving[1]: bits |= IN_BACK
+    if moving[2]: bits |= IN_LEFT
+    if moving[3]: bits |= IN_RIGHT
+    if boosting: bits |= IN_BOOST
+    if jump: bits |= IN_JUMP
+    return bits
+
+# --------------------------
+# Entities
+# --------------------------
+class Car:
+    __slots__ = ("team", "start_position", "position", "angle", "vz", "boost", "boosting", "health", "moving")
+
+    def __init__(self, position, angle, boost, team=0):
+        self.team = team
+        self.start_position = list(position)
+        self.position = list(position)
+        self.angle = angle
+        self.vz = 0.0
+        self.boost = boost
+        self.boosting = False
+        self.health = 100
+        self.moving = [False, False, False, False]  # forward, back, left-rot, right-rot
+
+    def reset(self, boost):
+        self.position = list(self.start_position)
+        self.vz = 0.0
+        self.boost = boost
+        self.health = 100
+
+# --------------------------
+# Headless simulation
+# --------------------------
+class Simulation:
+    """
+    Owns the full match state (cars, ball, boost, health, scores) and advances it
+    one fixed tick at a time without touching OpenGL/GLUT.
+
+    clock: optional callable returning milliseconds, used to timestamp collisions.
+           Defaults to simulated time (tick * dt), which keeps runs reproducible.
+    seed:  seeds the match rng (obstacle layout).
+    cars_per_team: 1 for the classic 1v1, 3 for a 3v3 scrimmage, ...
+    params: overrides for any name in PARAMS (e.g. boost_multiplier=2.0).
+
+    Movement, turning, friction and the per-tick contact effects (car-car
+    damage and push-apart, car-ball impulses) are tuned per 1/FPS tick and
+    are scaled for other dt values, so e.g. dt=1/15 plays about the same
+    match at a quarter of the ticks. At such step sizes the ball can travel
+    further than its own diameter per tick, so its planar move is swept
+    against walls, cars and obstacles (see continuous_collision).
+    """
+
+    def __init__(self, clock=None, seed=1234, cars_per_team=1, **params):
+        g = globals()
+        for name in PARAMS:
+            setattr(self, name, g[name])
+        for name, value in params.items():
+            if name not in PARAMS:
+                raise TypeError(f"unknown simulation parameter: {name}")
+            setattr(self, name, value)
+        self.move_scale = self.dt * FPS  # 1.0 at the tuned tick rate
+        if self.continuous_collision is None:
+            self.continuous_collision = self.move_scale > 1.0
+        self.clock = clock if clock is not None else self.sim_time_ms
+        self.tick = 0
+        self.scores = [0, 0]
+        self.last_collision_time = 0.0
+        self.cars = [Car(pos, ang, self.boost_max, team) for pos, ang, team in car_starts(cars_per_team)]
+        self.broad_phase = SweepAndPrune()
+        self.ball_position = list(BALL_START)
+        self.ball_velocity = [0.0, 0.0, 0.0]
+        self.ball_epoch = 0  # bumped whenever the ball is moved by anything but its own flight rules
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.init_obstacles()
+
+    def init_obstacles(self):
+        obstacles = []
+        rng = self.rng
+        half = self.arena_size / 2.0
+        for _ in range(self.obstacle_count):
+            obs_x = rng.uniform(-half + 60, half - 60)
+            obs_y = rng.uniform(-half + 60, half - 60)
+            obs_z = 15.0
+            obs_width = rng.uniform(30.0, 60.0)
+            obs_height = 20.0
+            obs_depth = 30.0
+            obstacles.append((obs_x, obs_y, obs_z, obs_width, obs_height, obs_depth))
+        self.obstacles = tuple(obstacles)
+        self.obstacle_grid = UniformGrid(self.obstacles, self.obstacle_cell_size) if obstacles else None
+
+    def sim_time_ms(self):
+        return self.tick * self.dt * 1000.0
+
+    def pose(self):
+        """Render-relevant state: ((x, y, z, angle) per car, (x, y, z) ball)."""
+        cars = tuple((c.position[0], c.position[1], c.position[2], c.angle) for c in self.cars)
+        return cars, tuple(self.ball_position)
+
+    def params(self):
+        """Current value of every name in PARAMS (enough to rebuild an identical Simulation)."""
+        return {name: getattr(self, name) for name in PARAMS}
+
+    def save_state(self):
+        """Immutable copy of everything step() reads or writes; see restore_state."""
+        cars = tuple((tuple(c.position), c.angle, c.vz, c.boost, c.boosting, c.health, tuple(c.moving))
+                     for c in self.cars)
+        return (self.tick, tuple(self.scores), self.last_collision_time, cars,
+                tuple(self.ball_position), tuple(self.ball_velocity), self.rng.getstate())
+
+    def restore_state(self, state):
+        tick, scores, last_collision_time, cars, ball_position, ball_velocity, rng_state = state
+        self.tick = tick
+        self.scores = list(scores)
+        self.last_collision_time = last_collision_time
+        for car, (position, angle, vz, boost, boosting, health, moving) in zip(self.cars, cars):
+            car.position = list(position)
+            car.angle = angle
+            car.vz = vz
+            car.boost = boost
+            car.boosting = boosting
+            car.health = health
+            car.moving = list(moving)
+        self.ball_position = list(ball_position)
+        self.ball_velocity = list(ball_velocity)
+        self.ball_epoch += 1
+        self.rng.setstate(rng_state)
+
+    def reset(self):
+        for car in self.cars:
+            car.reset(self.boost_max)
+        self.ball_position = list(BALL_START)
+        self.ball_velocity = [0.0, 0.0, 0.0]
+        self.ball_epoch += 1
+
+    # --------------------------
+    # Stepping
+    # --------------------------
+    def step_n(self, inputs, n):
+        for _ in range(n):
+            self.step(inputs)
+
+    def step(self, inputs):
+        """Advance one tick. inputs: one packed input int (see pack_input) per car."""
+        for car, bits in zip(self.cars, inputs):
+            self._apply_input(car, bits)
+        self._update_physics()
+        self.tick += 1
+
+    def _apply_input(self, car, bits):
+        car.moving[0] = bool(bits & IN_FORWARD)
+        car.moving[1] = bool(bits & IN_BACK)
+        car.moving[2] = bool(bits & IN_LEFT)
+        car.moving[3] = bool(bits & IN_RIGHT)
+        car.boosting = bool(bits & IN_BOOST)
+        if bits & IN_JUMP and car.position[2] <= self.car_ground_z + 0.01:
+            car.vz = self.car_jump_strength * (1.2 if car.boosting and car.boost > 0 else 1.0)
+
+    def _update_physics(self):
+        current_time_ms = self.clock()
+        global_dt = self.dt
+
+        # Boost meters, movement speeds (include boost if active) and vertical physics
+        self.speeds = speeds = []
+        for car in self.cars:
+            if car.boosting and car.boost > 0.0:
+                car.boost = max(0.0, car.boost - self.boost_depletion_rate * global_dt)
+            else:
+                car.boost = min(self.boost_max, car.boost + self.boost_recharge_rate * global_dt)
+        for car in self.cars:
+            speeds.append(self.base_movement_speed * (self.boost_multiplier if car.boosting and car.boost > 0.0 else 1.0))
+        for car in self.cars:
+            car.vz += -9.8 * global_dt * 1.5  # tuned gravity for feel
+            car.position[2] += car.vz * global_dt
+            if car.position[2] < self.car_ground_z:
+                car.position[2] = self.car_ground_z
+                car.vz = 0.0
+
+        # Update planar movement
+        self._update_movement(speeds)
+
+        # Car-ball collisions (apply impulses). Cars are kept sorted on x, so only
+        # those within reach of the ball are tested, still in car order.
+        cars = self.cars
+        sap = self.broad_phase
+        sap.update([car.position[0] for car in cars])
+        reach = self.car_size / 2.0 + self.ball_radius
+        bx = self.ball_position[0]
+        for i in sap.query(bx - reach, bx + reach):
+            if self.apply_car_ball_collision(cars[i], speeds[i]):
+                self.last_collision_time = current_time_ms
+
+        # Car-obstacle and ball-obstacle collisions
+        if self.obstacle_grid is not None:
+            self._collide_obstacles()
+
+        # Car-car collisions: sweep and prune on x, AABB check on the surviving pairs.
+        # Opponents lose health, everyone is pushed apart.
+        sap.update([car.position[0] for car in cars])
+        hit = False
+        damage = round(20 * self.move_scale)
+        push = 0.02 * self.move_scale
+        for i, j in sap.pairs(self.car_size):
+            car_a = cars[i]
+            car_b = cars[j]
+            colcc, dxcc, dycc = check_collision_car_car(car_a.position, car_b.position, self.car_size)
+            if not colcc:
+                continue
+            hit = True
+            if car_a.team != car_b.team:
+                car_a.health -= damage
+                car_b.health -= damage
+            car_a.position[0] += dxcc * push
+            car_a.position[1] += dycc * push
+            car_b.position[0] -= dxcc * push
+            car_b.position[1] -= dycc * push
+        if hit:
+            self.last_collision_time = current_time_ms
+            # the first wrecked car (in car order) scores for the other team and resets the match
+            for car in cars:
+                if car.health <= 0:
+                    self.scores[1 - car.team] += 1
+                    self.reset()
+                    break
+
+        self._update_ball(global_dt)
+
+    def _update_movement(self, speeds):
+        scale = self.move_scale
+        turn = self.rotation_speed * scale
+        for car, speed in zip(self.cars, speeds):
+            speed *= scale
+            a = math.radians(car.angle)
+            if car.moving[0]:
+                car.position[0] += speed * math.cos(a)
+                car.position[1] += speed * math.sin(a)
+            if car.moving[1]:
+                car.position[0] -= speed * 0.6 * math.cos(a)
+                car.position[1] -= speed * 0.6 * math.sin(a)
+            if car.moving[2]:
+                car.angle += turn
+            if car.moving[3]:
+                car.angle -= turn
+
+        # keep inside arena
+        limit = self.arena_size / 2.0 - self.car_size / 2.0
+        for car in self.cars:
+            pos = car.position
+            pos[0] = max(-limit, min(limit, pos[0]))
+            pos[1] = max(-limit, min(limit, pos[1]))
+
+    def _collide_obstacles(self):
+        # broad phase: grid cells under each mover; narrow phase: the box checks
+        grid = self.obstacle_grid
+        obstacles = self.obstacles
+        half = self.car_size / 2.0
+        for car in self.cars:
+            pos = car.position
+            for i in grid.query(pos[0] - half, pos[1] - half, pos[0] + half, pos[1] + half):
+                obs = obstacles[i]
+                hit, dx, dy = check_collision_car_obstacle(pos, self.car_size, obs)
+                if hit:
+                    # push out along the axis of least overlap
+                    over_x = half + obs[3] / 2.0 - abs(dx)
+                    over_y = half + obs[4] / 2.0 - abs(dy)
+                    if over_x < over_y:
+                        pos[0] += over_x if dx >= 0 else -over_x
+                    else:
+                        pos[1] += over_y if dy >= 0 else -over_y
+
+        r = self.ball_radius
+        bp = self.ball_position
+        bv = self.ball_velocity
+        for i in grid.query_point(bp[0], bp[1], r):
+            obs = obstacles[i]
+            if bp[2] - r >= obs[2] + obs[5] / 2.0:
+                continue  # passing over the top
+            hit, dx, dy = check_collision_ball_obstacle(bp, r, obs)
+            if not hit:
+                continue
+            dist = math.sqrt(dx*dx + dy*dy)
+            if dist > 1e-6:
+                nx = dx / dist
+                ny = dy / dist
+                depth = r - dist
+            else:
+                # center inside the box: leave through the nearest face
+                ox = obs[3] / 2.0 - abs(bp[0] - obs[0])
+                oy = obs[4] / 2.0 - abs(bp[1] - obs[1])
+                if ox < oy:
+                    nx, ny, depth = (1.0 if bp[0] >= obs[0] else -1.0), 0.0, ox + r
+                else:
+                    nx, ny, depth = 0.0, (1.0 if bp[1] >= obs[1] else -1.0), oy + r
+            bp[0] += nx * depth
+            bp[1] += ny * depth
+            self.ball_epoch += 1
+            # reflect the approaching velocity component with the same damping as the walls
+            vn = bv[0] * nx + bv[1] * ny
+            if vn < 0.0:
+                bv[0] -= 1.8 * vn * nx
+                bv[1] -= 1.8 * vn * ny
+
+    def apply_car_ball_collision(self, car, movement_speed_local):
+        """
+        Apply impulse to ball_velocity depending on car planar velocity (inputs),
+        boost and vertical velocity (jump). Returns True if collision occurred.
+        """
+        collided, dx, dy = check_collision_car_ball(car.position, self.car_size, self.ball_position, self.ball_radius)
+        if not collided:
+            return False
+        self._car_ball_impulse(car, movement_speed_local, dx, dy)
+        return True
+
+    def _car_ball_impulse(self, car, movement_speed_local, dx, dy):
+        # (dx, dy): from the closest point on the car's footprint to the ball center.
+        # The impulse is applied every tick of contact, so it scales with dt.
+        ball_velocity = self.ball_velocity
+        scale = self.move_scale
+        self.ball_epoch += 1
+        ang_rad = math.radians(car.angle)
+        forward = [math.cos(ang_rad), math.sin(ang_rad)]
+        car_moving = car.moving
+        car_vx = 0.0
+        car_vy = 0.0
+        # forward/back keys
+        if car_moving[0]:
+            car_vx += movement_speed_local * forward[0]
+            car_vy += movement_speed_local * forward[1]
+        if car_moving[1]:
+            car_vx -= movement_speed_local * 0.6 * forward[0]
+            car_vy -= movement_speed_local * 0.6 * forward[1]
+        # rotation strafe small
+        if car_moving[2]:
+            car_vx += -0.2 * movement_speed_local * forward[1]
+            car_vy += 0.2 * movement_speed_local * forward[0]
+        if car_moving[3]:
+            car_vx += 0.2 * movement_speed_local * forward[1]
+            car_vy += -0.2 * movement_speed_local * forward[0]
+
+        if car.boosting:
+            car_vx *= self.boost_multiplier
+            car_vy *= self.boost_multiplier
+
+        car_speed = math.sqrt(car_vx*car_vx + car_vy*car_vy)
+        vz_impulse = 0.0
+        if car.vz > 2.0:
+            vz_impulse = car.vz * 0.8
+
+        # If near-static, push by overlap direction mildly; else transfer momentum scaled
+        if car_speed < 0.5:
+            dir_len = math.sqrt(dx*dx + dy*dy)
+            if dir_len < 1e-5:
+                dir_len = 1.0
+            nx = dx / dir_len
+            ny = dy / dir_len
+            ball_velocity[0] += nx * 3.0 * scale
+            ball_velocity[1] += ny * 3.0 * scale
+        else:
+            transfer = 0.6 + min(0.8, car_speed / 20.0)
+            ball_velocity[0] += car_vx * transfer * 0.15 * scale
+            ball_velocity[1] += car_vy * transfer * 0.15 * scale
+
+        ball_velocity[2] += vz_impulse * 0.5 * scale
+
+        # cap planar speed
+        sp = math.sqrt(ball_velocity[0]**2 + ball_velocity[1]**2)
+        if sp > self.ball_max_speed:
+            s = self.ball_max_speed / sp
+            ball_velocity[0] *= s
+            ball_velocity[1] *= s
+
+    def _sweep_ball(self, vel_scale):
+        """
+        Move the ball by velocity * vel_scale in the xy plane, stopping at the
+        first wall, car or obstacle in its path, responding, and carrying on
+        with the rest of the move (up to CCD_MAX_HITS contacts per tick).
+        """
+        bp = self.ball_position
+        bv = self.ball_velocity
+        r = self.ball_radius
+        half = self.arena_size / 2.0
+        car_half = self.car_size / 2.0
+        cars = self.cars
+        obstacles = self.obstacles
+        grid = self.obstacle_grid
+        sap = self.broad_phase
+        sap.update([car.position[0] for car in cars])
+        remaining = 1.0
+        for _ in range(CCD_MAX_HITS):
+            dx = bv[0] * vel_scale * remaining
+            dy = bv[1] * vel_scale * remaining
+            if dx == 0.0 and dy == 0.0:
+                return
+            d = (dx, dy, 0.0)
+            # walls: four planes with the arena inside
+            best_t = 2.0
+            hit = None
+            for nx, ny in ((1.0, 0.0), (-1.0, 0.0), (0.0, 1.0), (0.0, -1.0)):
+                t = sweep_sphere_plane(bp, d, r, (nx, ny, 0.0), -half)
+                if t is not None and t < best_t:
+                    best_t, hit = t, (nx, ny, None, False)
+            # cars within the swept x range
+            lo = min(bp[0], bp[0] + dx) - r - car_half
+            hi = max(bp[0], bp[0] + dx) + r + car_half
+            for i in sap.query(lo, hi):
+                p = cars[i].position
+                res = sweep_circle_aabb(bp[0], bp[1], dx, dy, r,
+                                        p[0] - car_half, p[1] - car_half, p[0] + car_half, p[1] + car_half)
+                if res is not None and res[0] < best_t:
+                    best_t, hit = res[0], (res[1], res[2], cars[i], True)
+            # obstacles under the swept bounds, unless the ball passes over them
+            if grid is not None:
+                for i in grid.query(min(bp[0], bp[0] + dx) - r, min(bp[1], bp[1] + dy) - r,
+                                    max(bp[0], bp[0] + dx) + r, max(bp[1], bp[1] + dy) + r):
+                    obs = obstacles[i]
+                    if bp[2] - r >= obs[2] + obs[5] / 2.0:
+                        continue
+                    res = sweep_circle_aabb(bp[0], bp[1], dx, dy, r,
+                                            obs[0] - obs[3] / 2.0, obs[1] - obs[4] / 2.0,
+                                            obs[0] + obs[3] / 2.0, obs[1] + obs[4] / 2.0)
+                    if res is not None and res[0] < best_t:
+                        best_t, hit = res[0], (res[1], res[2], None, True)
+
+            if hit is None:
+                bp[0] += dx
+                bp[1] += dy
+                return
+            nx, ny, car, external = hit
+            bp[0] += dx * best_t + nx * CCD_SKIN
+            bp[1] += dy * best_t + ny * CCD_SKIN
+            remaining *= 1.0 - best_t
+            if external:
+                # walls are part of the ball's own flight rules; cars and obstacles are not
+                self.ball_epoch += 1
+            # reflect the approaching component with the wall damping, then
+            # let a car add its usual impulse on top
+            vn = bv[0] * nx + bv[1] * ny
+            if vn < 0.0:
+                bv[0] -= 1.8 * vn * nx
+                bv[1] -= 1.8 * vn * ny
+            if car is not None:
+                self._car_ball_impulse(car, self.speeds[cars.index(car)], nx * r, ny * r)
+                self.last_collision_time = self.clock()
+
+    def _update_ball(self, global_dt):
+        ball_position = self.ball_position
+        ball_velocity = self.ball_velocity
+        ball_radius = self.ball_radius
+
+        # Ball physics integration
+        ball_velocity[2] += -9.8 * global_dt * 1.5
+        if self.continuous_collision:
+            self._sweep_ball(global_dt * 30.0)
+        else:
+            ball_position[0] += ball_velocity[0] * global_dt * 30.0
+            ball_position[1] += ball_velocity[1] * global_dt * 30.0
+        ball_position[2] += ball_velocity[2] * global_dt * 30.0
+
+        # ground collision for ball (friction factors are per 1/FPS tick)
+        scale = self.move_scale
+        if ball_position[2] - ball_radius <= 0.0:
+            ball_position[2] = ball_radius
+            if abs(ball_velocity[2]) > 1.0:
+                ball_velocity[2] = -ball_velocity[2] * 0.4
+                ball_velocity[0] *= 0.98 ** scale
+                ball_velocity[1] *= 0.98 ** scale
+            else:
+                ball_velocity[2] = 0.0
+                ball_velocity[0] *= self.ball_friction ** scale
+                ball_velocity[1] *= self.ball_friction ** scale
+        else:
+            ball_velocity[0] *= self.air_friction ** scale
+            ball_velocity[1] *= self.air_friction ** scale
+
+        # Arena bounds (with bounce)
+        half = self.arena_size / 2.0
+        max_x = half - ball_radius
+        max_y = half - ball_radius
+
+        # X boundary bounce
+        if ball_position[0] <= -max_x:
+            ball_position[0] = -max_x
+            ball_velocity[0] = -ball_velocity[0] * 0.8  # reflect with damping
+        elif ball_position[0] >= max_x:
+            ball_position[0] = max_x
+            ball_velocity[0] = -ball_velocity[0] * 0.8
+
+        # Y boundary bounce
+        if ball_position[1] <= -max_y:
+            ball_position[1] = -max_y
+            ball_velocity[1] = -ball_velocity[1] * 0.8
+        elif ball_position[1] >= max_y:
+            ball_position[1] = max_y
+            ball_velocity[1] = -ball_velocity[1] * 0.8
+        # Goal detection (tuned): when ball crosses near edge and near ground and y velocity negative enough
+        if ball_position[0] > (half - 30):
+            if (ball_position[1] + ball_velocity[1] * global_dt * 30.0) <= -160.0 and ball_position[2] <= ball_radius + 2.0:
+                self.scores[0] += 1
+                self.reset()
+        if ball_position[0] < -(half - 30):
+            if (ball_position[1] + ball_velocity[1] * global_dt * 30.0) <= -160.0 and ball_position[2] <= ball_radius + 2.0:
+                self.scores[1] += 1
+                self.reset()
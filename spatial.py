@@ -0,0 +1,109 @@
+import math
+from bisect import bisect_left, bisect_right
+
+# --------------------------
+# Broad phase: uniform grid over static boxes
+# --------------------------
+# Obstacles never move, so they are bucketed once per arena into square cells
+# (a box touching several cells is listed in each). A query walks only the
+# cells overlapped by the moving object's 2D bounds, so the narrow-phase
+# checks run against a handful of nearby obstacles however many exist.
+# --------------------------
+class UniformGrid:
+    def __init__(self, boxes, cell_size):
+        """boxes: sequence of obstacles [x, y, z, width(x), height(y), depth(z)]."""
+        self.cell_size = float(cell_size)
+        self.boxes = boxes
+        self.cells = {}
+        self._stamp = [0] * len(boxes)
+        self._query_id = 0
+        for i, box in enumerate(boxes):
+            half_w = box[3] / 2.0
+            half_h = box[4] / 2.0
+            for key in self._cells_in(box[0] - half_w, box[1] - half_h, box[0] + half_w, box[1] + half_h):
+                self.cells.setdefault(key, []).append(i)
+
+    def _cells_in(self, min_x, min_y, max_x, max_y):
+        inv = 1.0 / self.cell_size
+        x0 = math.floor(min_x * inv); x1 = math.floor(max_x * inv)
+        y0 = math.floor(min_y * inv); y1 = math.floor(max_y * inv)
+        for ix in range(x0, x1 + 1):
+            for iy in range(y0, y1 + 1):
+                yield ix, iy
+
+    def query(self, min_x, min_y, max_x, max_y):
+        """Indices of boxes whose cells overlap the given bounds, each listed once."""
+        inv = 1.0 / self.cell_size
+        x0 = math.floor(min_x * inv); x1 = math.floor(max_x * inv)
+        y0 = math.floor(min_y * inv); y1 = math.floor(max_y * inv)
+        cells = self.cells
+        if x0 == x1 and y0 == y1:
+            # common case: the mover sits inside one cell, no de-duplication needed
+            return cells.get((x0, y0), ())
+        self._query_id += 1
+        qid = self._query_id
+        stamp = self._stamp
+        found = []
+        for ix in range(x0, x1 + 1):
+            for iy in range(y0, y1 + 1):
+                bucket = cells.get((ix, iy))
+                if bucket is None:
+                    continue
+                for i in bucket:
+                    if stamp[i] != qid:
+                        stamp[i] = qid
+                        found.append(i)
+        return found
+
+    def query_point(self, x, y, radius):
+        return self.query(x - radius, y - radius, x + radius, y + radius)
+
+# --------------------------
+# Broad phase: sweep and prune on x for equal-sized movers
+# --------------------------
+# Cars keep a persistent order sorted by x. Between ticks they barely move, so
+# re-sorting with insertion sort is close to linear, and overlapping pairs are
+# found by scanning forward only while the next car is within reach on x.
+# --------------------------
+class SweepAndPrune:
+    def __init__(self):
+        self.order = []
+        self.keys = []
+
+    def update(self, xs):
+        """Re-sort object ids by their x coordinate (xs indexed by id)."""
+        order = self.order
+        if len(order) != len(xs):
+            order[:] = sorted(range(len(xs)), key=xs.__getitem__)
+        else:
+            for a in range(1, len(order)):
+                obj = order[a]
+                x = xs[obj]
+                b = a - 1
+                while b >= 0 and xs[order[b]] > x:
+                    order[b + 1] = order[b]
+                    b -= 1
+                order[b + 1] = obj
+        self.keys = [xs[i] for i in order]
+
+    def pairs(self, reach):
+        """(i, j) id pairs, i < j, whose x coordinates are within reach, sorted."""
+        keys = self.keys
+        order = self.order
+        n = len(order)
+        out = []
+        for a in range(n - 1):
+            limit = keys[a] + reach
+            b = a + 1
+            while b < n and keys[b] <= limit:
+                i = order[a]; j = order[b]
+                out.append((i, j) if i < j else (j, i))
+                b += 1
+        out.sort()
+        return out
+
+    def query(self, lo, hi):
+        """Ids whose x lies in [lo, hi], in id order."""
+        start = bisect_left(self.keys, lo)
+        stop = bisect_right(self.keys, hi)
+        return sorted(self.order[start:stop])
@@ -0,0 +1,117 @@
+from array import array
+
+import numpy as np
+
+# --------------------------
+# Flat game-state snapshots in a preallocated ring
+# --------------------------
+# A snapshot is one fixed-width row of doubles: a match header followed by one
+# block per car. All rows live in a single array('d') allocated up front, so
+# taking a snapshot only overwrites the oldest row in place (no new objects
+# per snapshot), and restore() writes the values back into the Simulation.
+# Rows are addressed by tick; the ring remembers the last `capacity` ticks.
+# This is what rollback (re-simulate from an older tick), bot tree search and
+# replay seeking build on.
+# --------------------------
+HEADER = ("tick", "score0", "score1", "last_collision_time",
+          "ball_x", "ball_y", "ball_z", "ball_vx", "ball_vy", "ball_vz")
+CAR_FIELDS = ("x", "y", "z", "angle", "vz", "boost", "boosting", "health",
+              "forward", "back", "left", "right")
+
+def state_width(cars):
+    return len(HEADER) + len(CAR_FIELDS) * cars
+
+class StateRing:
+    def __init__(self, cars, capacity=64):
+        self.cars = cars
+        self.capacity = capacity
+        self.width = state_width(cars)
+        self.buf = array("d", bytes(8 * self.width * capacity))
+        self.ticks = [-1] * capacity  # tick held by each row, -1 = empty
+        self._next = 0
+
+    def rows(self):
+        """The whole ring as a (capacity, width) NumPy view (no copy)."""
+        return np.frombuffer(self.buf, dtype=np.float64).reshape(self.capacity, self.width)
+
+    def snapshot(self, sim):
+        """
+        Store sim's current state, overwriting the oldest row (or the row that
+        already holds this tick, e.g. when re-simulating). Returns the row index.
+        """
+        slot = self.find(sim.tick)
+        if slot is None:
+            slot = self._next
+            self._next = (slot + 1) % self.capacity
+        self.ticks[slot] = sim.tick
+        buf = self.buf
+        o = slot * self.width
+        buf[o] = sim.tick
+        buf[o + 1] = sim.scores[0]
+        buf[o + 2] = sim.scores[1]
+        buf[o + 3] = sim.last_collision_time
+        p = sim.ball_position
+        v = sim.ball_velocity
+        buf[o + 4] = p[0]; buf[o + 5] = p[1]; buf[o + 6] = p[2]
+        buf[o + 7] = v[0]; buf[o + 8] = v[1]; buf[o + 9] = v[2]
+        o += 10
+        for car in sim.cars:
+            p = car.position
+            m = car.moving
+            buf[o] = p[0]; buf[o + 1] = p[1]; buf[o + 2] = p[2]
+            buf[o + 3] = car.angle
+            buf[o + 4] = car.vz
+            buf[o + 5] = car.boost
+            buf[o + 6] = car.boosting
+            buf[o + 7] = car.health
+            buf[o + 8] = m[0]; buf[o + 9] = m[1]; buf[o + 10] = m[2]; buf[o + 11] = m[3]
+            o += 12
+        return slot
+
+    def find(self, tick):
+        """Row index holding tick, or None if it was never stored or has been overwritten."""
+        try:
+            return self.ticks.index(tick)
+        except ValueError:
+            return None
+
+    def latest_at_or_before(self, tick):
+        """(tick, row) of the newest stored snapshot not after tick, or None."""
+        best = None
+        for slot, t in enumerate(self.ticks):
+            if 0 <= t <= tick and (best is None or t > best[0]):
+                best = (t, slot)
+        return best
+
+    def restore(self, sim, tick):
+        """Put sim back in the state it had at tick (KeyError if that tick is not in the ring)."""
+        slot = self.find(tick)
+        if slot is None:
+            raise KeyError(f"tick {tick} is not in the state ring")
+        self.restore_row(sim, slot)
+
+    def restore_row(self, sim, slot):
+        buf = self.buf
+        o = slot * self.width
+        sim.tick = int(buf[o])
+        sim.scores[0] = int(buf[o + 1])
+        sim.scores[1] = int(buf[o + 2])
+        sim.last_collision_time = buf[o + 3]
+        p = sim.ball_position
+        v = sim.ball_velocity
+        p[0] = buf[o + 4]; p[1] = buf[o + 5]; p[2] = buf[o + 6]
+        v[0] = buf[o + 7]; v[1] = buf[o + 8]; v[2] = buf[o + 9]
+        sim.ball_epoch += 1
+        o += 10
+        for car in sim.cars:
+            p = car.position
+            m = car.moving
+            p[0] = buf[o]; p[1] = buf[o + 1]; p[2] = buf[o + 2]
+            car.angle = buf[o + 3]
+            car.vz = buf[o + 4]
+            car.boost = buf[o + 5]
+            car.boosting = buf[o + 6] != 0.0
+            car.health = int(buf[o + 7])
+            m[0] = buf[o + 8] != 0.0; m[1] = buf[o + 9] != 0.0
+            m[2] = buf[o + 10] != 0.0; m[3] = buf[o + 11] != 0.0
+            o += 12
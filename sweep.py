@@ -0,0 +1,150 @@
+import argparse
+import hashlib
+import itertools
+import json
+import multiprocessing as mp
+import os
+import sys
+import time
+
+from controllers import CONTROLLERS
+from simulation import INERT_PARAMS, PARAMS, Simulation
+
+# --------------------------
+# Parameter sweeps and tournaments
+# --------------------------
+# Every combination of grid values and controller pairing is one cell. A cell
+# plays `matches` headless matches (seeds seed, seed+1, ...) and produces one
+# JSON line. Cells run on a process pool and each line is appended to the
+# output file as soon as its cell finishes. A cell is identified by the hash
+# of its full configuration, so re-running the same command skips every cell
+# already in the file and only plays what is missing.
+# --------------------------
+RESULT_VERSION = 1
+
+def parse_value(text):
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+def parse_grid(specs):
+    """['boost_multiplier=1.5,1.8', ...] -> {'boost_multiplier': [1.5, 1.8], ...}"""
+    grid = {}
+    for spec in specs:
+        name, _, values = spec.partition("=")
+        if name not in PARAMS:
+            raise SystemExit(f"unknown parameter in --grid: {name}")
+        if name in INERT_PARAMS:
+            raise SystemExit(f"--grid {name}: the engine does not read it, so every cell would be the same")
+        grid[name] = [parse_value(v) for v in values.split(",") if v]
+    return grid
+
+def parse_pairings(specs):
+    """['chaser:idle', 'random'] -> [('chaser', 'idle'), ('random', 'random')]"""
+    pairings = []
+    for spec in specs:
+        for item in spec.split(","):
+            names = item.split(":")
+            if len(names) == 1:
+                names = names * 2
+            for name in names:
+                if name not in CONTROLLERS:
+                    raise SystemExit(f"unknown controller: {name} (have {', '.join(sorted(CONTROLLERS))})")
+            pairings.append(tuple(names))
+    return pairings
+
+def cell_key(config):
+    blob = json.dumps(dict(config, version=RESULT_VERSION), sort_keys=True)
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()
+
+def make_cells(grid, pairings, matches, ticks, seed, cars_per_team):
+    names = sorted(grid)
+    cells = []
+    for values in itertools.product(*(grid[n] for n in names)):
+        for pairing in pairings:
+            config = {
+                "params": dict(zip(names, values)),
+                "controllers": list(pairing),
+                "matches": matches,
+                "ticks": ticks,
+                "seed": seed,
+                "cars_per_team": cars_per_team,
+            }
+            cells.append((cell_key(config), config))
+    return cells
+
+def play_match(params, controllers, ticks, seed, cars_per_team=1):
+    """One headless match; team k's cars are all driven by controllers[k]."""
+    sim = Simulation(seed=seed, cars_per_team=cars_per_team, **params)
+    drivers = [CONTROLLERS[controllers[car.team]](seed * 31 + i) for i, car in enumerate(sim.cars)]
+    index = range(len(sim.cars))
+    touches = 0
+    last = sim.last_collision_time
+    for _ in range(ticks):
+        sim.step([drive(sim, i) for drive, i in zip(drivers, index)])
+        if sim.last_collision_time != last:
+            touches += 1
+            last = sim.last_collision_time
+    return {"scores": list(sim.scores), "collision_ticks": touches}
+
+def run_cell(cell):
+    key, config = cell
+    start = time.perf_counter()
+    results = [play_match(config["params"], config["controllers"], config["ticks"],
+                          config["seed"] + k, config["cars_per_team"])
+               for k in range(config["matches"])]
+    goal_diff = sum(r["scores"][0] - r["scores"][1] for r in results) / len(results)
+    return {
+        "key": key,
+        "config": config,
+        "matches": results,
+        "mean_goal_diff": goal_diff,
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+
+def completed_keys(path):
+    keys = set()
+    if not os.path.exists(path):
+        return keys
+    with open(path) as f:
+        for line in f:
+            try:
+                keys.add(json.loads(line)["key"])
+            except (ValueError, KeyError):
+                pass  # a line cut short by an interrupted run is simply redone
+    return keys
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Play a grid of headless matches in parallel.")
+    parser.add_argument("--grid", action="append", default=[], metavar="NAME=V1,V2,...",
+                        help="parameter values to sweep (repeatable)")
+    parser.add_argument("--controllers", action="append", default=[], metavar="A:B,...",
+                        help="controller pairings, green:red (repeatable; default chaser:chaser)")
+    parser.add_argument("--matches", type=int, default=4, help="matches per cell")
+    parser.add_argument("--ticks", type=int, default=60 * 60, help="ticks per match")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--cars-per-team", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=None, help="pool size (default: all cores)")
+    parser.add_argument("--out", default="sweep_results.jsonl")
+    args = parser.parse_args(argv)
+
+    cells = make_cells(parse_grid(args.grid), parse_pairings(args.controllers or ["chaser"]),
+                       args.matches, args.ticks, args.seed, args.cars_per_team)
+    done = completed_keys(args.out)
+    todo = [cell for cell in cells if cell[0] not in done]
+    print(f"{len(cells)} cells, {len(cells) - len(todo)} cached, {len(todo)} to run")
+    if not todo:
+        return
+
+    start = time.perf_counter()
+    with open(args.out, "a") as out, mp.Pool(args.workers) as pool:
+        for n, result in enumerate(pool.imap_unordered(run_cell, todo), 1):
+            out.write(json.dumps(result, sort_keys=True) + "\n")
+            out.flush()
+            print(f"[{n}/{len(todo)}] {result['config']['params']} "
+                  f"{':'.join(result['config']['controllers'])} goal diff {result['mean_goal_diff']:+.2f}")
+    print(f"done in {time.perf_counter() - start:.1f}s")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
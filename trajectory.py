@@ -0,0 +1,98 @@
+import struct
+
+import numpy as np
+
+# --------------------------
+# Trajectory store: fixed-size per-tick records in a flat binary file
+# --------------------------
+# A 32-byte header (magic, version, car count) is followed by one record per
+# tick with the dtype below. Records are appended in chunks, so a writer's
+# memory stays at one chunk however long the run is, and a reader maps the
+# file with np.memmap: slicing a tick range touches only those pages and
+# returns a view, never a copy of the whole file. The tick count is derived
+# from the file size, so a file cut short by a crash is still readable up to
+# its last complete record.
+# --------------------------
+MAGIC = b"RLTJ"
+VERSION = 1
+HEADER = struct.Struct("<4sHH24x")
+
+def trajectory_dtype(cars):
+    return np.dtype([
+        ("tick", "<i8"),
+        ("scores", "<i4", (2,)),
+        ("car_pos", "<f8", (cars, 3)),
+        ("car_angle", "<f8", (cars,)),
+        ("car_vz", "<f8", (cars,)),
+        ("car_boost", "<f8", (cars,)),
+        ("car_health", "<i4", (cars,)),
+        ("ball_pos", "<f8", (3,)),
+        ("ball_vel", "<f8", (3,)),
+    ])
+
+class TrajectoryWriter:
+    def __init__(self, path, cars, chunk_ticks=4096):
+        self.dtype = trajectory_dtype(cars)
+        self.cars = cars
+        self.ticks = 0
+        self._chunk = np.zeros(chunk_ticks, dtype=self.dtype)
+        self._fill = 0
+        self._file = open(path, "wb")
+        self._file.write(HEADER.pack(MAGIC, VERSION, cars))
+
+    def append(self, sim):
+        """Record the current state of a Simulation as the next row."""
+        row = self._chunk[self._fill]
+        row["tick"] = sim.tick
+        row["scores"] = sim.scores
+        for i, car in enumerate(sim.cars):
+            row["car_pos"][i] = car.position
+            row["car_angle"][i] = car.angle
+            row["car_vz"][i] = car.vz
+            row["car_boost"][i] = car.boost
+            row["car_health"][i] = car.health
+        row["ball_pos"] = sim.ball_position
+        row["ball_vel"] = sim.ball_velocity
+        self._fill += 1
+        self.ticks += 1
+        if self._fill == len(self._chunk):
+            self.flush()
+
+    def append_rows(self, rows):
+        """Append an array of records already in this file's dtype."""
+        self.flush()
+        np.asarray(rows, dtype=self.dtype).tofile(self._file)
+        self.ticks += len(rows)
+
+    def flush(self):
+        if self._fill:
+            self._chunk[:self._fill].tofile(self._file)
+            self._fill = 0
+        self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def open_trajectory(path, mode="r"):
+    """Map a trajectory file as a structured array of shape (ticks,) without reading it."""
+    with open(path, "rb") as f:
+        magic, version, cars = HEADER.unpack(f.read(HEADER.size))
+        f.seek(0, 2)
+        size = f.tell()
+    if magic != MAGIC:
+        raise ValueError(f"{path}: not a trajectory file")
+    if version != VERSION:
+        raise ValueError(f"{path}: unsupported trajectory version {version}")
+    dtype = trajectory_dtype(cars)
+    ticks = (size - HEADER.size) // dtype.itemsize
+    if ticks == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode=mode, offset=HEADER.size, shape=(ticks,))